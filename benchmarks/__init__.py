@@ -0,0 +1,8 @@
+'''Performance benchmarks.
+
+The benchmarks follow the conventions of `airspeed velocity
+<https://asv.readthedocs.io/>`_: every ``time_*`` method of a benchmark class is
+timed after calling ``setup`` with the values of ``params``, and the peak
+resident memory of every ``peakmem_*`` method is recorded. Setups that raise
+:class:`NotImplementedError` mark unsupported parameter combinations.
+'''
@@ -0,0 +1,22 @@
+from nutils import core
+import sys
+
+class getprop:
+  'property lookup from nested frames with many local variables'
+
+  params = [0, 10, 30], ['local', 'global']
+  param_names = 'depth', 'scope'
+
+  def setup(self, depth, scope):
+    ns = {}
+    exec('def nest(n, f):\n  {} = range(20)\n  return nest(n-1, f) if n else f()'.format(', '.join('v{}'.format(i) for i in range(20))), ns)
+    self.nest = ns['nest']
+
+  def time_getprop(self, depth, scope):
+    if scope == 'local':
+      __myprop__ = None
+    self.nest(depth, self._lookup)
+
+  def _lookup(self):
+    for i in range(1000):
+      core.getprop('myprop', None)
@@ -0,0 +1,31 @@
+from nutils import mesh
+import numpy
+
+def gmshdata(nelems):
+  'lines of a gmsh file of the unit square divided into 2*nelems^2 triangles'
+
+  verts = numpy.linspace(0, 1, nelems+1)
+  nodes = ['{} {} {} 0'.format(i+1, x, y) for i, (y, x) in enumerate((y, x) for y in verts for x in verts)]
+  inode = numpy.arange(1, (nelems+1)**2+1).reshape(nelems+1, nelems+1)
+  a, b, c, d = inode[:-1,:-1].ravel(), inode[:-1,1:].ravel(), inode[1:,:-1].ravel(), inode[1:,1:].ravel()
+  triangles = numpy.concatenate([numpy.array([a, b, d]).T, numpy.array([a, d, c]).T])
+  elements = ['{} 2 2 1 1 {} {} {}'.format(i+1, *tri) for i, tri in enumerate(triangles)]
+  return ['$MeshFormat', '2.2 0 8', '$EndMeshFormat',
+    '$PhysicalNames', '1', '2 1 "interior"', '$EndPhysicalNames',
+    '$Nodes', str(len(nodes))] + nodes + ['$EndNodes',
+    '$Elements', str(len(elements))] + elements + ['$EndElements']
+
+class gmsh:
+  'parse a triangulated unit square'
+
+  params = [16, 64]
+  param_names = 'nelems',
+
+  def setup(self, nelems):
+    self.lines = gmshdata(nelems)
+
+  def time_gmsh(self, nelems):
+    mesh.gmsh(self.lines)
+
+  def peakmem_gmsh(self, nelems):
+    mesh.gmsh(self.lines)
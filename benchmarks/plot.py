@@ -0,0 +1,24 @@
+from nutils import mesh, plot, function
+import numpy, tempfile
+
+class writevtu:
+  'vtu output of geometry and a point field'
+
+  params = [16, 64], [False, True]
+  param_names = 'nelems', 'ascii'
+
+  def setup(self, nelems, ascii):
+    self.outdir = tempfile.TemporaryDirectory()
+    self.domain, self.geom = mesh.rectilinear([numpy.linspace(0, 1, nelems+1)]*2)
+    self.func = function.sin(self.geom).sum()
+
+  def teardown(self, nelems, ascii):
+    self.outdir.cleanup()
+
+  def time_writevtu(self, nelems, ascii):
+    __outdir__ = self.outdir.name
+    plot.writevtu('benchmark', self.domain, self.geom, pointdata=dict(f=self.func), ascii=ascii)
+
+  def peakmem_writevtu(self, nelems, ascii):
+    __outdir__ = self.outdir.name
+    plot.writevtu('benchmark', self.domain, self.geom, pointdata=dict(f=self.func), ascii=ascii)
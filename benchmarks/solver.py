@@ -0,0 +1,24 @@
+from nutils import mesh, function, solver
+import numpy
+
+class newton:
+  'nonlinear laplace with dirichlet constraints'
+
+  params = [8, 16], [1, 2]
+  param_names = 'nelems', 'degree'
+
+  def setup(self, nelems, degree):
+    domain, geom = mesh.rectilinear([numpy.linspace(0, 1, nelems+1)]*2)
+    ns = function.Namespace()
+    ns.x = geom
+    ns.basis = domain.basis('spline', degree=degree)
+    ns.u = 'basis_n ?lhs_n'
+    self.res = domain.integral('basis_n,i u_,i (1 + u^2) - basis_n' @ ns, geometry=ns.x, degree=2*degree+2)
+    sqr = domain.boundary.integral('u^2' @ ns, geometry=ns.x, degree=2*degree)
+    self.cons = solver.optimize('lhs', sqr, droptol=1e-15)
+
+  def time_newton(self, nelems, degree):
+    solver.newton('lhs', self.res, constrain=self.cons).solve(tol=1e-10)
+
+  def peakmem_newton(self, nelems, degree):
+    solver.newton('lhs', self.res, constrain=self.cons).solve(tol=1e-10)
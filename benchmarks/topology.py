@@ -0,0 +1,114 @@
+from nutils import mesh, function, topology
+from .mesh import gmshdata
+import numpy
+
+def unitcube(meshtype, ndims, nelems):
+  if meshtype == 'rectilinear':
+    return mesh.rectilinear([numpy.linspace(0, 1, nelems+1)]*ndims)
+  if meshtype == 'gmsh' and ndims == 2:
+    return mesh.gmsh(gmshdata(nelems))
+  raise NotImplementedError # skipped by asv
+
+def residual(problem, domain, geom, degree):
+  ns = function.Namespace()
+  ns.x = geom
+  if problem == 'laplace':
+    ns.basis = domain.basis('std', degree=degree)
+    ns.u = 'basis_n ?lhs_n'
+    return domain.integral('basis_n,i u_,i' @ ns, geometry=ns.x, degree=2*degree)
+  if problem == 'elasticity':
+    ns.basis = domain.basis('std', degree=degree).vector(domain.ndims)
+    ns.u_i = 'basis_ni ?lhs_n'
+    ns.strain_ij = '(u_i,j + u_j,i) / 2'
+    ns.stress_ij = 'strain_kk δ_ij + 2 strain_ij'
+    return domain.integral('basis_ni,j stress_ij' @ ns, geometry=ns.x, degree=2*degree)
+  if problem == 'navierstokes':
+    ns.ubasis, ns.pbasis = function.chain([domain.basis('std', degree=degree+1).vector(domain.ndims), domain.basis('std', degree=degree)])
+    ns.u_i = 'ubasis_ni ?lhs_n'
+    ns.p = 'pbasis_n ?lhs_n'
+    ns.sigma_ij = '(u_i,j + u_j,i) - p δ_ij'
+    return domain.integral('ubasis_ni (u_i,j u_j + sigma_ij,j) + pbasis_n u_k,k' @ ns, geometry=ns.x, degree=3*degree+2)
+  raise ValueError('unknown problem {!r}'.format(problem))
+
+class integrate:
+  'jacobian assembly'
+
+  params = ['laplace', 'elasticity', 'navierstokes'], ['rectilinear', 'gmsh'], [2, 3], [1, 2]
+  param_names = 'problem', 'mesh', 'ndims', 'degree'
+
+  def setup(self, problem, meshtype, ndims, degree):
+    domain, geom = unitcube(meshtype, ndims, 16 if ndims == 2 else 4)
+    res = residual(problem, domain, geom, degree)
+    self.jac = res.derivative('lhs')
+    self.lhs = numpy.random.RandomState(0).normal(size=res.shape)
+
+  def time_integrate(self, problem, meshtype, ndims, degree):
+    self.jac.eval(arguments=dict(lhs=self.lhs))
+
+  def peakmem_integrate(self, problem, meshtype, ndims, degree):
+    self.jac.eval(arguments=dict(lhs=self.lhs))
+
+class elem_eval:
+  'sampling of a function at element points'
+
+  params = ['rectilinear', 'gmsh'], [1, 2]
+  param_names = 'mesh', 'degree'
+
+  def setup(self, meshtype, degree):
+    self.domain, geom = unitcube(meshtype, 2, 32)
+    basis = self.domain.basis('std', degree=degree)
+    self.func = function.sin(geom).sum() * basis.dot(numpy.arange(len(basis)))
+
+  def time_elem_eval(self, meshtype, degree):
+    self.domain.elem_eval(self.func, ischeme='bezier5', separate=True)
+
+  def peakmem_elem_eval(self, meshtype, degree):
+    self.domain.elem_eval(self.func, ischeme='bezier5', separate=True)
+
+class basis:
+  'basis construction'
+
+  params = ['spline', 'std', 'discont'], [1, 2, 3]
+  param_names = 'btype', 'degree'
+
+  def time_basis(self, btype, degree):
+    # topology bases are cached, so each run needs a fresh copy
+    domain, geom = unitcube('rectilinear', 2, 32)
+    domain.basis(btype, degree=degree)
+
+  def peakmem_basis(self, btype, degree):
+    domain, geom = unitcube('rectilinear', 2, 32)
+    domain.basis(btype, degree=degree)
+
+class trim:
+  'trimming by a circular levelset'
+
+  params = [1, 2, 3]
+  param_names = 'maxrefine',
+  number = 1 # trimmed references are cached, so every sample needs a fresh setup
+
+  def setup(self, maxrefine):
+    self.domain, self.geom = unitcube('rectilinear', 2, 16)
+    topology._trimcache.clear()
+
+  def time_trim(self, maxrefine):
+    self.domain.trim(.7 - function.norm2(self.geom), maxrefine=maxrefine)
+
+  def peakmem_trim(self, maxrefine):
+    self.domain.trim(.7 - function.norm2(self.geom), maxrefine=maxrefine)
+
+class locate:
+  'point location'
+
+  params = ['rectilinear', 'gmsh'], [10, 100]
+  param_names = 'mesh', 'npoints'
+
+  def setup(self, meshtype, npoints):
+    self.domain, self.geom = unitcube(meshtype, 2, 16)
+    self.points = numpy.random.RandomState(0).uniform(size=(npoints, 2))
+
+  def time_locate(self, meshtype, npoints):
+    self.domain.locate(self.geom, self.points)
+
+  def peakmem_locate(self, meshtype, npoints):
+    self.domain.locate(self.geom, self.points)
@@ -11,7 +11,7 @@ The cache module.
 """
 
 from . import core, log, numeric, util
-import os, sys, numpy, functools, inspect, builtins
+import os, sys, numpy, functools, inspect, builtins, collections, weakref
 
 def property(f):
   _self = object()
@@ -33,54 +33,130 @@ def property(f):
     self.__dict__[_name] = value if value is not self else _self
   return builtins.property(fget=property_getter, fset=property_setter)
 
+def _nbytes( value ):
+  'estimated memory footprint of a cached value in bytes'
+
+  if isinstance( value, (numpy.ndarray,numeric.const) ):
+    return value.size * value.dtype.itemsize
+  if isinstance( value, (tuple,list) ):
+    return sum( _nbytes(item) for item in value )
+  return sys.getsizeof( value )
+
+class LRUDict( collections.OrderedDict ):
+  '''dictionary that retains only the ``maxsize`` most recently used items
+
+  Lookups through :meth:`get` mark an item as recently used.'''
+
+  def __init__( self, maxsize ):
+    self.maxsize = maxsize
+    super().__init__()
+
+  def get( self, key, default=None ):
+    try:
+      value = self[key]
+    except KeyError:
+      return default
+    self.move_to_end( key )
+    return value
+
+  def __setitem__( self, key, value ):
+    super().__setitem__( key, value )
+    if len(self) > self.maxsize:
+      self.popitem( last=False )
+
 class Wrapper:
-  'function decorator that caches results by arguments'
+  '''function decorator that caches results by arguments
 
-  def __init__( self, func ):
+  The cache is unbounded by default. If ``maxsize`` (number of items) or
+  ``maxbytes`` (estimated size of all cached values) is specified, the least
+  recently used items are evicted to satisfy these limits.'''
+
+  def __init__( self, func, maxsize=None, maxbytes=None ):
     self.func = func
-    self.cache = {}
+    self.cache = collections.OrderedDict()
+    self.maxsize = maxsize
+    self.maxbytes = maxbytes
     self.count = 0
+    self.misses = 0
+    self.evictions = 0
+    self.nbytes = 0
     self.signature = inspect.signature(func)
+    self._bounded = maxsize is not None or maxbytes is not None
+    self._nargs = len(self.signature.parameters) if all(param.kind == param.POSITIONAL_OR_KEYWORD for param in self.signature.parameters.values()) else None
 
   def __call__( self, *args, **kwargs ):
     self.count += 1
-    bound = self.signature.bind(*args, **kwargs)
-    bound.apply_defaults()
-    args = bound.args
-    assert not bound.kwargs
+    if kwargs or len(args) != self._nargs: # fast path for complete positional arguments
+      bound = self.signature.bind(*args, **kwargs)
+      bound.apply_defaults()
+      args = bound.args
+      assert not bound.kwargs
     try:
       value = self.cache[args]
     except KeyError:
+      self.misses += 1
       value = self.func(*args)
       self.cache[args] = value
+      if self._bounded:
+        self.nbytes += _nbytes( value )
+        self._evict()
+    else:
+      if self._bounded:
+        self.cache.move_to_end( args )
     return value
 
+  def clear( self ):
+    'remove all cached values'
+
+    self.cache.clear()
+    self.nbytes = 0
+
+  def _evict( self ):
+    while len(self.cache) > 1 and ( self.maxsize is not None and len(self.cache) > self.maxsize or self.maxbytes is not None and self.nbytes > self.maxbytes ):
+      args, value = self.cache.popitem( last=False )
+      self.nbytes -= _nbytes( value )
+      self.evictions += 1
+
   @builtins.property
   def hits( self ):
-    return self.count - len(self.cache)
+    return self.count - self.misses
 
 class WrapperCache:
-  'maintains a cache for Wrapper instances'
+  '''maintains a cache for Wrapper instances
 
-  def __init__( self ):
+  Limits ``maxsize`` and ``maxbytes`` apply to every wrapped function
+  separately, unless overridden for a specific function via :meth:`setlimits`.'''
+
+  def __init__( self, maxsize=None, maxbytes=None ):
     self.cache = {}
+    self.limits = {}
+    self.maxsize = maxsize
+    self.maxbytes = maxbytes
 
   def __getitem__( self, func ):
     try:
       wrapper = self.cache[func]
     except KeyError:
-      wrapper = Wrapper(func)
+      maxsize, maxbytes = self.limits.get( func, (self.maxsize,self.maxbytes) )
+      wrapper = Wrapper(func, maxsize=maxsize, maxbytes=maxbytes)
       self.cache[func] = wrapper
     return wrapper
 
+  def setlimits( self, func, maxsize=None, maxbytes=None ):
+    'set cache limits for ``func``, to take effect before its first use'
+
+    assert func not in self.cache, 'limits must be set before first use'
+    self.limits[func] = maxsize, maxbytes
+
   @builtins.property
   def stats( self ):
-    hits = count = 0
+    hits = count = evictions = 0
     for wrapper in self.cache.values():
       hits += wrapper.hits
       count += wrapper.count
+      evictions += wrapper.evictions
     return 'not used' if not count \
-      else 'effectivity %d%% (hit %d/%d calls over %d functions)' % ( 100*hits/count, hits, count, len(self.cache) )
+      else 'effectivity %d%% (hit %d/%d calls over %d functions%s)' % ( 100*hits/count, hits, count, len(self.cache), ', %d evictions' % evictions if evictions else '' )
 
 class WrapperDummyCache( object ):
   'placeholder object'
@@ -90,9 +166,37 @@ class WrapperDummyCache( object ):
   def __getitem__( self, func ):
     return func
 
+class _InternKey:
+  '''hashable wrapper for constructor arguments, to compute their hash only once
+
+  Once the interned instance is collected the key is marked ``dead``, after
+  which it compares equal only to itself. This avoids a comparison of the
+  arguments, which may no longer be in a usable state (e.g. at interpreter
+  shutdown), upon removal from the intern table in case of hash collisions.'''
+
+  __slots__ = 'args', 'hash', 'dead'
+
+  def __init__(self, args):
+    self.args = args
+    self.hash = hash(args)
+    self.dead = False
+
+  def __hash__(self):
+    return self.hash
+
+  def __eq__(self, other):
+    return self is other or not self.dead and not other.dead and self.hash == other.hash and self.args == other.args
+
+def _removeinterned(table, key, ref):
+  'weakref callback that removes ``key`` from intern ``table``'
+
+  key.dead = True
+  if table.get(key) is ref:
+    del table[key]
+
 class ImmutableMeta(type):
 
-  _cleanup_threshold = 1000 # number of new instances until next cleanup
+  _nurserysize = 1000 # number of recent instances that are kept alive
 
   def __init__(cls, *args, **kwargs):
     super().__init__(*args, **kwargs)
@@ -100,7 +204,12 @@ class ImmutableMeta(type):
     param0, *params = signature.parameters.values()
     cls._signature = inspect.Signature(params)
     cls._annotations = [(param.name, param.annotation) for param in params if param.annotation != param.empty]
-    cls._cache = {}
+    # Instances are interned weakly. To prevent short lived instances (and
+    # their cached properties) from being rebuilt repeatedly, the most recently
+    # created instances are additionally kept alive in a bounded nursery.
+    cls._cache = {} # intern key -> weakref
+    cls._nursery = collections.deque(maxlen=cls._nurserysize)
+    cls._internstats = [0, 0] # number of hits, misses
     cls._init = cls.__init__
     if cls._annotations:
       cls.__init__ = util.enforcetypes(cls.__init__, signature)
@@ -114,19 +223,31 @@ class ImmutableMeta(type):
     return cls._new(*bound.args)
 
   def _new(cls, *args):
-    try:
-      self = cls._cache[args]
-    except KeyError:
+    key = _InternKey(args)
+    ref = cls._cache.get(key)
+    self = ref and ref()
+    if self is None:
+      cls._internstats[1] += 1
       self = cls.__new__(cls)
       self._args = args
-      self._hash = hash(args)
+      self._hash = key.hash
       self._init(*args)
-      cls._cache[args] = self
-      if len(cls._cache) > cls._cleanup_threshold:
-        cls._cache = {key: value for key, value in cls._cache.items() if sys.getrefcount(value) > 4}
-        cls._cleanup_threshold = ImmutableMeta._cleanup_threshold + len(cls._cache)
+      cls._cache.pop(key, None) # replace the key object of a collected instance, if any
+      cls._cache[key] = weakref.ref(self, functools.partial(_removeinterned, cls._cache, key))
+      cls._nursery.append(self)
+    else:
+      cls._internstats[0] += 1
     return self
 
+  @builtins.property
+  def internstats(cls):
+    'interning statistics of this class'
+
+    hits, misses = cls._internstats
+    count = hits + misses
+    return 'not used' if not count \
+      else 'effectivity %d%% (hit %d/%d constructions, %d alive)' % ( 100*hits/count, hits, count, len(cls._cache) )
+
 class Immutable(metaclass=ImmutableMeta):
 
   def __init__( self ):
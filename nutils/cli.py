@@ -95,6 +95,7 @@ def choose(*functions, cmd=True, args=None, scriptname=None):
   parser.add_argument( '--recache', type=_bool, nargs='?', const=True, metavar='BOOL', default=core.globalproperties['recache'], help='overwrite existing cache' )
   parser.add_argument( '--dot', type=str, metavar='STR', default=core.globalproperties['dot'], help='graphviz executable' )
   parser.add_argument( '--selfcheck', type=_bool, nargs='?', const=True, metavar='BOOL', default=core.globalproperties['selfcheck'], help='active self checks (slow!)' )
+  parser.add_argument( '--membudget', type=int, metavar='INT', default=core.globalproperties['membudget'], help='assembly memory budget in bytes, 0 for unlimited' )
   if cmd:
     subparsers = parser.add_subparsers( dest='command', help='command (add -h for command-specific help)' )
     subparsers.required = True
@@ -125,6 +126,7 @@ def choose(*functions, cmd=True, args=None, scriptname=None):
   __recache__ = ns.recache
   __dot__ = ns.dot
   __selfcheck__ = ns.selfcheck
+  __membudget__ = ns.membudget
 
   # call function
   func = { f.__name__: f for f in functions }[ ns.command ] if cmd else functions[0]
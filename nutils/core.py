@@ -11,7 +11,7 @@ The core module provides a collection of low level constructs that have no
 dependencies on other nutils modules. Primarily for internal use.
 """
 
-import sys, functools, os
+import sys, functools, os, inspect, weakref
 
 globalproperties = {
   'nprocs': 1,
@@ -27,6 +27,7 @@ globalproperties = {
   'dot': False,
   'profile': False,
   'selfcheck': False,
+  'membudget': 0,
 }
 
 if os.access( '/run/shm', os.W_OK ):
@@ -74,8 +75,20 @@ def getprop( name, default=_nodefault, frame=None ):
   if frame is None:
     frame = sys._getframe(1)
   while frame:
-    if key in frame.f_locals:
-      return frame.f_locals[key]
+    # Accessing f_locals of an optimized (function) frame creates a dictionary
+    # of all its local variables, which we avoid for code objects that do not
+    # define any local properties to begin with.
+    code = frame.f_code
+    try:
+      ref, hasprops = _hasprops[id(code)]
+    except KeyError:
+      hasprops = not code.co_flags & inspect.CO_OPTIMIZED \
+        or any( k.startswith('__') and k.endswith('__') for k in code.co_varnames + code.co_cellvars + code.co_freevars )
+      _hasprops[id(code)] = weakref.ref( code, functools.partial( _hasprops.pop, id(code) ) ), hasprops
+    if hasprops:
+      locals = frame.f_locals
+      if key in locals:
+        return locals[key]
     frame = frame.f_back
   if name in globalproperties:
     return globalproperties[name]
@@ -83,6 +96,8 @@ def getprop( name, default=_nodefault, frame=None ):
     raise NameError( 'property %r is not defined' % name )
   return default
 
+_hasprops = {} # id(code) -> weakref(code), False if frames of code cannot hold local properties (code objects hash slowly; collected code is removed)
+
 def index( items ):
   """Index of the first nonzero item.
 
@@ -17,7 +17,7 @@ purposes of integration and sampling.
 """
 
 from . import log, util, numpy, core, numeric, function, cache, transform, _
-import re, warnings, math, itertools, operator, functools
+import re, math, itertools, operator, functools, ast
 
 
 ## ELEMENT
@@ -117,6 +117,48 @@ class Element( object ):
     return 'Element({})'.format( self.vertices )
 
 
+## QUADRATURE RULES
+
+class QuadratureRule( tuple ):
+  '''integration points and weights
+
+  Unpacks as ``points, weights``. Rules of tensor references expose the rules
+  of both operands as ``factors``, with points ordered as the outer product
+  of the factor points, the last factor changing fastest. Gauss rules carry
+  their polynomial ``degree``.'''
+
+  def __new__( cls, points, weights, factors=(), degree=None ):
+    self = super().__new__( cls, ( numeric.const(points, copy=False), weights if weights is None else numeric.const(weights, copy=False) ) )
+    self.factors = factors
+    self.degree = degree
+    return self
+
+  def __getnewargs__( self ):
+    return self.points, self.weights, self.factors, self.degree
+
+  points = property( operator.itemgetter(0) )
+  weights = property( operator.itemgetter(1) )
+
+_parsedischemes = {}
+def parseischeme( ischeme ):
+  '''split integration scheme into type and arguments
+
+  >>> parseischeme( 'gauss4' )
+  ('gauss', 4)
+  >>> parseischeme( 'gauss2,3' )
+  ('gauss', (2, 3))
+  '''
+
+  try:
+    return _parsedischemes[ischeme]
+  except KeyError:
+    match = re.match( '([a-zA-Z]+)(.*)', ischeme )
+    assert match, 'cannot parse integration scheme %r' % ischeme
+    ptype, args = match.groups()
+    parsed = _parsedischemes[ischeme] = ptype, ast.literal_eval( args ) if args else None
+    return parsed
+
+
 ## REFERENCE ELEMENTS
 
 class Reference( cache.Immutable ):
@@ -249,18 +291,39 @@ class Reference( cache.Immutable ):
     assert all( all(items) for items in edge2children )
     return tuple( edge2children )
 
+  @cache.property
+  def _ischemes( self ):
+    return {}
+
   def getischeme( self, ischeme ):
-    match = re.match( '([a-zA-Z]+)(.*)', ischeme )
-    assert match, 'cannot parse integration scheme %r' % ischeme
-    ptype, args = match.groups()
+    '''get integration scheme
+
+    Returns a :class:`QuadratureRule`, which unpacks as ``points, weights``.
+    Rules are constructed once per reference and scheme.'''
+
+    try:
+      return self._ischemes[ischeme]
+    except KeyError:
+      rule = self._getischeme( ischeme )
+      if not isinstance( rule, QuadratureRule ):
+        rule = QuadratureRule( *rule )
+      self._ischemes[ischeme] = rule
+      return rule
+
+  def _getischeme( self, ischeme ):
+    ptype, args = parseischeme( ischeme )
     get = getattr( self, 'getischeme_'+ptype )
-    ipoints, iweights = get( eval(args) ) if args else get()
-    return numeric.const(ipoints, copy=False), numeric.const(iweights, copy=False) if iweights is not None else None
+    ipoints, iweights = get( args ) if args is not None else get()
+    return QuadratureRule( ipoints, iweights, degree=args if ptype == 'gauss' and isinstance( args, int ) else None )
 
   @classmethod
   def register( cls, ptype, func ):
     setattr( cls, 'getischeme_%s' % ptype, func )
 
+  def getischeme_fit( self, degree=None ):
+    _checkfitdegree( degree )
+    return self.getischeme( 'gauss{}'.format(degree) )
+
   def with_children( self, child_refs ):
     child_refs = tuple(child_refs)
     if not any( child_refs ):
@@ -412,6 +475,9 @@ class Reference( cache.Immutable ):
   def get_dof_transpose_map(self, degree, vertex_transpose_map):
     raise NotImplementedError
 
+  def get_dof_vertex_weights(self, degree):
+    raise NotImplementedError
+
 class MyException( Exception ):
   def __repr__( self ):
     return str(self)
@@ -456,7 +522,7 @@ class RevolutionReference( Reference ):
   def simplices( self ):
     return [ (transform.identity,self) ]
 
-  def getischeme( self, ischeme ):
+  def _getischeme( self, ischeme ):
     return numeric.const([[0.]]), numeric.const([self.volume])
 
   def inside(self, point, eps=0):
@@ -549,6 +615,9 @@ class SimplexReference( Reference ):
   def get_edge_dofs(self, degree, iedge):
     return numeric.const(tuple(i for i, j in enumerate(self._integer_barycentric_coordinates(degree)) if j[iedge] == 0), dtype=int)
 
+  def get_dof_vertex_weights(self, degree):
+    return numeric.const(tuple(self._integer_barycentric_coordinates(degree)), dtype=int)
+
   def get_dof_transpose_map(self, degree, vertex_transpose_map):
     vertex_transpose_map = tuple(vertex_transpose_map)
     if len(vertex_transpose_map) != self.nverts or set(vertex_transpose_map) != set(range(self.nverts)):
@@ -571,7 +640,7 @@ class PointReference( SimplexReference ):
   def child_refs( self ):
     return self,
 
-  def getischeme( self, ischeme ):
+  def _getischeme( self, ischeme ):
     return numeric.const(numpy.empty([1,0])), numeric.const([1.])
 
   def inside( self, point, eps=0 ):
@@ -632,12 +701,17 @@ class TriangleReference( SimplexReference ):
 
   def getischeme_gauss( self, degree ):
     '''get integration scheme
-    http://www.cs.rpi.edu/~flaherje/pdf/fea6.pdf'''
+    http://www.cs.rpi.edu/~flaherje/pdf/fea6.pdf, higher degrees from
+    ``_simplexgauss``'''
     if isinstance( degree, tuple ):
       assert len(degree) == self.ndims
       degree = sum(degree)
     assert isinstance( degree, int ) and degree >= 0
 
+    if degree > 7:
+      points, weights = _simplexgauss( self.ndims, degree )
+      return points, weights * self.volume
+
     I = [0,0],
     J = [1,1],[0,1],[1,0]
     K = [1,2],[2,0],[0,1],[2,1],[1,0],[0,2]
@@ -667,9 +741,6 @@ class TriangleReference( SimplexReference ):
       ( K, [0.638444188569809,0.312865496004875,0.048690315425316], 0.077113760890257 ),
     ]
 
-    if degree > 7:
-      warnings.warn( 'inexact integration for polynomial of degree %i'.format(degree) )
-
     return numpy.concatenate( [ numpy.take(c,i) for i, c, w in icw ], axis=0 ), \
            numpy.concatenate( [ [w*self.volume] * len(i) for i, c, w in icw ] )
 
@@ -773,12 +844,17 @@ class TetrahedronReference( SimplexReference ):
 
   def getischeme_gauss( self, degree ):
     '''get integration scheme
-    http://www.cs.rpi.edu/~flaherje/pdf/fea6.pdf'''
+    http://www.cs.rpi.edu/~flaherje/pdf/fea6.pdf, higher degrees from
+    ``_simplexgauss``'''
     if isinstance( degree, tuple ):
       assert len(degree) == 3
       degree = sum(degree)
     assert isinstance( degree, int ) and degree >= 0
 
+    if degree > 8:
+      points, weights = _simplexgauss( self.ndims, degree )
+      return points, weights * self.volume
+
     I = [0,0,0],
     J = [1,1,1],[0,1,1],[1,1,0],[1,0,1]
     K = [0,1,1],[1,0,1],[1,1,0],[1,0,0],[0,1,0],[0,0,1]
@@ -786,7 +862,7 @@ class TetrahedronReference( SimplexReference ):
 
     icw = [
       ( I, [1/4], 1 ),
-    ] if degree == 1 else [
+    ] if degree <= 1 else [
       ( J, [0.5854101966249685,0.1381966011250105], 1/4 ),
     ] if degree == 2 else [
       ( I, [.25], -.8 ),
@@ -822,17 +898,12 @@ class TetrahedronReference( SimplexReference ):
       ( L, [0.7303134278075384,0.0379700484718286,0.1937464752488044], 0.0134324384376852),
     ]
 
-    if degree > 8:
-      warnings.warn( 'inexact integration for polynomial of degree %i'.format(degree) )
-
     return numpy.concatenate( [ numpy.take(c,i) for i, c, w in icw ], axis=0 ), \
            numpy.concatenate( [ [w*self.volume] * len(i) for i, c, w in icw ] )
 
 class TensorReference( Reference ):
   'tensor reference'
 
-  _re_ischeme = re.compile( '([a-zA-Z]+)(.*)' )
-
   def __init__(self, ref1, ref2):
     self.ref1 = ref1
     self.ref2 = ref2
@@ -883,30 +954,28 @@ class TensorReference( Reference ):
       raise NotImplementedError
     return points.reshape( self.nverts, self.ndims ), None
 
-  def getischeme( self, ischeme ):
+  def _getischeme( self, ischeme ):
     if '*' in ischeme:
       ischeme1, ischeme2 = ischeme.split( '*', 1 )
     else:
-      match = self._re_ischeme.match( ischeme )
-      assert match, 'cannot parse integration scheme %r' % ischeme
-      ptype, args = match.groups()
+      ptype, args = parseischeme( ischeme )
       get = getattr( self, 'getischeme_'+ptype, None )
       if get:
-        return get( eval(args) ) if args else get()
-      if args and ',' in args:
-        args = eval(args)
+        return get( args ) if args is not None else get()
+      if isinstance( args, tuple ):
         assert len(args) == self.ndims
         ischeme1 = ptype+','.join( str(n) for n in args[:self.ref1.ndims] )
         ischeme2 = ptype+','.join( str(n) for n in args[self.ref1.ndims:] )
       else:
         ischeme1 = ischeme2 = ischeme
-    ipoints1, iweights1 = self.ref1.getischeme( ischeme1 )
-    ipoints2, iweights2 = self.ref2.getischeme( ischeme2 )
-    ipoints = numpy.empty( (ipoints1.shape[0],ipoints2.shape[0],self.ndims) )
-    ipoints[:,:,0:self.ref1.ndims] = ipoints1[:,_,:self.ref1.ndims]
-    ipoints[:,:,self.ref1.ndims:self.ndims] = ipoints2[_,:,:self.ref2.ndims]
-    iweights = numeric.const((iweights1[:,_] * iweights2[_,:] ).ravel(), copy=False) if iweights1 is not None and iweights2 is not None else None
-    return numeric.const(ipoints.reshape(-1, self.ndims), copy=False), iweights
+    rule1 = self.ref1.getischeme( ischeme1 )
+    rule2 = self.ref2.getischeme( ischeme2 )
+    ipoints = numpy.empty( (rule1.points.shape[0],rule2.points.shape[0],self.ndims) )
+    ipoints[:,:,0:self.ref1.ndims] = rule1.points[:,_,:self.ref1.ndims]
+    ipoints[:,:,self.ref1.ndims:self.ndims] = rule2.points[_,:,:self.ref2.ndims]
+    iweights = numeric.const((rule1.weights[:,_] * rule2.weights[_,:] ).ravel(), copy=False) if rule1.weights is not None and rule2.weights is not None else None
+    degree = rule1.degree if rule1.degree is not None and rule1.degree == rule2.degree else None
+    return QuadratureRule( ipoints.reshape(-1, self.ndims), iweights, factors=(rule1,rule2), degree=degree )
 
   @cache.property
   def edge_transforms( self ):
@@ -979,6 +1048,12 @@ class TensorReference( Reference ):
       dofs2 = self.ref2.get_edge_dofs(degree, iedge-self.ref1.nedges)
     return numeric.const(tuple(d1*nd2+d2 for d1, d2 in itertools.product(dofs1, dofs2)), dtype=int)
 
+  def get_dof_vertex_weights(self, degree):
+    weights1 = self.ref1.get_dof_vertex_weights(degree)
+    weights2 = self.ref2.get_dof_vertex_weights(degree)
+    weights = weights1[:,_,:,_] * weights2[_,:,_,:]
+    return numeric.const(weights.reshape(len(weights1)*len(weights2), self.nverts), copy=False)
+
   def get_dof_transpose_map(self, degree, vertex_transpose_map):
     vertex_transpose_map = tuple(vertex_transpose_map)
     nd2 = self.ref2.get_ndofs(degree)
@@ -1245,7 +1320,7 @@ class OwnChildReference( Reference ):
   def volume( self ):
     return self.baseref.volume
 
-  def getischeme( self, ischeme ):
+  def _getischeme( self, ischeme ):
     return self.baseref.getischeme( ischeme )
 
   @property
@@ -1264,6 +1339,9 @@ class OwnChildReference( Reference ):
   def get_dof_transpose_map(self, degree, vertex_transpose_map):
     return self.baseref.get_dof_transpose_map(degree, vertex_transpose_map)
 
+  def get_dof_vertex_weights(self, degree):
+    return self.baseref.get_dof_vertex_weights(degree)
+
 class WithChildrenReference( Reference ):
   'base reference with explicit children'
 
@@ -1333,11 +1411,11 @@ class WithChildrenReference( Reference ):
         rng = numpy.array([],dtype=int)
     return npoints, rng
 
-  def getischeme( self, ischeme ):
-    'get integration scheme'
-    
+  def _getischeme( self, ischeme ):
     if ischeme.startswith('vertex'):
       return self.baseref.getischeme( ischeme )
+    if ischeme.startswith('fit'):
+      return _momentfit( self, parseischeme( ischeme )[1] )
 
     allcoords = []
     allweights = []
@@ -1414,6 +1492,9 @@ class WithChildrenReference( Reference ):
   def get_dof_transpose_map(self, degree, vertex_transpose_map):
     return self.baseref.get_dof_transpose_map(degree, vertex_transpose_map)
 
+  def get_dof_vertex_weights(self, degree):
+    return self.baseref.get_dof_vertex_weights(degree)
+
 class MosaicReference( Reference ):
   'triangulation'
 
@@ -1526,11 +1607,11 @@ class MosaicReference( Reference ):
   def simplices( self ):
     return [ simplex for subvol in self.subrefs for simplex in subvol.simplices ]
 
-  def getischeme( self, ischeme ):
-    'get integration scheme'
-    
+  def _getischeme( self, ischeme ):
     if ischeme.startswith('vertex'):
       return self.baseref.getischeme( ischeme )
+    if ischeme.startswith('fit'):
+      return _momentfit( self, parseischeme( ischeme )[1] )
 
     allpoints, allweights = zip( *[ subvol.getischeme(ischeme) for subvol in self.subrefs ] )
     points = numpy.concatenate( allpoints, axis=0 )
@@ -1572,6 +1653,51 @@ def gauss( degree ):
     _gauss[n] = gaussn = numeric.const((x+1) * .5, copy=False), numeric.const(w[0]**2, copy=False)
   return gaussn
 
+def _simplexgauss( ndims, degree ):
+  '''gauss scheme of the unit simplex, with weights summing to one
+
+  Returns the fully symmetric scheme of ``_simplexorbits`` if it is tabulated
+  for ``degree``, and otherwise the conical product of one dimensional gauss
+  schemes, which is exact for any degree at the expense of more points.'''
+
+  orbits = _simplexorbits[ndims].get( degree )
+  if orbits:
+    points, weights = zip( *[ ( bary[1:], w ) for w, rep in orbits for bary in sorted( set( itertools.permutations(rep) ) ) ] )
+    return numpy.array( points ), numpy.array( weights )
+  points = numpy.zeros( [1,0] )
+  weights = numpy.ones( [1] )
+  for n in range( 1, ndims+1 ):
+    x, w = gauss( degree+n-1 )
+    points = numpy.concatenate( [ numpy.repeat( x, len(points) )[:,_], ( (1-x)[:,_,_] * points ).reshape( len(x)*len(points), n-1 ) ], axis=1 )
+    weights = ( ( w * (1-x)**(n-1) )[:,_] * weights ).ravel()
+  return points, weights * math.factorial(ndims)
+
+def _checkfitdegree( degree ):
+  if not isinstance( degree, int ) or degree < 0:
+    raise ValueError( "integration scheme 'fit' requires a nonnegative integer degree, e.g. 'fit4', got {!r}".format(degree) )
+
+def _momentfit( ref, degree ):
+  '''moment fitted integration scheme of a trimmed reference
+
+  Returns the Gauss points of degree ``2*degree`` of the base reference, with
+  weights such that all polynomials up to ``degree`` integrate identically to
+  the Gauss scheme of degree ``degree`` of the trimmed reference itself. Note
+  that points may lie outside of the trimmed domain. If the latter scheme has
+  fewer points, or the moments cannot be fitted, it is returned instead.'''
+
+  _checkfitdegree( degree )
+  points, weights = ref.getischeme( 'gauss{}'.format(degree) )
+  fitpoints, fitweights = ref.baseref.getischeme( 'gauss{}'.format(2*degree) )
+  if len(fitpoints) >= len(points):
+    return points, weights
+  exponents = numpy.array([ e for e in itertools.product( range(degree+1), repeat=ref.ndims ) if sum(e) <= degree ])
+  moments = numpy.prod( points[_,:,:]**exponents[:,_,:], axis=2 ).dot( weights )
+  monomials = numpy.prod( fitpoints[_,:,:]**exponents[:,_,:], axis=2 )
+  fitweights = numpy.linalg.lstsq( monomials, moments, rcond=-1 )[0]
+  if numpy.abs( monomials.dot(fitweights) - moments ).max() > 1e-12 * numpy.abs(moments).max():
+    return points, weights
+  return fitpoints, fitweights
+
 def getsimplex( ndims ):
   Simplex_by_dim = PointReference, LineReference, TriangleReference, TetrahedronReference
   return Simplex_by_dim[ndims]()
@@ -1588,4 +1714,234 @@ def arglexsort( triangulation ):
   return numpy.argsort( numeric.asobjvector( tuple(tri) for tri in triangulation ) )
 
 
+# SIMPLEX SCHEMES
+
+# Fully symmetric gauss schemes of the unit triangle and tetrahedron, by
+# degree, with positive weights and interior points. They follow from solving
+# the moment equations for a prescribed structure of symmetry orbits, each
+# listed as the weight of its points relative to the volume followed by the
+# barycentric coordinates of a representative point.
+
+_simplexorbits = {
+  2: {
+    8: [ # 16 points
+      ( 0.144315607677787, (0.3333333333333333, 0.3333333333333333, 0.3333333333333333) ),
+      ( 0.03245849762319821, (0.05054722831703089, 0.05054722831703089, 0.8989055433659382) ),
+      ( 0.10321737053471816, (0.17056930775176016, 0.17056930775176016, 0.6588613844964797) ),
+      ( 0.09509163426728458, (0.4592925882927233, 0.4592925882927233, 0.08141482341455342) ),
+      ( 0.02723031417443503, (0.7284923929554044, 0.26311282963463806, 0.008394777409957588) ),
+    ],
+    9: [ # 19 points
+      ( 0.09713579628279899, (0.3333333333333333, 0.3333333333333333, 0.3333333333333333) ),
+      ( 0.07782754100477414, (0.4370895914929369, 0.4370895914929369, 0.12582081701412617) ),
+      ( 0.031334700227138954, (0.48968251919873773, 0.48968251919873773, 0.020634961602524537) ),
+      ( 0.025577675658698142, (0.04472951339445262, 0.04472951339445262, 0.9105409732110947) ),
+      ( 0.07964773892721015, (0.18820353561903277, 0.18820353561903277, 0.6235929287619344) ),
+      ( 0.043283539377289425, (0.03683841205473622, 0.22196298916076562, 0.7411985987844981) ),
+    ],
+    10: [ # 25 points
+      ( 0.07989450474123962, (0.3333333333333333, 0.3333333333333333, 0.3333333333333333) ),
+      ( 0.07112380223237731, (0.42508621060209056, 0.42508621060209056, 0.14982757879581887) ),
+      ( 0.008223818690464239, (0.023308867510000216, 0.023308867510000216, 0.9533822649799996) ),
+      ( 0.045430592296169976, (0.6283074002134926, 0.22376697357697292, 0.14792562620953445) ),
+      ( 0.030886656884564014, (0.8210720699856294, 0.1432953704268671, 0.03563255958750347) ),
+      ( 0.0373598562343053, (0.6113138261813976, 0.02994603195417089, 0.3587401418644315) ),
+    ],
+    11: [ # 28 points
+      ( 0.07992994056151238, (0.3333333333333333, 0.3333333333333333, 0.3333333333333333) ),
+      ( 0.06706060528504962, (0.21554829187647073, 0.21554829187647073, 0.5689034162470585) ),
+      ( 0.012633213105088808, (0.03131237427047116, 0.03131237427047116, 0.9373752514590576) ),
+      ( 0.01110186850109302, (0.49998430632655766, 0.49998430632655766, 3.138734688468148e-05) ),
+      ( 0.06159383697984386, (0.43569417555111345, 0.43569417555111345, 0.1286116488977731) ),
+      ( 0.04061941625516428, (0.1156826024327281, 0.1156826024327281, 0.7686347951345438) ),
+      ( 0.041204426347450994, (0.04808700939312747, 0.31690421352455844, 0.6350087770823141) ),
+      ( 0.01563611349584381, (0.8226642001378219, 0.16158362348160432, 0.015752176380573746) ),
+    ],
+    12: [ # 33 points
+      ( 0.0061662610515590315, (0.021317350453210333, 0.021317350453210333, 0.9573652990935794) ),
+      ( 0.034796112930708945, (0.12757614554158597, 0.12757614554158597, 0.744847708916828) ),
+      ( 0.02573106644045533, (0.4882173897738049, 0.4882173897738049, 0.02356522045239018) ),
+      ( 0.04369254453803839, (0.43972439229446025, 0.43972439229446025, 0.1205512154110795) ),
+      ( 0.06285822421788514, (0.2712103850121159, 0.2712103850121159, 0.45757922997576816) ),
+      ( 0.040371557766380906, (0.2757132696855142, 0.6089432357797878, 0.11534349453469794) ),
+      ( 0.022356773202303427, (0.6958360867878035, 0.02283833222225694, 0.28132558098993954) ),
+      ( 0.01731623110865891, (0.8580140335440726, 0.025734050548330206, 0.11625191590759722) ),
+    ],
+    13: [ # 37 points
+      ( 0.05278328720621089, (0.3333333333333333, 0.3333333333333333, 0.3333333333333333) ),
+      ( 0.04717057998586384, (0.41470044524425065, 0.41470044524425065, 0.1705991095114987) ),
+      ( 0.031199964346917415, (0.11453722221581052, 0.11453722221581052, 0.7709255555683789) ),
+      ( 0.011278389543765626, (0.49503296203498737, 0.49503296203498737, 0.009934075930025266) ),
+      ( 0.03126170418955578, (0.4688293455249854, 0.4688293455249854, 0.062341308950029206) ),
+      ( 0.007968372870575792, (0.024799556991954266, 0.024799556991954266, 0.9504008860160915) ),
+      ( 0.04753860757760458, (0.22923481290924141, 0.22923481290924141, 0.5415303741815172) ),
+      ( 0.017308072680459287, (0.2916823387286536, 0.690333307655753, 0.017984353615593474) ),
+      ( 0.036813546637468546, (0.2690455501541905, 0.6364577795620765, 0.09449667028373299) ),
+      ( 0.015539023557228816, (0.1262989071236642, 0.022268416920832604, 0.8514326759555032) ),
+    ],
+    14: [ # 42 points
+      ( 0.03278835354412534, (0.4176447193404539, 0.4176447193404539, 0.16471056131909223) ),
+      ( 0.014433699669776678, (0.06179988309087269, 0.06179988309087269, 0.8764002338182546) ),
+      ( 0.021883581369428876, (0.4889639103621787, 0.4889639103621787, 0.022072179275642645) ),
+      ( 0.05177410450729157, (0.27347752830883865, 0.27347752830883865, 0.4530449433823227) ),
+      ( 0.04216258873699303, (0.1772055324125435, 0.1772055324125435, 0.645588935174913) ),
+      ( 0.004923403602400087, (0.019390961248701082, 0.019390961248701082, 0.9612180775025978) ),
+      ( 0.014436308113533834, (0.6869801678080878, 0.014646950055654367, 0.29837288213625784) ),
+      ( 0.00501022883850067, (0.0012683309328720583, 0.11897449769695692, 0.8797571713701711) ),
+      ( 0.038571510787060705, (0.5702222908466831, 0.3368614597963451, 0.09291624935697185) ),
+      ( 0.024665753212563663, (0.05712475740364802, 0.7706085547749963, 0.17226668782135568) ),
+    ],
+    15: [ # 49 points
+      ( 0.023571267031906467, (0.3333333333333333, 0.3333333333333333, 0.3333333333333333) ),
+      ( 0.04576001946273759, (0.39315718888435885, 0.39315718888435885, 0.2136856222312823) ),
+      ( 0.012976001283928834, (0.05197643301003439, 0.05197643301003439, 0.8960471339799312) ),
+      ( 0.017066295968006143, (0.49114565807532556, 0.49114565807532556, 0.017708683849348872) ),
+      ( 0.015173149557211708, (0.11022229622834694, 0.11022229622834694, 0.7795554075433061) ),
+      ( 0.0022275744728222297, (0.9625183522300121, 0.00010724289425867315, 0.037374404875729184) ),
+      ( 0.015647850596804427, (0.30674237923596387, 0.6757651098057785, 0.017492510958257657) ),
+      ( 0.02608377963958756, (0.7061100684161982, 0.08689590883549962, 0.2069940227483022) ),
+      ( 0.03417088937929479, (0.09034802175864555, 0.5426199906991497, 0.3670319875422048) ),
+      ( 0.012110153277028272, (0.017436825398454307, 0.8340220693319986, 0.1485411052695471) ),
+      ( 0.027010141659869497, (0.5585845234701126, 0.19316669854521415, 0.2482487779846733) ),
+    ],
+    16: [ # 55 points
+      ( 0.043460120579059604, (0.3333333333333333, 0.3333333333333333, 0.3333333333333333) ),
+      ( 0.003853447725069574, (0.017136631399867194, 0.017136631399867194, 0.9657267372002656) ),
+      ( 0.013259728602233409, (0.06530975340942723, 0.06530975340942723, 0.8693804931811455) ),
+      ( 0.024921413628484174, (0.19856618470663925, 0.19856618470663925, 0.6028676305867215) ),
+      ( 0.03237411336573911, (0.459074625364013, 0.459074625364013, 0.081850749271974) ),
+      ( 0.009686743787224379, (0.4939318130663477, 0.4939318130663477, 0.012136373867304595) ),
+      ( 0.024159854733726355, (0.13223799998317728, 0.13223799998317728, 0.7355240000336454) ),
+      ( 0.027734721704556094, (0.090195372393107, 0.2843834826332343, 0.6254211449736586) ),
+      ( 0.01717044480954078, (0.18199305729718288, 0.03922281360504428, 0.7787841290977728) ),
+      ( 0.003345596675470677, (0.2368940309559012, 0.7630491942442905, 5.677479980825684e-05) ),
+      ( 0.01458267090119172, (0.6279972277748098, 0.021640289572364947, 0.3503624826528252) ),
+      ( 0.03700865243303073, (0.4775859490235139, 0.1936201629855029, 0.3287938879909832) ),
+      ( 0.005453575791794927, (0.009287619482376414, 0.09221778128700156, 0.898494599230622) ),
+    ],
+    17: [ # 60 points
+      ( 0.0244061312795098, (0.4646059655453414, 0.4646059655453414, 0.07078806890931721) ),
+      ( 0.012617688578153359, (0.07031116961136949, 0.07031116961136949, 0.859377660777261) ),
+      ( 0.011214731629937365, (0.4929990848360246, 0.4929990848360246, 0.01400183032795077) ),
+      ( 0.029665116747049268, (0.41719510152416933, 0.41719510152416933, 0.16560979695166134) ),
+      ( 0.036644993373787585, (0.2866125243296446, 0.2866125243296446, 0.42677495134071075) ),
+      ( 0.023372458866916877, (0.1697094309673049, 0.1697094309673049, 0.6605811380653902) ),
+      ( 0.009903324788391695, (0.33817448834951047, 0.649061383192832, 0.012764128457657509) ),
+      ( 0.028054694035236485, (0.551699668372843, 0.2870648665725292, 0.16123546505462777) ),
+      ( 0.006357446957527141, (0.013708002381358352, 0.08572497056489259, 0.900567027053749) ),
+      ( 0.0018035047097654615, (0.9667653870032097, 0.02109099633174036, 0.012143616665049952) ),
+      ( 0.0195372925555086, (0.754839149658472, 0.07369944108848872, 0.1714614092530393) ),
+      ( 0.009416844202847026, (0.014372542103585278, 0.789260755414779, 0.19636670248163568) ),
+      ( 0.02263299917971316, (0.06736764487825027, 0.3105267239929618, 0.6221056311287879) ),
+    ],
+    18: [ # 67 points
+      ( 0.03635573530142666, (0.3333333333333333, 0.3333333333333333, 0.3333333333333333) ),
+      ( 0.016559159952003258, (0.09194774212164318, 0.09194774212164318, 0.8161045157567136) ),
+      ( 0.03330447003339008, (0.3999556280675762, 0.3999556280675762, 0.20008874386484765) ),
+      ( 0.03647508940894361, (0.24226470251427196, 0.24226470251427196, 0.5154705949714561) ),
+      ( 0.012046647633999692, (0.4875803015748696, 0.4875803015748696, 0.02483939685026082) ),
+      ( 0.018949171506778866, (0.46180950640644935, 0.46180950640644935, 0.07638098718710129) ),
+      ( 0.007129326019719006, (0.038830256088685636, 0.038830256088685636, 0.9223394878226288) ),
+      ( 0.013759616234942212, (0.7703723762146754, 0.04580491585986063, 0.183822707925464) ),
+      ( 0.023781910900152834, (0.12269675737192745, 0.6709539851942345, 0.20634925743383803) ),
+      ( 0.0012229481269611037, (0.9723607289627956, 0.02709091099516209, 0.0005483600420423361) ),
+      ( 0.006840110119607196, (0.1081957937910332, 0.013462016741445003, 0.8783421894675218) ),
+      ( 0.01774748910202043, (0.6399880920047146, 0.04026028346990799, 0.31975162452537736) ),
+      ( 0.025482175311824434, (0.5459187753861944, 0.3334935294498811, 0.12058769516392454) ),
+      ( 0.005010660874579707, (0.7589294798551984, 0.005298335186609729, 0.23577218495819185) ),
+      ( 0.004530534502257079, (0.600418954634257, 0.0038976110334733908, 0.3956834343322696) ),
+    ],
+    19: [ # 75 points
+      ( 0.025698974836912965, (0.2954552601867502, 0.2954552601867502, 0.40908947962649955) ),
+      ( 0.0005779645652712905, (0.00495654384250003, 0.00495654384250003, 0.9900869123149999) ),
+      ( 0.02665667196053099, (0.2071871561793536, 0.2071871561793536, 0.5856256876412929) ),
+      ( 0.0201599023024589, (0.1271319017339292, 0.1271319017339292, 0.7457361965321416) ),
+      ( 0.014131991698131298, (0.4859909327370789, 0.4859909327370789, 0.02801813452584223) ),
+      ( 0.02753604521965837, (0.3400973503837927, 0.18523249654837182, 0.47467015306783544) ),
+      ( 0.0034468613429760684, (0.40662110666040696, 0.5916691979156014, 0.0017096954239916862) ),
+      ( 0.014239856475622707, (0.6337168210988673, 0.03419568503722625, 0.33208749386390646) ),
+      ( 0.02070031610572378, (0.518493439579203, 0.3886552981800788, 0.09285126224071816) ),
+      ( 0.01339618123796621, (0.7663858434035056, 0.04644898544848447, 0.18716517114800996) ),
+      ( 0.00847079067365574, (0.8626541141836339, 0.08993573949880457, 0.04741014631756152) ),
+      ( 0.0037024504381848603, (0.9428376389501626, 0.04522118893627116, 0.011941172113566247) ),
+      ( 0.0054810351539702614, (0.007791863245724949, 0.7434575183148757, 0.24875061843939938) ),
+      ( 0.021619061760089542, (0.10466603686472835, 0.2518918024771051, 0.6434421606581666) ),
+      ( 0.004461315577166405, (0.008089099021021583, 0.8625629062856285, 0.1293479946933499) ),
+    ],
+    20: [ # 82 points
+      ( 0.028471099621704046, (0.3333333333333333, 0.3333333333333333, 0.3333333333333333) ),
+      ( 0.012281813754963249, (0.10713931003274554, 0.10713931003274554, 0.7857213799345089) ),
+      ( 0.005476169100300843, (0.040911968624074306, 0.040911968624074306, 0.9181760627518514) ),
+      ( 0.022019844986345908, (0.4382234045415818, 0.4382234045415818, 0.12355319091683636) ),
+      ( 0.01589442477767345, (0.4741197359349148, 0.4741197359349148, 0.0517605281301704) ),
+      ( 0.022959235589868992, (0.211239611999352, 0.211239611999352, 0.5775207760012959) ),
+      ( 0.016989137822923536, (0.1152586019861647, 0.19871754940779868, 0.6860238486060366) ),
+      ( 0.0048233955705233224, (0.8249543459862335, 0.16635036281323434, 0.00869529120053214) ),
+      ( 0.0029295589940122302, (0.9189548105118556, 0.07366823212890991, 0.0073769573592345206) ),
+      ( 0.007224165973057135, (0.5666066423013256, 0.4234552750832203, 0.009938082615454091) ),
+      ( 0.006374642353963309, (0.7041314380081101, 0.00954783833042547, 0.28632072366146444) ),
+      ( 0.02063434290129409, (0.5666356689235724, 0.31190303222660354, 0.12146129884982404) ),
+      ( 0.026424706084830153, (0.21888017031152796, 0.45357735925859444, 0.3275424704298776) ),
+      ( 0.008779016339674222, (0.04323522982340701, 0.11174172755799572, 0.8450230426185973) ),
+      ( 0.01498888085222277, (0.6109833858530139, 0.05082563573856237, 0.3381909784084237) ),
+      ( 0.0010441968873046877, (0.9749066616088422, 0.019231499060147268, 0.005861839331010525) ),
+      ( 0.012393695512001033, (0.047840655881603335, 0.2139488640020499, 0.7382104801163467) ),
+    ],
+  },
+  3: {
+    9: [ # 61 points
+      ( 0.05459926112452167, (0.25, 0.25, 0.25, 0.25) ),
+      ( 0.007713082131634501, (0.8709939522672872, 0.043002015910904294, 0.043002015910904294, 0.043002015910904294) ),
+      ( 0.0169487014291165, (0.018347832331212732, 0.3272173892229291, 0.3272173892229291, 0.3272173892229291) ),
+      ( 0.024685413393582514, (0.5326497350787385, 0.1557834216404205, 0.1557834216404205, 0.1557834216404205) ),
+      ( 0.018587138151816274, (0.18176137123221356, 0.18176137123221356, 0.6044745583021857, 0.032002699233387166) ),
+      ( 0.008815241093956308, (0.4580391969784829, 0.4580391969784829, 0.007699409751340853, 0.07622219629169337) ),
+      ( 0.024451204819916004, (0.3785119339645668, 0.3785119339645668, 0.08176036468583855, 0.16121576738502788) ),
+      ( 0.010480745189156763, (0.03445004120815398, 0.03445004120815398, 0.2147689076741271, 0.716331009909565) ),
+    ],
+    10: [ # 81 points
+      ( 0.047399773556020715, (0.25, 0.25, 0.25, 0.25) ),
+      ( 0.009869159716793365, (0.6570710384279617, 0.11430965385734612, 0.11430965385734612, 0.11430965385734612) ),
+      ( 0.026937059992268697, (0.06324979391443397, 0.3122500686951887, 0.3122500686951887, 0.3122500686951887) ),
+      ( 0.011393881220195242, (0.4104307392189655, 0.4104307392189655, 0.165486025619611, 0.013652495942457987) ),
+      ( 0.010135871679755805, (0.03277946821644262, 0.03277946821644262, 0.34018479408710767, 0.5942562694800071) ),
+      ( 0.012907035798862005, (0.174979342183939, 0.174979342183939, 0.021969470156755946, 0.628071845475366) ),
+      ( 0.025739731980456038, (0.1210501811455894, 0.1210501811455894, 0.47719037990428037, 0.2807092578045408) ),
+      ( 0.006576147277035915, (0.032485281564823, 0.032485281564823, 0.8011772846583445, 0.13385215221200952) ),
+      ( 0.0003619443443392565, (0.006138008824790826, 0.006138008824790826, 0.9429887673452046, 0.04473521500521371) ),
+    ],
+    11: [ # 101 points
+      ( 1.3370532784031417e-05, (0.25, 0.25, 0.25, 0.25) ),
+      ( 0.017906083003643873, (0.5910850614845061, 0.13630497950516463, 0.13630497950516463, 0.13630497950516463) ),
+      ( 0.010495597448187828, (0.7687922052855085, 0.0770692649048305, 0.0770692649048305, 0.0770692649048305) ),
+      ( 0.00197723236398795, (0.9183682335602832, 0.027210588813238935, 0.027210588813238935, 0.027210588813238935) ),
+      ( 0.014940839136352893, (0.025839581418508173, 0.32472013952716394, 0.32472013952716394, 0.32472013952716394) ),
+      ( 0.022966882754129166, (0.10000368640031426, 0.10000368640031426, 0.39999631359968574, 0.39999631359968574) ),
+      ( 0.0011984749490941758, (9.886982827569026e-06, 9.886982827569026e-06, 0.49999011301717244, 0.49999011301717244) ),
+      ( 0.011998303561117078, (0.04332141244845834, 0.04332141244845834, 0.6330588520560124, 0.2802983230470709) ),
+      ( 0.01527328081458151, (0.24248879124147205, 0.24248879124147205, 0.38125017924244525, 0.13377223827461066) ),
+      ( 0.006455700617270436, (0.4401952020789622, 0.4401952020789622, 0.11526839987706898, 0.004341195965006664) ),
+      ( 0.0017756859958854203, (0.013385149586417119, 0.013385149586417119, 0.14581359265402044, 0.8274161081731453) ),
+      ( 0.0035178768140960996, (0.13091864885739662, 0.13091864885739662, 7.740542417618889e-07, 0.7381619282309649) ),
+      ( 0.01712210848364827, (0.21406353808501044, 0.21406353808501044, 0.037649427163243036, 0.5342234966667361) ),
+    ],
+    12: [ # 138 points
+      ( 0.002164425841241387, (0.9166629934269278, 0.02777900219102407, 0.02777900219102407, 0.02777900219102407) ),
+      ( 0.006813833740097081, (0.7753823003492146, 0.07487256655026177, 0.07487256655026177, 0.07487256655026177) ),
+      ( 0.02814506215341347, (0.1298408011061465, 0.2900530662979512, 0.2900530662979512, 0.2900530662979512) ),
+      ( 0.01257078919323531, (0.11180285185145325, 0.11180285185145325, 0.3881971481485468, 0.3881971481485468) ),
+      ( 0.007751020712274063, (0.3712051374212677, 0.3712051374212677, 0.022133253143579272, 0.2354564720138853) ),
+      ( 0.012602022227312767, (0.20773937645839408, 0.20773937645839408, 0.541119126946153, 0.0434021201370588) ),
+      ( 0.004251889302318622, (0.022643976990098656, 0.022643976990098656, 0.5870923979454269, 0.36761964807437575) ),
+      ( 0.011690918177362331, (0.14002962984621636, 0.14002962984621636, 0.24008055407850473, 0.47986018622906257) ),
+      ( 0.008247338406354734, (0.4289700208084074, 0.4289700208084074, 0.11044901571142005, 0.031610942671765146) ),
+      ( 0.0022238970471384935, (0.10810991430623812, 0.10810991430623812, 0.7837759071147159, 4.264272807863456e-06) ),
+      ( 0.011010678956140964, (0.06450893891855398, 0.06450893891855398, 0.6626794227151979, 0.2083026994476942) ),
+      ( 0.001768925252292195, (0.013368472059259479, 0.013368472059259479, 0.8114614904813948, 0.16180156540008617) ),
+      ( 0.002563404038635408, (0.5991669570634945, 4.135396188768516e-05, 0.11582885345912657, 0.2849628355154912) ),
+    ],
+  },
+}
+
+
 # vim:shiftwidth=2:softtabstop=2:expandtab:foldmethod=indent:foldnestmax=2
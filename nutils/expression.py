@@ -9,6 +9,7 @@ This module defines the function :func:`parse`, which parses a tensor
 expression.
 '''
 
+from . import cache
 import re, collections
 
 
@@ -487,6 +488,8 @@ class _ExpressionParser:
     self.functions = functions
     self.arg_shapes = dict(arg_shapes)
     self.default_geometry_name = default_geometry_name
+    self.used_variables = []
+    self.used_args = []
 
   def _consume(self):
     'advance to next token'
@@ -538,6 +541,7 @@ class _ExpressionParser:
     value = self.variables.get(name, None)
     if value is None:
       raise _IntermediateError('Unknown variable: {!r}.'.format(name))
+    self.used_variables.append((name, value))
     return value
 
   def _get_geometry(self, name):
@@ -551,6 +555,8 @@ class _ExpressionParser:
   def _get_arg(self, name, indices):
     'get arg by ``name`` or raise an error'
 
+    if name not in self.used_args:
+      self.used_args.append(name)
     if name in self.arg_shapes:
       shape = self.arg_shapes[name]
       if len(shape) != len(indices):
@@ -1164,7 +1170,41 @@ def parse(expression, variables, functions, indices, arg_shapes={}, default_geom
       ``expression``.
   '''
 
+  # The parsed AST depends on the variables only through their shapes, so it
+  # is cached as a template with placeholders for the variables, keyed on the
+  # shapes of the variables and arguments used in ``expression``.
+  key = expression, indices, default_geometry_name, frozenset(functions.items())
+  names = _parse_cache.get(key)
+  if names is not None:
+    varnames, argnames = names
+    shapes = tuple(getattr(variables.get(name, None), 'shape', None) for name in varnames), tuple(arg_shapes.get(name) for name in argnames)
+    cached = _parse_cache.get((key, shapes))
+    if cached is not None:
+      template, new_arg_shapes = cached
+      arg_shapes = dict(arg_shapes)
+      arg_shapes.update(new_arg_shapes)
+      return _instantiate(template, variables), arg_shapes
   parser = _ExpressionParser(expression, variables, functions, arg_shapes, default_geometry_name)
+  ast, new_arg_shapes = _parse(parser, indices)
+  varnames = {}
+  varshapes = {}
+  for name, value in parser.used_variables:
+    if varnames.setdefault(id(value), name) != name:
+      break # the same object is used under different names, which a template cannot distinguish
+    varshapes[name] = value.shape
+  else:
+    shapes = tuple(varshapes.values()), tuple(arg_shapes.get(name) for name in parser.used_args)
+    _parse_cache[key] = tuple(varshapes), tuple(parser.used_args)
+    _parse_cache[key, shapes] = _template(ast, varnames), {name: new_arg_shapes[name] for name in parser.used_args}
+  arg_shapes = dict(arg_shapes)
+  arg_shapes.update(new_arg_shapes)
+  return ast, arg_shapes
+
+def _parse(parser, indices):
+  '''parse the expression of ``parser`` and return the AST and the shapes of
+  all arguments, see :func:`parse`'''
+
+  expression = parser.expression
   parser.tokenize()
   value = parser.parse_scope('EOF', allow_substitutions=True)
   if indices is None:
@@ -1193,9 +1233,37 @@ def parse(expression, variables, functions, indices, arg_shapes={}, default_geom
       lengths.update((length, val) for length in group)
   for pos in sorted(undetermined):
     raise ExpressionSyntaxError('Length of axis cannot be determined from the expression.' + '\n' + expression + '\n' + ' '*pos + '^')
-  arg_shapes = dict(arg_shapes)
-  for arg, shape in parser.arg_shapes.items():
-    arg_shapes[arg] = tuple(lengths.get(i, i) for i in shape)
+  arg_shapes = {arg: tuple(lengths.get(i, i) for i in shape) for arg, shape in parser.arg_shapes.items()}
   return _replace_lengths(ast, lengths), arg_shapes
 
+class _Variable:
+  '''Placeholder for variable ``name`` in a cached AST.'''
+
+  __slots__ = 'name',
+
+  def __init__(self, name):
+    self.name = name
+
+def _template(ast, names):
+  'replace all variables in ``ast`` with :class:`_Variable` placeholders, given a map of variable ids to ``names``'
+
+  if ast[0] is not None:
+    return (ast[0],) + tuple(_template(arg, names) for arg in ast[1:])
+  elif id(ast[1]) in names:
+    return _(_Variable(names[id(ast[1])]))
+  else:
+    return ast
+
+def _instantiate(ast, variables):
+  'replace all :class:`_Variable` placeholders in ``ast`` with the values in ``variables``'
+
+  if ast[0] is not None:
+    return (ast[0],) + tuple(_instantiate(arg, variables) for arg in ast[1:])
+  elif isinstance(ast[1], _Variable):
+    return _(variables[ast[1].name])
+  else:
+    return ast
+
+_parse_cache = cache.LRUDict(maxsize=1000)
+
 # vim:shiftwidth=2:softtabstop=2:expandtab:foldmethod=indent:foldnestmax=2
@@ -30,8 +30,8 @@ possible only via inverting of the geometry function, which is a fundamentally
 expensive and currently unsupported operation.
 """
 
-from . import util, numpy, numeric, log, core, cache, transform, expression, _
-import sys, warnings, itertools, functools, operator, inspect, numbers, builtins, re, types, collections.abc, math
+from . import util, numpy, numeric, log, core, cache, transform, expression, parallel, _
+import sys, warnings, itertools, functools, operator, inspect, numbers, builtins, re, types, collections.abc, math, os, time, pickle, json, contextlib, multiprocessing
 
 isevaluable = lambda arg: isinstance(arg, Evaluable)
 
@@ -109,6 +109,8 @@ class Evaluable( cache.Immutable ):
     return self.__class__.__name__
 
   def eval(self, **evalargs):
+    if _profile is not None:
+      return self._eval_profiled(_profile, evalargs)
     values = [evalargs]
     for op, indices in self.serialized:
       try:
@@ -123,6 +125,23 @@ class Evaluable( cache.Immutable ):
       values.append(retval)
     return values[-1]
 
+  def _eval_profiled(self, profile, evalargs):
+    values = [evalargs]
+    for op, indices in self.serialized:
+      try:
+        args = [values[i] for i in indices]
+        t0 = time.perf_counter()
+        retval = op.evalf(*args)
+        profile.record(op, time.perf_counter()-t0, retval)
+      except KeyboardInterrupt:
+        raise
+      except:
+        etype, evalue, traceback = sys.exc_info()
+        excargs = etype, evalue, self, values
+        raise EvaluationError(*excargs).with_traceback(traceback)
+      values.append(retval)
+    return values[-1]
+
   @log.title
   def graphviz( self ):
     'create function graph'
@@ -194,6 +213,137 @@ class EvaluationError( Exception ):
 
 EVALARGS = Evaluable(args=())
 
+class Profile:
+  '''Per-node profile of :meth:`Evaluable.eval`.
+
+  Records the number of calls, the cumulative time and the output size in
+  bytes of every evaluated node. Created and activated by :func:`profiling`.
+  Nodes evaluated in forked :func:`nutils.parallel.pariter` processes are
+  collected through a shared memory buffer, allocated by :meth:`prepare` right
+  before forking, and merged on :meth:`merge`. Evaluated nodes are kept alive
+  for the lifetime of the profile, such that their records cannot be confused
+  with those of newer nodes.'''
+
+  def __init__(self, shmsize=1<<22):
+    self.nodes = {} # id -> [label, classname, ncalls, seconds, nbytes]
+    self._ops = {} # id -> op, to keep ids unique
+    self._pid = os.getpid()
+    self._shmsize = shmsize
+    self._shm = None
+
+  def prepare(self):
+    '''Allocate the shared memory buffer for records of forked processes.'''
+
+    if self._shm is None:
+      self._shm = parallel.shzeros(self._shmsize, dtype=numpy.uint8)
+      self._shmused = parallel.shzeros(1, dtype=int)
+      self._lock = multiprocessing.Lock()
+
+  def record(self, op, seconds, value):
+    if self._pid != os.getpid(): # forked: keep only what this process adds
+      self._pid = os.getpid()
+      self.nodes = {}
+    try:
+      stats = self.nodes[id(op)]
+    except KeyError:
+      stats = self.nodes[id(op)] = [op._asciitree_str(), type(op).__name__, 0, 0., 0]
+      self._ops[id(op)] = op
+    stats[2] += 1
+    stats[3] += seconds
+    stats[4] += cache._nbytes(value)
+
+  def dump(self):
+    '''Copy the records of a forked process to shared memory.'''
+
+    if self._shm is None or self._pid != os.getpid() or not self.nodes:
+      return
+    data = pickle.dumps(self.nodes)
+    with self._lock:
+      used = self._shmused[0]
+      if used + 8 + len(data) > len(self._shm):
+        log.warning('profile buffer full, discarding records of process {}'.format(self._pid))
+        return
+      self._shm[used:used+8] = numpy.frombuffer(len(data).to_bytes(8, 'little'), dtype=numpy.uint8)
+      self._shm[used+8:used+8+len(data)] = numpy.frombuffer(data, dtype=numpy.uint8)
+      self._shmused[0] = used + 8 + len(data)
+
+  def merge(self):
+    '''Merge the records dumped by forked processes.'''
+
+    if self._shm is None:
+      return
+    used = self._shmused[0]
+    offset = 0
+    while offset < used:
+      length = int.from_bytes(self._shm[offset:offset+8].tobytes(), 'little')
+      for key, (label, classname, ncalls, seconds, nbytes) in pickle.loads(self._shm[offset+8:offset+8+length].tobytes()).items():
+        stats = self.nodes.setdefault(key, [label, classname, 0, 0., 0])
+        if stats[:2] != [label, classname]: # id of a node that was created after forking
+          stats = self.nodes.setdefault((label, classname), [label, classname, 0, 0., 0])
+        stats[2] += ncalls
+        stats[3] += seconds
+        stats[4] += nbytes
+      offset += 8 + length
+    self._shmused[0] = 0
+
+  @property
+  def byclass(self):
+    '''Dictionary of ``[ncalls, seconds, nbytes]`` per node class.'''
+
+    byclass = {}
+    for label, classname, ncalls, seconds, nbytes in self.nodes.values():
+      stats = byclass.setdefault(classname, [0, 0., 0])
+      stats[0] += ncalls
+      stats[1] += seconds
+      stats[2] += nbytes
+    return byclass
+
+  def asdict(self):
+    return {
+      'classes': {classname: dict(calls=ncalls, seconds=seconds, bytes=nbytes) for classname, (ncalls, seconds, nbytes) in self.byclass.items()},
+      'nodes': [dict(label=label, cls=classname, calls=ncalls, seconds=seconds, bytes=nbytes) for label, classname, ncalls, seconds, nbytes in sorted(self.nodes.values(), key=lambda stats: -stats[3])],
+    }
+
+  @log.title
+  def report(self, path='profile.json', nlines=10):
+    '''Log the most expensive node classes and write all records as json.'''
+
+    for classname, (ncalls, seconds, nbytes) in sorted(self.byclass.items(), key=lambda item: -item[1][1])[:nlines]:
+      log.info('{}: {:.3f}s in {} calls, {:.1f}MB'.format(classname, seconds, ncalls, nbytes/2**20))
+    if path:
+      with core.open_in_outdir(path, 'w') as f:
+        json.dump(self.asdict(), f, indent=1)
+      log.info(path)
+
+_profile = None
+
+@contextlib.contextmanager
+def profiling(path='profile.json'):
+  '''Profile all :meth:`Evaluable.eval` calls within this context.
+
+  When the context exits the profile is reported to the log and written as
+  json to ``path`` in the output directory, unless ``path`` is ``None``.
+  Outside this context evaluation is not instrumented::
+
+      with profiling() as profile:
+        domain.integrate(J(geom), ischeme='gauss2')
+      ncalls, seconds, nbytes = profile.byclass['RootTransform']
+  '''
+
+  global _profile
+  profile = Profile()
+  previous, _profile = _profile, profile
+  parallel.onfork.append(profile.prepare)
+  parallel.onchildexit.append(profile.dump)
+  try:
+    yield profile
+  finally:
+    parallel.onfork.remove(profile.prepare)
+    parallel.onchildexit.remove(profile.dump)
+    _profile = previous
+    profile.merge()
+  profile.report(path)
+
 class Cache(Evaluable):
   def __init__(self):
     super().__init__(args=[EVALARGS])
@@ -465,6 +615,14 @@ class Array( Evaluable ):
   def blocks(self):
     return [(tuple(Range(n) for n in self.shape), self)]
 
+  @cache.property
+  def _evalblocks(self):
+    '''simplified blocks with vanishing argument derivatives, as pairs of
+    index and value evaluables; cached to avoid repeated preparation when the
+    same function is integrated multiple times, e.g. in a newton loop'''
+
+    return tuple((Tuple(ind), f.simplified) for ind, f in blocks(zero_argument_derivatives(self)))
+
   def _asciitree_str(self):
     return '{}({})'.format(type(self).__name__, ','.join(['?' if isarray(sh) else str(sh) for sh in self.shape]))
 
@@ -654,7 +812,7 @@ class InsertAxis(Array):
 
   def evalf(self, func, length):
     length, = length
-    return numeric.const(func).insertaxis(self.axis+1, length)
+    return numeric.const(func, copy=False).insertaxis(self.axis+1, length)
 
   def _derivative(self, var, seen):
     return insertaxis(derivative(self.func, var, seen), self.axis, self.length)
@@ -891,12 +1049,15 @@ class RootCoords(Array):
 
   def __init__(self, ndims:int, trans, points=POINTS):
     self.trans = trans
-    super().__init__(args=[points,trans], shape=[ndims], dtype=float)
+    super().__init__(args=[CACHE,points,trans], shape=[ndims], dtype=float)
 
-  def evalf(self, points, chain):
+  def evalf(self, cache, points, chain):
     'evaluate'
 
-    return transform.apply(chain, points)
+    if not chain or not transform.isaffine(chain):
+      return transform.apply(chain, points)
+    linear, offset = cache[transform.flatten](chain)
+    return numeric.const(numpy.dot(points, linear.T) + offset, copy=False)
 
   def _derivative(self, var, seen):
     if isinstance(var, LocalCoords) and len(var) > 0:
@@ -906,12 +1067,12 @@ class RootCoords(Array):
 class RootTransform(Array):
 
   def __init__(self, ndims:int, nvars:int, trans):
-    super().__init__(args=[trans], shape=(ndims,nvars), dtype=float)
+    super().__init__(args=[CACHE,trans], shape=(ndims,nvars), dtype=float)
 
-  def evalf(self, chain):
+  def evalf(self, cache, chain):
     todims, fromdims = self.shape
     assert not chain or chain[0].todims == todims
-    return transform.linearfrom(chain, fromdims)[_]
+    return cache[transform.linearfrom](chain, fromdims)[_]
 
   def _derivative(self, var, seen):
     return zeros(self.shape+var.shape)
@@ -1804,24 +1965,34 @@ class Sampled( Array ):
     return myvals
 
 class Elemwise(Array):
-
-  def __init__(self, data:tuple, index:asarray, dtype:asdtype):
-    self.data = data
-    ndim = self.data[0].ndim
-    shape = tuple(get([d.shape[i] for d in self.data], iax=0, item=index) for i in range(ndim))
+  '''element-wise data, given as a table ``data`` of distinct arrays and an
+  integer array ``dataindex`` that selects the table entry of every element'''
+
+  def __init__(self, data:tuple, dataindex:numeric.const, index:asarray, dtype:asdtype):
+    assert dataindex.ndim == 1 and dataindex.dtype == int
+    self._unique = data
+    self._dataindex = dataindex
+    self._evaldata = tuple(d[_] for d in data)
+    self.index = index
+    ndim = data[0].ndim
+    shape = tuple(get(numpy.array([d.shape[i] for d in data])[numpy.asarray(dataindex)], iax=0, item=index) for i in range(ndim))
     super().__init__(args=[index], shape=shape, dtype=dtype)
 
+  @property
+  def data(self):
+    return tuple(self._unique[i] for i in self._dataindex)
+
   def evalf(self, index):
     index, = index
-    return self.data[index][_]
+    return self._evaldata[self._dataindex[index]]
 
   def _derivative(self, var, seen):
     return Zeros(self.shape+var.shape, self.dtype)
 
   @cache.property
   def simplified(self):
-    if all(map(numeric.isint, self.shape)) and all(numpy.equal(self.data[0], self.data[i]).all() for i in range(1, len(self.data))):
-      return Constant(self.data[0])
+    if all(map(numeric.isint, self.shape)) and len(self._unique) == 1:
+      return Constant(self._unique[0])
     return self
 
 class Eig( Evaluable ):
@@ -2678,9 +2849,8 @@ class Polyval(Array):
 
   def evalf(self, cache, points, coeffs):
     assert points.shape[1] == self.points_ndim
-    for igrad in range(self.ngrad):
-      coeffs = cache[numeric.poly_grad](coeffs, self.points_ndim)
-    return cache[numeric.poly_eval](coeffs, points)
+    table = cache[numeric.poly_vandermonde](points, coeffs.shape[coeffs.ndim-self.points_ndim:], self.ngrad)
+    return cache[numeric.poly_dot](coeffs, table, self.points_ndim)
 
   def _derivative(self, var, seen):
     # Derivative to argument `points`.
@@ -3081,33 +3251,43 @@ def polyfunc(coeffs, dofs, ndofs, transforms, *, issorted=True):
   '''
 
   transforms = tuple(transforms)
-  if issorted:
-    dofs = tuple(dofs)
-    coeffs = tuple(coeffs)
-  else:
-    dofsmap = dict(zip(transforms, dofs))
-    coeffsmap = dict(zip(transforms, coeffs))
-    transforms = tuple(sorted(transforms))
-    dofs = tuple(dofsmap[trans] for trans in transforms)
-    coeffs = tuple(coeffsmap[trans] for trans in transforms)
+  dofs = tuple(dofs)
+  coeffs, coeffsindex = _uniquedata(coeffs)
+  if not issorted:
+    order = sorted(range(len(transforms)), key=transforms.__getitem__)
+    transforms = tuple(transforms[i] for i in order)
+    dofs = tuple(dofs[i] for i in order)
+    coeffsindex = coeffsindex[order]
   fromdims, = set(transform.fromdims for transform in transforms)
   promote = Promote(fromdims, trans=TRANS)
   index = FindTransform(transforms, promote)
   dofmap = DofMap(dofs, index=index)
   depth = Get([len(trans) for trans in transforms], axis=0, item=index)
   points = RootCoords(fromdims, TailOfTransform(promote, depth))
-  func = Polyval(Elemwise(coeffs, index, dtype=float), points, fromdims)
+  func = Polyval(Elemwise(coeffs, coeffsindex, index, dtype=float), points, fromdims)
   return Inflate(func, dofmap, ndofs, axis=0)
 
 def elemwise( fmap, shape, default=None ):
   if default is not None:
     raise NotImplemented('default is not supported anymore')
   transforms = tuple(sorted(fmap))
-  values = tuple(fmap[trans] for trans in transforms)
+  values, valuesindex = _uniquedata(fmap[trans] for trans in transforms)
   fromdims, = set(transform.fromdims for transform in transforms)
   promote = Promote(fromdims, trans=TRANS)
   index = FindTransform(transforms, promote)
-  return Elemwise(values, index, dtype=float)
+  return Elemwise(values, valuesindex, index, dtype=float)
+
+def _uniquedata(values):
+  '''Return the distinct arrays in iterable ``values`` as a tuple of
+  :class:`nutils.numeric.const` objects, and an integer array that maps every
+  item of ``values`` to its entry in this tuple. Arrays are compared by
+  content, such that only one copy of equal arrays is retained.'''
+
+  unique = {}
+  index = []
+  for value in values:
+    index.append(unique.setdefault(numeric.const(value), len(unique)))
+  return tuple(sorted(unique, key=unique.__getitem__)), numeric.const(index, dtype=int)
 
 def take(arg, index, axis):
   arg = asarray(arg)
@@ -3262,6 +3442,34 @@ def _eval_ast(ast, functions):
   else:
     raise ValueError('unknown opcode: {!r}'.format(op))
 
+class _EvalKey:
+  '''hashable key for the evaluation of ``ast`` with ``functions``, that
+  distinguishes constants of different type, e.g. ``1`` and ``1.``'''
+
+  __slots__ = 'ast', 'functions', 'key', 'hash'
+
+  def __init__(self, ast, functions):
+    self.ast = ast
+    self.functions = functions
+    self.key = id(functions), self._typed(ast)
+    self.hash = hash(self.key)
+
+  @classmethod
+  def _typed(cls, ast):
+    op, *args = ast
+    if op is None:
+      value, = args
+      return type(value), value
+    return (op,) + tuple(map(cls._typed, args))
+
+  def __hash__(self):
+    return self.hash
+
+  def __eq__(self, other):
+    return self.hash == other.hash and self.key == other.key and self.functions is other.functions
+
+_eval_ast_cached = cache.Wrapper(lambda key: _eval_ast(key.ast, key.functions), maxsize=256)
+
 class Namespace:
   '''Namespace for :class:`Array` objects supporting assignments with tensor expressions.
 
@@ -3386,7 +3594,7 @@ class Namespace:
     '''Get attribute ``name``.'''
 
     if name.startswith('eval_'):
-      return lambda expr: _eval_ast(expression.parse(expr, variables=self._attributes, functions=self._functions_nargs, indices=name[5:], arg_shapes=self._arg_shapes, default_geometry_name=self.default_geometry_name)[0], self._functions)
+      return lambda expr: _eval_ast_cached(_EvalKey(expression.parse(expr, variables=self._attributes, functions=self._functions_nargs, indices=name[5:], arg_shapes=self._arg_shapes, default_geometry_name=self.default_geometry_name)[0], self._functions))
     try:
       return self._attributes[name]
     except KeyError:
@@ -3406,7 +3614,7 @@ class Namespace:
       indices = indices[1:] if indices else ''
       if isinstance(value, str):
         ast, arg_shapes = expression.parse(value, variables=self._attributes, functions=self._functions_nargs, indices=indices, arg_shapes=self._arg_shapes, default_geometry_name=self.default_geometry_name)
-        value = _eval_ast(ast, self._functions)
+        value = _eval_ast_cached(_EvalKey(ast, self._functions))
         self._arg_shapes.update(arg_shapes)
       else:
         assert not indices
@@ -3431,7 +3639,7 @@ class Namespace:
       ast = expression.parse(expr, variables=self._attributes, functions=self._functions_nargs, indices=None, arg_shapes=self._arg_shapes, default_geometry_name=self.default_geometry_name)[0]
     except expression.AmbiguousAlignmentError:
       raise ValueError('`expression @ Namespace` cannot be used because the expression has more than one dimension.  Use `Namespace.eval_...(expression)` instead')
-    return _eval_ast(ast, self._functions)
+    return _eval_ast_cached(_EvalKey(ast, self._functions))
 
 def normal(arg, exterior=False):
   assert arg.ndim == 1
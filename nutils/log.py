@@ -449,20 +449,57 @@ def path( *args ):
   warnings.warn( "log level 'path' will be removed in the future, please use any other log level instead", DeprecationWarning )
   return _print( 'info', *args )
 
-def range( title, *args ):
+def _ratelimited( title, gettext, iterable, interval ):
+  '''Progress logger that enters a single context, the title of which is
+  updated at most once every ``interval`` seconds. No context is entered at all
+  if the current verbosity level excludes info messages.'''
+
+  if core.getprop( 'verbose', len(LEVELS) ) <= LEVELS.index( 'info' ):
+    yield from iterable
+    return
+  log = _getlog()
+  context = None
+  tnext = time.perf_counter()
+  try:
+    for index, item in _enumerate( iterable ):
+      t = time.perf_counter()
+      if t >= tnext:
+        if context is not None:
+          context.__exit__( None, None, None )
+        context = log.context( gettext( index, item ) )
+        context.__enter__()
+        tnext = t + interval
+      yield item
+  finally:
+    if context is not None:
+      context.__exit__( None, None, None )
+
+def range( title, *args, interval=None ):
   '''Progress logger identical to built in range'''
 
   items = _range( *args )
+  if interval is not None:
+    yield from _ratelimited( title, lambda index, item: '{} {} ({:.0f}%)'.format( title, item, item * 100 / len(items) ), items, interval )
+    return
   log = _getlog()
   for item in items:
     with log.context( '{} {} ({:.0f}%)'.format( title, item, item * 100 / len(items) ) ):
       yield item
 
-def iter( title, iterable, length=None ):
-  '''Progress logger identical to built in iter'''
+def iter( title, iterable, length=None, *, interval=None ):
+  '''Progress logger identical to built in iter
+
+  If ``interval`` is specified, the progress context is updated at most once
+  every ``interval`` seconds rather than for every item, which considerably
+  reduces the logging overhead of tight loops. Note that in this mode the
+  context of messages that are logged from within the loop shows the index at
+  the time of the last update.'''
 
   if length is None:
     length = _len(iterable)
+  if interval is not None:
+    yield from _ratelimited( title, lambda index, item: '{} {} ({:.0f}%)'.format( title, index, 100 * index / length ) if length else '{} {}'.format( title, index ), iterable, interval )
+    return
   log = _getlog()
   it = _iter( iterable )
   for index in itertools.count():
@@ -475,20 +512,23 @@ def iter( title, iterable, length=None ):
       except StopIteration:
         break
 
-def enumerate( title, iterable ):
+def enumerate( title, iterable, *, interval=None ):
   '''Progress logger identical to built in enumerate'''
 
-  return iter( title, _enumerate(iterable), length=_len(iterable) )
+  return iter( title, _enumerate(iterable), length=_len(iterable), interval=interval )
 
-def zip( title, *iterables ):
+def zip( title, *iterables, interval=None ):
   '''Progress logger identical to built in enumerate'''
 
   lengths = [ _len(iterable) for iterable in iterables ]
-  return iter( title, _zip(*iterables), length=all(lengths) and min(lengths) )
+  return iter( title, _zip(*iterables), length=all(lengths) and min(lengths), interval=interval )
 
-def count( title, start=0, step=1 ):
+def count( title, start=0, step=1, *, interval=None ):
   '''Progress logger identical to itertools.count'''
 
+  if interval is not None:
+    yield from _ratelimited( title, lambda index, item: '{} {}'.format( title, item ), itertools.count(start,step), interval )
+    return
   log = _getlog()
   for item in itertools.count(start,step):
     with log.context( '{} {}'.format( title, item ) ):
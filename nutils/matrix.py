@@ -149,6 +149,9 @@ class ScipyMatrix( Matrix ):
       log.info( 'solving system using sparse direct solver' )
       x = solverfun( A, b )
       solverinfo( A, b, x )
+      peakrss = util.peakrss()
+      if peakrss is not None:
+        log.debug( 'peak memory usage', util.memstr(peakrss) )
     else:
       # keep scipy from making things circular by shielding the nature of A
       A = scipy.sparse.linalg.LinearOperator( A.shape, A.__mul__, dtype=float )
@@ -174,10 +177,13 @@ class ScipyMatrix( Matrix ):
     A = self.core[I,:][:,J]
     assert A.shape[0] == A.shape[1], 'constrained matrix must be square'
     log.info( 'building %s preconditioner' % name )
-    if name == 'splu':
-      precon = scipy.sparse.linalg.splu( A.tocsc() ).solve
-    elif name == 'spilu':
-      precon = scipy.sparse.linalg.spilu( A.tocsc(), drop_tol=1e-5, fill_factor=None, drop_rule=None, permc_spec=None, diag_pivot_thresh=None, relax=None, panel_size=None, options=None ).solve
+    if name in ('splu', 'spilu'):
+      if name == 'splu':
+        lu = scipy.sparse.linalg.splu( A.tocsc() )
+      else:
+        lu = scipy.sparse.linalg.spilu( A.tocsc(), drop_tol=1e-5, fill_factor=None, drop_rule=None, permc_spec=None, diag_pivot_thresh=None, relax=None, panel_size=None, options=None )
+      log.debug( 'factorization fill-in: {} nonzeros in L+U, {:.1f} times {} in A, {}'.format( lu.nnz, lu.nnz / max(A.nnz, 1), A.nnz, util.memstr(lu.nnz*(A.dtype.itemsize+4)) ) )
+      precon = lu.solve
     elif name == 'diag':
       precon = numpy.reciprocal( A.diagonal() ).__mul__
     else:
@@ -231,6 +237,7 @@ def assemble( data, index, shape, force_dense=False ):
   elif len(shape) == 2 and not force_dense:
     import scipy.sparse.linalg
     csr = scipy.sparse.csr_matrix( (data,index), shape )
+    log.debug( 'allocated', util.memstr(csr.data.nbytes+csr.indices.nbytes+csr.indptr.nbytes), 'for', csr.nnz, 'nonzeros' )
     retval = ScipyMatrix( csr )
   else:
     flatindex = numpy.dot( numpy.cumprod( (1,)+shape[:0:-1] )[::-1], index )
@@ -241,6 +248,50 @@ def assemble( data, index, shape, force_dense=False ):
   log.debug( 'assembled', '%s(%s)' % ( retval.__class__.__name__, ','.join( str(n) for n in shape ) ) )
   return retval
 
+class CSRAccumulator( object ):
+  '''accumulate coo chunks into a sparse matrix
+
+  The sparsity pattern is built first from the indices of all chunks via
+  :meth:`addpattern`, after which the values of the same chunks are summed
+  into it via :meth:`add`. Peak memory approaches the size of the final
+  matrix rather than that of the combined coo data.'''
+
+  def __init__( self, shape ):
+    assert len(shape) == 2
+    self.shape = shape
+    self._pattern = numpy.empty( 0, dtype=int ) # sorted flat indices
+    self._data = None
+
+  def addpattern( self, index ):
+    assert self._data is None, 'pattern is fixed after the first add'
+    flat = numpy.unique( index[0] * self.shape[1] + index[1] )
+    pos = numpy.searchsorted( self._pattern, flat )
+    isnew = pos == len(self._pattern)
+    isnew[~isnew] = self._pattern[pos[~isnew]] != flat[~isnew]
+    self._pattern = numpy.insert( self._pattern, pos[isnew], flat[isnew] ) # merge without resorting
+
+  def add( self, data, index ):
+    if self._data is None:
+      self._data = numpy.zeros( len(self._pattern), dtype=float )
+    pos = numpy.searchsorted( self._pattern, index[0] * self.shape[1] + index[1] )
+    if len(pos):
+      offset = pos.min()
+      pos -= offset
+      summed = numpy.bincount( pos, data )
+      self._data[offset:offset+len(summed)] += summed
+
+  def tomatrix( self ):
+    import scipy.sparse
+    nrows, ncols = self.shape
+    data = self._data if self._data is not None else numpy.zeros( len(self._pattern), dtype=float )
+    itype = numpy.int32 if max( len(self._pattern), ncols ) < 2**31 else int
+    indptr = numpy.searchsorted( self._pattern, numpy.arange( nrows+1 ) * ncols ).astype( itype )
+    indices = numpy.remainder( self._pattern, ncols, out=self._pattern ).astype( itype )
+    self._pattern = self._data = None
+    csr = scipy.sparse.csr_matrix( (data,indices,indptr), self.shape )
+    log.debug( 'allocated', util.memstr(csr.data.nbytes+csr.indices.nbytes+csr.indptr.nbytes), 'for', csr.nnz, 'nonzeros' )
+    return ScipyMatrix( csr )
+
 def parsecons( constrain, lconstrain, rconstrain, shape ):
   'parse constraints'
 
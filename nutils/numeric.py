@@ -10,7 +10,7 @@
 The numeric module provides methods that are lacking from the numpy module.
 """
 
-import numpy, numbers, builtins
+import numpy, numbers, builtins, itertools
 
 _abc = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ' # indices for einsum
 
@@ -617,9 +617,14 @@ class const:
     self = object.__new__(cls)
     self.__base = numpy.array(base, dtype=dtype) if copy or not isinstance(base, numpy.ndarray) or dtype and dtype != base.dtype else base
     self.__base.flags.writeable = False
-    self.__hash = hash((self.__base.shape, self.__base.dtype, tuple(self.__base.flat[::self.__base.size//32+1]) if self.__base.size else ())) # NOTE special case self.__base.size == 0 necessary for numpy<1.12
+    self.__hash = None # computed on first use, as most evaluation results are never hashed
     return self
 
+  def __hash__(self):
+    if self.__hash is None:
+      self.__hash = hash((self.__base.shape, self.__base.dtype, tuple(self.__base.flat[::self.__base.size//32+1]) if self.__base.size else ())) # NOTE special case self.__base.size == 0 necessary for numpy<1.12
+    return self.__hash
+
   @property
   def __array_struct__(self):
     return self.__base.__array_struct__
@@ -634,7 +639,7 @@ class const:
       return False
     if self.__base is other.__base:
       return True
-    if self.__hash != other.__hash or self.__base.dtype != other.__base.dtype or self.__base.shape != other.__base.shape or numpy.not_equal(self.__base, other.__base).any():
+    if hash(self) != hash(other) or self.__base.dtype != other.__base.dtype or self.__base.shape != other.__base.shape or numpy.not_equal(self.__base, other.__base).any():
       return False
     # deduplicate
     self.__base = other.__base
@@ -693,7 +698,6 @@ class const:
   __floordiv__ = lambda self, other: self.__base.__floordiv__(other)
   __rfloordiv__ = lambda self, other: self.__base.__rfloordiv__(other)
   __pow__ = lambda self, other: self.__base.__pow__(other)
-  __hash__ = lambda self: self.__hash
   __int__ = lambda self: self.__base.__int__()
   __float__ = lambda self: self.__base.__float__()
   __abs__ = lambda self: self.__base.__abs__()
@@ -719,9 +723,11 @@ class const:
 
   def insertaxis(self, axis, length):
     base = self.__base
-    return const(numpy.lib.stride_tricks.as_strided(base,
-      shape=base.shape[:axis]+(length,)+base.shape[axis:],
-      strides=base.strides[:axis]+(0,)+base.strides[axis:]))
+    shape = base.shape[:axis]+(length,)+base.shape[axis:]
+    strides = base.strides[:axis]+(0,)+base.strides[axis:]
+    # NOTE the ndarray constructor is much cheaper than as_strided, but requires a contiguous buffer
+    return const(numpy.ndarray(buffer=base, dtype=base.dtype, shape=shape, strides=strides) if base.flags.c_contiguous
+            else numpy.lib.stride_tricks.as_strided(base, shape=shape, strides=strides))
 
 def binom(n, k):
   a = b = 1
@@ -757,18 +763,48 @@ def poly_grad(coeffs, ndim):
   dcoeffs = numpy.stack(dcoeffs, axis=coeffs.ndim-ndim)
   return const(dcoeffs, copy=False)
 
+def poly_vandermonde(points, shape, ngrad=0):
+  '''monomials and their derivatives at points
+
+  Returns the array of shape ``(len(points),)+(ndim,)*ngrad+shape`` of all
+  ``ngrad``-th derivatives of the monomials with exponents smaller than
+  ``shape``, such that polynomials with coefficients of this shape are
+  evaluated by :func:`poly_dot`.'''
+
+  npoints, ndim = points.shape
+  assert len(shape) == ndim
+  table = numpy.empty((npoints,)+(ndim,)*ngrad+tuple(shape), dtype=float)
+  for grad in itertools.product(range(ndim), repeat=ngrad):
+    values = numpy.ones((npoints,)+(1,)*ndim)
+    for i, n in enumerate(shape):
+      m = grad.count(i)
+      exponents = numpy.arange(n)
+      factors = numpy.prod([exponents-j for j in range(m)], axis=0) if m else 1
+      powers = factors * numpy.asarray(points)[:,i,numpy.newaxis]**numpy.maximum(exponents-m, 0)
+      values = values * powers.reshape((npoints,)+(1,)*i+(n,)+(1,)*(ndim-i-1))
+    table[(slice(None),)+grad] = values
+  return const(table, copy=False)
+
+def poly_dot(coeffs, table, ndim):
+  '''evaluate polynomials by contraction with a :func:`poly_vandermonde` table'''
+
+  npoints = table.shape[0]
+  monomials = table.shape[table.ndim-ndim:]
+  assert coeffs.shape[coeffs.ndim-ndim:] == monomials
+  shape = coeffs.shape[1:coeffs.ndim-ndim]
+  gradshape = table.shape[1:table.ndim-ndim]
+  nmonomials = int(numpy.prod(monomials, dtype=int))
+  table = numpy.asarray(table).reshape(npoints, int(numpy.prod(gradshape, dtype=int)), nmonomials)
+  coeffs = numpy.asarray(coeffs).reshape(coeffs.shape[0], int(numpy.prod(shape, dtype=int)), nmonomials)
+  if len(coeffs) == 1:
+    result = numpy.dot(table, coeffs[0].T).transpose(0, 2, 1)
+  else:
+    result = numpy.einsum('pgm,psm->psg', table, coeffs)
+  return const(result.reshape((npoints,)+shape+gradshape), copy=False)
+
 def poly_eval(coeffs, points):
   assert points.ndim == 2
-  if coeffs.shape[-1] == 0:
-    return const.full((points.shape[0],)+coeffs.shape[1:coeffs.ndim-points.shape[-1]], 0.)
-  for dim in reversed(range(points.shape[-1])):
-    result = numpy.empty((points.shape[0], *coeffs.shape[1:-1]), dtype=float)
-    result[:] = coeffs[...,-1]
-    points_dim = points[(slice(None),dim,*(numpy.newaxis,)*(result.ndim-1))]
-    for j in reversed(range(coeffs.shape[-1]-1)):
-      result *= points_dim
-      result += coeffs[...,j]
-    coeffs = result
-  return const(coeffs, copy=False)
+  ndim = points.shape[-1]
+  return poly_dot(coeffs, poly_vandermonde(points, coeffs.shape[coeffs.ndim-ndim:]), ndim)
 
 # vim:shiftwidth=2:softtabstop=2:expandtab:foldmethod=indent:foldnestmax=2
@@ -13,10 +13,12 @@ platforms, notably excluding Windows. On unsupported platforms parallel features
 will disable and a warning is printed.
 """
 
-from . import core, log, numpy, numeric
+from . import core, log, numpy, numeric, util
 import os, sys, multiprocessing, tempfile, mmap, traceback, signal
 
 procid = None # current process id, None for unforked
+onfork = [] # callbacks run by the primary process right before forking pariter processes
+onchildexit = [] # callbacks run by forked pariter processes right before exiting
 
 def shzeros( shape, dtype=float ):
   '''create zero-initialized array in shared memory'''
@@ -99,6 +101,9 @@ def pariter( iterable, nprocs ):
     yield from iterable
     return
 
+  for callback in onfork:
+    callback()
+
   shared_iter = multiprocessing.RawValue( 'i', nprocs ) # shared integer pointing at first unyielded item
   lock = multiprocessing.Lock() # lock to avoid race conditions in incrementing shared_iter
   children = [] # list of forked processes, non-empty only in primary process
@@ -144,7 +149,14 @@ def pariter( iterable, nprocs ):
   finally:
 
     if procid != 0: # before anything else can fail:
-      os._exit( fail ) # cumminicate exit status to main process
+      try:
+        for callback in onchildexit:
+          callback()
+        peakrss = util.peakrss()
+        if peakrss is not None:
+          log.debug( 'process {} peak memory usage {}'.format( procid, util.memstr(peakrss) ) )
+      finally:
+        os._exit( fail ) # cumminicate exit status to main process
 
     procid = None # unset global variable
     totalfail = fail
@@ -747,6 +747,163 @@ class VTKFile( BasePlot ):
 
     self._dataarrays[location].append(( name, extdata ))
 
+class XDMFFile( BasePlot ):
+  '''XDMF time series
+
+  Time series writer that stores the mesh only once. Geometry, connectivity
+  and all subsequent data arrays are appended as raw binary blocks to a single
+  container file ``name.bin``, which is referenced by offset from the light
+  weight XDMF index ``name.xmf`` that is (re)written on :meth:`save`. Data is
+  written to disk as soon as it is added, so that arrays need not be kept in
+  memory for the duration of a simulation.
+
+  Examples
+  --------
+
+  ::
+
+      with XDMFFile('solution') as xdmf:
+        xdmf.unstructuredgrid(domain.simplex.elem_eval(geom, ischeme='vtk', separate=True))
+        for istep, lhs in enumerate(solver.impliciteuler(...)):
+          xdmf.timestep(istep*timestep)
+          xdmf.pointdataarray('u', domain.simplex.elem_eval(u, ischeme='vtk', separate=True, arguments=dict(lhs=lhs)))
+  '''
+
+  _xdmfdtypes = (
+    ( numpy.dtype('u1'), 'UChar', 1 ),
+    ( numpy.dtype('i1'), 'Char', 1 ),
+    ( numpy.dtype('u4'), 'UInt', 4 ),
+    ( numpy.dtype('i4'), 'Int', 4 ),
+    ( numpy.dtype('i8'), 'Int', 8 ),
+    ( numpy.float32, 'Float', 4 ),
+    ( numpy.float64, 'Float', 8 ),
+  )
+
+  def __init__( self, name=None, index=None, ndigits=0 ):
+    'constructor'
+
+    BasePlot.__init__( self, name, ndigits=ndigits, index=index )
+    # the index is determined once, such that the binary container and all
+    # (re)writes of the index file share the same name
+    self._xmfpath = self.getpath( None, None, 'xmf' )
+    self._binpath = self._xmfpath[:-3] + 'bin'
+    self._bin = core.open_in_outdir( self._binpath, 'wb' )
+    self._mesh = None
+    self._steps = []
+
+  def _writearray( self, array ):
+    assert self._bin is not None, 'file is closed'
+    array = numpy.ascontiguousarray( array )
+    for dtype, numbertype, precision in self._xdmfdtypes:
+      if dtype == array.dtype:
+        break
+    else:
+      raise ValueError( 'No matching XDMF dtype for {}.'.format( array.dtype ) )
+    offset = self._bin.tell()
+    array.tofile( self._bin )
+    return '<DataItem Dimensions="{}" NumberType="{}" Precision="{}" Format="Binary" Endian="{}" Seek="{}">{}</DataItem>'.format(
+      ' '.join( str(n) for n in array.shape ), numbertype, precision, sys.byteorder.capitalize(), offset, self._binpath )
+
+  def unstructuredgrid( self, cellpoints, npars=None ):
+    '''set unstructured grid
+
+    The grid is written immediately and shared by all time steps.'''
+
+    assert self._mesh is None, 'grid can be set only once'
+
+    points = numpy.concatenate( cellpoints, axis=0 ).astype( numpy.float64 )
+    npoints, ndims = points.shape
+    if ndims < 3:
+      points = numpy.concatenate( [ points, numpy.zeros( (npoints,3-ndims) ) ], axis=1 )
+    assert points.shape[1] == 3
+
+    if npars is None:
+      npars = ndims
+    assert npars in (1,2,3)
+
+    # xdmf mixed topology codes, points are expected in vtk order
+    celltypemap = { 2: (2,2), 3: (4,), 4: (5,) if npars == 2 else (6,), 5: (7,), 6: (8,), 8: (9,) }
+
+    ncells = len( cellpoints )
+    offsets = numpy.cumsum( [0] + [ len(pts) for pts in cellpoints ] )
+    cells = numpy.concatenate( [ celltypemap[len(pts)] + tuple( numpy.arange( offset, offset+len(pts) ) ) for offset, pts in zip( offsets, cellpoints ) ] ).astype( numpy.int32 )
+
+    self._mesh = npoints, ncells, \
+      '<Topology TopologyType="Mixed" NumberOfElements="{}">{}</Topology>'.format( ncells, self._writearray( cells ) ), \
+      '<Geometry GeometryType="XYZ">{}</Geometry>'.format( self._writearray( points ) )
+
+  def timestep( self, time ):
+    'start a new time step, to which subsequent data arrays are added'
+
+    assert self._mesh is not None, 'Grid not specified'
+    self._steps.append(( time, [] ))
+
+  def celldataarray( self, name, data ):
+    'add cell array to current time step'
+    self._adddataarray( name, data, 'Cell' )
+
+  def pointdataarray( self, name, data ):
+    'add point array to current time step'
+    self._adddataarray( name, data, 'Node' )
+
+  def _adddataarray( self, name, data, center ):
+    assert self._steps, 'no time step started'
+    npoints, ncells = self._mesh[:2]
+
+    assert len(data) == ncells, 'data mismatch: expected length {}, got {}'.format( ncells, len(data) )
+
+    if center == 'Node':
+      data = numpy.concatenate( data, axis=0 )
+      assert npoints == data.shape[0], 'Point data array should have {} entries'.format(npoints)
+    else:
+      data = numpy.asarray( data )
+
+    assert data.ndim <= 3, 'data array should have at most 3 axes: {} and components (optional)'.format(center.lower())
+
+    extshp = (data.shape[0],)+(3,)*(data.ndim-1)
+    if data.shape == extshp:
+      extdata = data
+    else:
+      extdata = numpy.zeros( extshp, dtype=data.dtype )
+      extdata[tuple(slice(sh) for sh in data.shape)] = data
+    if data.ndim == 3:
+      extdata = extdata.reshape( len(extdata), 9 )
+
+    attributetype = ('Scalar','Vector','Tensor')[data.ndim-1]
+    self._steps[-1][1].append( '<Attribute Name="{}" AttributeType="{}" Center="{}">{}</Attribute>'.format( name, attributetype, center, self._writearray( extdata ) ) )
+
+  def save( self, name=None, index=None ):
+    assert self._mesh is not None, 'Grid not specified'
+    if self._bin is not None:
+      self._bin.flush()
+    topology, geometry = self._mesh[2:]
+    if name in (None,self.name) and index in (None,self.index):
+      path = self._xmfpath
+    else:
+      path = self.getpath( name, index, 'xmf' )
+    with core.open_in_outdir( path, 'w' ) as xmf:
+      xmf.write( '<?xml version="1.0" ?>\n' )
+      xmf.write( '<Xdmf Version="3.0">\n<Domain>\n' )
+      xmf.write( '<Grid Name="{}" GridType="Collection" CollectionType="Temporal">\n'.format( self.name ) )
+      for istep, (time, attributes) in enumerate( self._steps or [(0,[])] ):
+        xmf.write( '<Grid Name="step{}" GridType="Uniform">\n'.format( istep ) )
+        xmf.write( '<Time Value="{!r}"/>\n'.format( float(time) ) )
+        xmf.write( topology + '\n' )
+        xmf.write( geometry + '\n' )
+        for attribute in attributes:
+          xmf.write( attribute + '\n' )
+        xmf.write( '</Grid>\n' )
+      xmf.write( '</Grid>\n</Domain>\n</Xdmf>\n' )
+    log.user( path )
+
+  def close( self ):
+    'close binary container'
+
+    if self._bin is None:
+      return # already closed
+    self._bin.close()
+    self._bin = None
+
 
 ## INTERNAL HELPER FUNCTIONS
 
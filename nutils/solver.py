@@ -38,7 +38,7 @@ In addition to ``solve_linear`` the solver module defines ``newton`` and
 time dependent problems.
 """
 
-from . import function, cache, log, util, numeric
+from . import function, cache, log, util, numeric, matrix
 import numpy, itertools, functools, numbers, collections
 
 
@@ -50,6 +50,27 @@ class Integral:
     shapes = {integrand.shape for integrand in self._integrands.values()}
     assert len(shapes) == 1, 'incompatible shapes: {}'.format(' != '.join(str(shape) for shape in shapes))
     self.shape, = shapes
+    self._derivatives = {} # target -> Integral
+    self._seen = {} # (target, argshape) -> {func: derivative}, shared between related integrals
+
+  def _derived(self, integrands, *others):
+    '''new integral that shares derivative bookkeeping with self and others
+
+    Memo dictionaries are shared by reference where possible; if self and
+    others hold different memos for the same target they are merged into a
+    new dictionary, leaving those of the operands untouched. Memoized
+    derivatives are retained for as long as any integral sharing them is
+    alive.'''
+
+    integral = Integral(integrands)
+    integral._seen = dict(self._seen)
+    for other in others:
+      for key, seen in other._seen.items():
+        if key not in integral._seen:
+          integral._seen[key] = seen
+        elif integral._seen[key] is not seen:
+          integral._seen[key] = {**integral._seen[key], **seen}
+    return integral
 
   @classmethod
   def multieval(cls, *integrals, fcache=None, arguments=None):
@@ -74,21 +95,22 @@ class Integral:
     return retval
 
   def derivative(self, target):
+    try:
+      return self._derivatives[target]
+    except KeyError:
+      pass
     argshape = self._argshape(target)
     arg = function.Argument(target, argshape)
-    seen = {}
-    return Integral([di, function.derivative(integrand, var=arg, seen=seen)] for di, integrand in self._integrands.items())
+    seen = self._seen.setdefault((target, argshape), {})
+    derivative = self._derived([di, function.derivative(integrand, var=arg, seen=seen)] for di, integrand in self._integrands.items())
+    self._derivatives[target] = derivative
+    return derivative
 
   def replace(self, arguments):
     return Integral([di, function.replace_arguments(integrand, arguments)] for di, integrand in self._integrands.items())
 
   def contains(self, name):
-    try:
-      self._argshape(name)
-    except KeyError:
-      return False
-    else:
-      return True
+    return name in self._argshapes
 
   def __add__(self, other):
     if not isinstance(other, Integral):
@@ -100,10 +122,10 @@ class Integral:
         integrands[di] += integrand
       except KeyError:
         integrands[di] = integrand
-    return Integral(integrands)
+    return self._derived(integrands, other)
 
   def __neg__(self):
-    return Integral([di, -integrand] for di, integrand in self._integrands.items())
+    return self._derived([di, -integrand] for di, integrand in self._integrands.items())
 
   def __sub__( self, other ):
     return self + (-other)
@@ -111,7 +133,7 @@ class Integral:
   def __mul__( self, other ):
     if not isinstance(other, numbers.Number):
       return NotImplemented
-    return Integral([di, integrand * other] for di, integrand in self._integrands.items())
+    return self._derived([di, integrand * other] for di, integrand in self._integrands.items())
 
   __rmul__ = __mul__
 
@@ -122,14 +144,16 @@ class Integral:
 
   def _argshape(self, name):
     assert isinstance(name, str)
-    shapes = {func.shape[:func.ndim-func._nderiv]
-      for func in function.Tuple(self._integrands.values()).simplified.dependencies
-        if isinstance(func, function.Argument) and func._name == name}
-    if not shapes:
-      raise KeyError(name)
-    assert len(shapes) == 1, 'inconsistent shapes for argument {!r}'.format(name)
-    shape, = shapes
-    return shape
+    return self._argshapes[name]
+
+  @cache.property
+  def _argshapes(self):
+    argshapes = {}
+    for func in function.Tuple(self._integrands.values()).simplified.dependencies:
+      if isinstance(func, function.Argument):
+        shape = func.shape[:func.ndim-func._nderiv]
+        assert argshapes.setdefault(func._name, shape) == shape, 'inconsistent shapes for argument {!r}'.format(func._name)
+    return argshapes
 
 
 class ModelError( Exception ): pass
@@ -232,7 +256,7 @@ def withsolve( f ):
 
 
 @withsolve
-def newton(target, residual, jacobian=None, lhs0=None, constrain=None, nrelax=numpy.inf, minrelax=.1, maxrelax=.9, rebound=2**.5, *, arguments=None, **solveargs):
+def newton(target, residual, jacobian=None, lhs0=None, constrain=None, nrelax=numpy.inf, minrelax=.1, maxrelax=.9, rebound=2**.5, linesearch='jacobian', maxreuse=0, reuserate=.5, *, arguments=None, **solveargs):
   '''iteratively solve nonlinear problem by gradient descent
 
   Generates targets such that residual approaches 0 using Newton procedure with
@@ -245,7 +269,18 @@ def newton(target, residual, jacobian=None, lhs0=None, constrain=None, nrelax=nu
       | res( lhs + r * dlhs ) |^2 = A + B * r + C * r^2 + D * r^3
 
   where ``A``, ``B``, ``C`` and ``D`` are determined based on the current and
-  updated residual and tangent.
+  updated residual and tangent. With ``linesearch='residual'`` the updated
+  tangent is not evaluated and ``D`` is taken to be zero.
+
+  With ``maxreuse`` larger than zero the procedure turns into a modified
+  Newton method, in which the jacobian and its factorization are reused for
+  subsequent iterations for as long as the residual norm decreases fast
+  enough. To avoid assembling jacobians that may not be used, the line search
+  then evaluates only the residual, as with ``linesearch='residual'``. Since
+  the update of a reused jacobian is not the Newton direction, the above
+  model does not apply to it; instead the relaxation is halved until the
+  residual decreases, and the jacobian is reassembled if this requires a
+  relaxation below ``minrelax``.
 
   Parameters
   ----------
@@ -272,6 +307,17 @@ def newton(target, residual, jacobian=None, lhs0=None, constrain=None, nrelax=nu
   rebound : float
       Factor by which the relaxation value grows after every update until it
       reaches unity.
+  linesearch : :class:`str`
+      Either ``'jacobian'`` to evaluate residual and jacobian in every line
+      search step, or ``'residual'`` to evaluate only the residual. Ignored if
+      ``maxreuse`` is larger than zero, in which case only the residual is
+      evaluated.
+  maxreuse : int
+      Maximum number of consecutive iterations for which a jacobian is reused
+      (by default 0, meaning that it is reassembled in every iteration).
+  reuserate : float
+      Maximum ratio of subsequent residual norms for which a jacobian is
+      reused; if convergence is slower the jacobian is reassembled.
   arguments : :class:`collections.abc.Mapping`
       Defines the values for :class:`nutils.function.Argument` objects in
       `residual`.  The ``target`` should not be present in ``arguments``.
@@ -311,19 +357,28 @@ def newton(target, residual, jacobian=None, lhs0=None, constrain=None, nrelax=nu
     yield lhs, 0
     return
 
+  assert linesearch in ('jacobian', 'residual'), 'invalid linesearch argument {!r}'.format(linesearch)
+
   lhs = lhs0.copy()
   fcache = cache.WrapperCache()
   res, jac = Integral.multieval(residual, jacobian, fcache=fcache, arguments=collections.ChainMap(arguments or {}, {target: lhs}))
   zcons = numpy.zeros(argshape)
   zcons[~constrain] = numpy.nan
+  jacsolve = _jacobiansolver(jac, zcons, maxreuse > 0, solveargs)
   relax = 1
+  jacage = 0
   while True:
     resnorm = numpy.linalg.norm( res[~constrain] )
     yield lhs, resnorm
-    dlhs = -jac.solve( res, constrain=zcons, **solveargs )
+    res0 = res
+    dlhs = -jacsolve( res0 )
     relax = min( relax * rebound, 1 )
     for irelax in itertools.count():
-      res, jac = Integral.multieval(residual, jacobian, fcache=fcache, arguments=collections.ChainMap(arguments or {}, {target: lhs+relax*dlhs}))
+      if linesearch == 'jacobian' and not maxreuse:
+        res, newjac = Integral.multieval(residual, jacobian, fcache=fcache, arguments=collections.ChainMap(arguments or {}, {target: lhs+relax*dlhs}))
+      else:
+        res, = Integral.multieval(residual, fcache=fcache, arguments=collections.ChainMap(arguments or {}, {target: lhs+relax*dlhs}))
+        newjac = None
       newresnorm = numpy.linalg.norm( res[~constrain] )
       if irelax >= nrelax:
         if newresnorm > resnorm:
@@ -335,13 +390,28 @@ def newton(target, residual, jacobian=None, lhs0=None, constrain=None, nrelax=nu
         newrelax = 0 # replaced by minrelax later
       else:
         r0 = resnorm**2
-        d0 = -2 * r0
         r1 = newresnorm**2
-        d1 = 2 * numpy.dot( jac.matvec(dlhs)[~constrain], res[~constrain] )
-        log.info( 'line search: 0[{}]{} {}creased by {:.0f}%'.format( '---+++' if d1 > 0 else '--++--' if r1 > r0 else '------', round(relax,5), 'in' if newresnorm > resnorm else 'de', 100*abs(newresnorm/resnorm-1) ) )
-        if r1 <= r0 and d1 <= 0:
+        d1 = 2 * numpy.dot( newjac.matvec(dlhs)[~constrain], res[~constrain] ) if newjac is not None else None
+        log.info( 'line search: 0[{}]{} {}creased by {:.0f}%'.format( '---+++' if d1 is not None and d1 > 0 else '--++--' if r1 > r0 else '------', round(relax,5), 'in' if newresnorm > resnorm else 'de', 100*abs(newresnorm/resnorm-1) ) )
+        if r1 <= r0 and (d1 is None or d1 <= 0):
           break
-        D = 2*r0 - 2*r1 + d0 + d1
+        if jacage:
+          # The update derives from a reused jacobian, so the slope d0 below is
+          # unknown and dlhs may not even be a descent direction. We backtrack
+          # instead and fall back on a fresh jacobian if that fails.
+          if relax / 2 >= minrelax:
+            log.info( 'backtracking with reused jacobian' )
+            relax /= 2
+          else:
+            log.info( 'reassembling jacobian' )
+            jac, = Integral.multieval(jacobian, fcache=fcache, arguments=collections.ChainMap(arguments or {}, {target: lhs}))
+            jacsolve = _jacobiansolver(jac, zcons, maxreuse > 0, solveargs)
+            jacage = 0
+            dlhs = -jacsolve( res0 )
+            relax = 1
+          continue
+        d0 = -2 * r0
+        D = 2*r0 - 2*r1 + d0 + d1 if d1 is not None else 0
         if D > 0:
           C = 3*r1 - 3*r0 - 2*d0 - d1
           newrelax = ( numpy.sqrt(C**2-3*d0*D) - C ) / (3*D)
@@ -356,6 +426,153 @@ def newton(target, residual, jacobian=None, lhs0=None, constrain=None, nrelax=nu
           break
       relax *= max( newrelax, minrelax )
     lhs += relax * dlhs
+    jacage += 1
+    if jacage > maxreuse or newresnorm > reuserate * resnorm:
+      jac = newjac if newjac is not None else Integral.multieval(jacobian, fcache=fcache, arguments=collections.ChainMap(arguments or {}, {target: lhs}))[0]
+      jacsolve = _jacobiansolver(jac, zcons, maxreuse > 0, solveargs)
+      jacage = 0
+    else:
+      log.info( 'reusing jacobian' )
+
+def _jacobiansolver(jac, zcons, factorize, solveargs):
+  '''return a function that solves ``jac x = rhs`` subject to zero constraints
+
+  If ``factorize`` is true and the system is sparse and to be solved directly,
+  that is without ``tol`` and with no other than the ``spsolve`` solver, the
+  factorization is computed once and reused for every right hand side.'''
+
+  if factorize and isinstance(jac, matrix.ScipyMatrix) and not solveargs.get('tol', 0) and solveargs.get('solver') in (None, 'spsolve'):
+    import scipy.sparse.linalg
+    free = numpy.isnan(zcons)
+    lu = scipy.sparse.linalg.splu(jac.core[free][:,free].tocsc())
+    def solve(rhs):
+      x = numpy.zeros(len(rhs))
+      x[free] = lu.solve(rhs[free])
+      return x
+    return solve
+  return functools.partial(jac.solve, constrain=zcons, **solveargs)
+
+
+@withsolve
+def newtonkrylov(target, residual, lhs0=None, constrain=None, preconditioner=None, directional='finite', krylovtol=1e-3, nrelax=10, *, arguments=None, **krylovargs):
+  '''iteratively solve nonlinear problem by jacobian-free newton-krylov
+
+  Generates targets such that residual approaches 0 using Newton iterations in
+  which the linear systems are solved by GMRES without assembling the
+  jacobian. Matrix-vector products with the jacobian are computed either by
+  finite differences of the residual, or exactly by integrating the
+  directional derivative of the residual. Suitable to be used inside
+  ``solve``.
+
+  Parameters
+  ----------
+  target : :class:`str`
+      Name of the target: a :class:`nutils.function.Argument` in ``residual``.
+  residual : Integral
+  lhs0 : vector
+      Coefficient vector, starting point of the iterative procedure.
+  constrain : boolean or float vector
+      Equal length to ``lhs0``, masks the free vector entries as ``False``
+      (boolean) or NaN (float). In the remaining positions the values of
+      ``lhs0`` are returned unchanged (boolean) or overruled by the values in
+      `constrain` (float).
+  preconditioner : Integral
+      Approximation of the jacobian, such as a lower order or linearized
+      form, that is assembled and factorized once per iteration to
+      precondition GMRES. Optional.
+  directional : :class:`str`
+      Either ``'finite'`` for finite difference or ``'exact'`` for integrated
+      directional derivatives.
+  krylovtol : float
+      Relative tolerance of the linear solves.
+  nrelax : int
+      Maximum number of times the update is halved to decrease the residual.
+  arguments : :class:`collections.abc.Mapping`
+      Defines the values for :class:`nutils.function.Argument` objects in
+      `residual`.  The ``target`` should not be present in ``arguments``.
+      Optional.
+
+  Yields
+  ------
+  vector
+      Coefficient vector that approximates residual==0 with increasing accuracy
+  '''
+
+  import scipy.sparse.linalg
+
+  assert target not in (arguments or {}), '`target` should not be defined in `arguments`'
+  assert directional in ('finite', 'exact'), 'invalid directional argument {!r}'.format(directional)
+  argshape = residual._argshape(target)
+  assert len(argshape) == 1, 'newtonkrylov requires a vector valued target'
+
+  if lhs0 is None:
+    lhs0 = numpy.zeros(residual.shape)
+  else:
+    assert numeric.isarray(lhs0) and lhs0.dtype == float and lhs0.shape == residual.shape, 'invalid lhs0 argument'
+
+  if constrain is None:
+    constrain = numpy.zeros(residual.shape, dtype=bool)
+  else:
+    assert numeric.isarray(constrain) and constrain.dtype in (bool,float) and constrain.shape == residual.shape, 'invalid constrain argument'
+    if constrain.dtype == float:
+      lhs0 = numpy.choose(numpy.isnan(constrain), [constrain, lhs0])
+      constrain = ~numpy.isnan(constrain)
+
+  if directional == 'exact':
+    direction = '_newtonkrylov_direction'
+    arg = function.Argument(target, argshape)
+    seen = residual._seen.setdefault((target, argshape), {})
+    jacvec = Integral([di, (function.derivative(integrand, var=arg, seen=seen) * function.Argument(direction, argshape)).sum(-1)] for di, integrand in residual._integrands.items())
+
+  free = ~constrain
+  zcons = numpy.zeros(argshape)
+  zcons[free] = numpy.nan
+  lhs = lhs0.copy()
+  fcache = cache.WrapperCache()
+  evalres = lambda lhs: residual.eval(fcache=fcache, arguments=collections.ChainMap(arguments or {}, {target: lhs}))
+  res = evalres(lhs)
+  resnorm = numpy.linalg.norm(res[free])
+  while True:
+    yield lhs, resnorm
+
+    def matvec(v, lhs=lhs, res=res):
+      dlhs = numpy.zeros(argshape)
+      dlhs[free] = v
+      if directional == 'exact':
+        jv = jacvec.eval(fcache=fcache, arguments=collections.ChainMap(arguments or {}, {target: lhs, direction: dlhs}))
+      else:
+        vnorm = numpy.linalg.norm(v)
+        if not vnorm:
+          return numpy.zeros_like(v)
+        eps = numpy.sqrt(numpy.finfo(float).eps) * (1 + numpy.linalg.norm(lhs)) / vnorm
+        jv = (evalres(lhs + eps * dlhs) - res) / eps
+      return jv[free]
+
+    A = scipy.sparse.linalg.LinearOperator((free.sum(),)*2, matvec, dtype=float)
+    M = preconditioner.eval(fcache=fcache, arguments=collections.ChainMap(arguments or {}, {target: lhs})).getprecon('splu', constrain=zcons) if preconditioner is not None else None
+    solverinfo = matrix.SolverInfo(krylovtol)
+    x, status = scipy.sparse.linalg.gmres(A, -res[free], M=M, tol=krylovtol, callback=solverinfo, **krylovargs)
+    if status:
+      log.warning('gmres failed to reach tolerance in {} iterations'.format(solverinfo.niter))
+    else:
+      log.info('gmres converged in {} iterations'.format(solverinfo.niter))
+    dlhs = numpy.zeros(argshape)
+    dlhs[free] = x
+
+    relax = 1
+    for irelax in itertools.count():
+      newres = evalres(lhs + relax * dlhs)
+      newresnorm = numpy.linalg.norm(newres[free])
+      if newresnorm < resnorm or irelax >= nrelax:
+        break
+      log.info('line search: residual increased by {:.0f}%, halving relaxation {}'.format(100*(newresnorm/resnorm-1) if numpy.isfinite(newresnorm) else numpy.inf, relax))
+      relax /= 2
+    if not newresnorm < resnorm:
+      log.warning('failed to decrease residual')
+      return
+    lhs = lhs + relax * dlhs
+    res = newres
+    resnorm = newresnorm
 
 
 @withsolve
@@ -476,6 +693,148 @@ impliciteuler = functools.partial(thetamethod, theta=1)
 cranknicolson = functools.partial(thetamethod, theta=0.5)
 
 
+def adaptivethetamethod(target, residual, inertia, timestep, lhs0, theta, tol, target0='_thetamethod_target0', constrain=None, newtontol=1e-10, maxfactor=2, safety=.8, minstep=None, maxstep=numpy.inf, maxiter=20, reuserate=.5, *, arguments=None):
+  '''solve time dependent problem using the theta method with adaptive timesteps
+
+  Every step is taken once with the full and twice with half the timestep. The
+  difference between both solutions estimates the local error, which
+  determines whether the step is accepted, after which the timestep is scaled
+  to bring the next estimate close to ``tol``. The timestep is left unchanged
+  if it would grow by less than 50%, in which case the factorized jacobians of
+  the previous step are reused until the convergence rate of the chord
+  iterations drops below ``reuserate``.
+
+  Since the time levels are not known in advance, this generator yields
+  ``(time, lhs)`` pairs, unlike :func:`thetamethod`, :func:`impliciteuler` and
+  :func:`cranknicolson` which yield only the coefficient vector::
+
+      for time, lhs in adaptivethetamethod('lhs', res, inertia, timestep=.1, lhs0=lhs0, theta=1, tol=1e-3):
+        ...
+
+  Parameters
+  ----------
+  target : :class:`str`
+      Name of the target: a :class:`nutils.function.Argument` in ``residual``.
+  residual : Integral
+  inertia : Integral
+  timestep : float
+      Initial time step
+  lhs0 : vector
+      Coefficient vector, starting point of the iterative procedure.
+  theta : float
+      Theta value (theta=1 for implicit Euler, theta=0.5 for Crank-Nicolson)
+  tol : float
+      Target norm of the local error estimate of the free entries
+  constrain : boolean or float vector
+      Equal length to ``lhs0``, masks the free vector entries as ``False``
+      (boolean) or NaN (float). In the remaining positions the values of
+      ``lhs0`` are returned unchanged (boolean) or overruled by the values in
+      `constrain` (float).
+  newtontol : float
+      Residual tolerance of individual timesteps
+  maxfactor : float
+      Maximum factor by which the timestep grows in one step
+  safety : float
+      Factor applied to the timestep estimate
+  minstep : float
+      Minimum timestep, below which the procedure is aborted with a
+      :class:`ModelError` (by default ``timestep`` divided by 2**20)
+  maxstep : float
+      Maximum timestep
+  maxiter : int
+      Maximum number of chord iterations per timestep
+  reuserate : float
+      Maximum ratio of subsequent residual norms for which a jacobian is
+      reused
+  arguments : :class:`collections.abc.Mapping`
+      Defines the values for :class:`nutils.function.Argument` objects in
+      `residual`.  The ``target`` should not be present in ``arguments``.
+      Optional.
+
+  Yields
+  ------
+  :class:`float`, vector
+      Time and coefficient vector, starting with the initial condition.
+  '''
+
+  assert target != target0, '`target` should not be equal to `target0`'
+  assert target not in (arguments or {}), '`target` should not be defined in `arguments`'
+  assert target0 not in (arguments or {}), '`target0` should not be defined in `arguments`'
+
+  if constrain is None:
+    constrain = numpy.zeros(residual.shape, dtype=bool)
+  else:
+    assert numeric.isarray(constrain) and constrain.dtype in (bool,float) and constrain.shape == residual.shape, 'invalid constrain argument'
+    if constrain.dtype == float:
+      lhs0 = numpy.choose(numpy.isnan(constrain), [constrain, lhs0])
+      constrain = ~numpy.isnan(constrain)
+  free = ~constrain
+  zcons = numpy.zeros(residual.shape)
+  zcons[free] = numpy.nan
+
+  targetdt = '_adaptivethetamethod_timestep'
+  invdt = 1 / function.Argument(targetdt, ())
+  scaled = lambda integral, factor: integral._derived([di, integrand * factor] for di, integrand in integral._integrands.items())
+  res = scaled(residual, theta) + scaled(inertia, invdt) \
+      + scaled(residual, 1-theta).replace({target: function.Argument(target0, lhs0.shape)}) - scaled(inertia, invdt).replace({target: function.Argument(target0, lhs0.shape)})
+  jac = res.derivative(target)
+  order = 2 if theta == .5 else 1
+  fcache = cache.WrapperCache()
+  jacsolves = {} # timestep -> factorized jacobian
+
+  def step(lhs0, dt):
+    args = collections.ChainMap(arguments or {}, {target0: lhs0, targetdt: numpy.array(dt)})
+    lhs = lhs0.copy()
+    resnorm = numpy.inf
+    for i in range(maxiter):
+      r, = Integral.multieval(res, fcache=fcache, arguments=collections.ChainMap({target: lhs}, args))
+      newresnorm = numpy.linalg.norm(r[free])
+      if newresnorm < newtontol:
+        return lhs
+      if not numpy.isfinite(newresnorm):
+        return None
+      if dt not in jacsolves or newresnorm > reuserate * resnorm:
+        J, = Integral.multieval(jac, fcache=fcache, arguments=collections.ChainMap({target: lhs}, args))
+        jacsolves[dt] = _jacobiansolver(J, zcons, True, {})
+      lhs = lhs - jacsolves[dt](r)
+      resnorm = newresnorm
+    log.info('chord iterations failed to converge at timestep {:.2e}'.format(dt))
+    return None
+
+  if minstep is None:
+    minstep = timestep * 2**-20
+  lhs = lhs0
+  time = 0.
+  dt = timestep
+  while True:
+    yield time, lhs
+    while True:
+      if dt < minstep or not dt > 0:
+        raise ModelError('timestep dropped below minimum {}'.format(minstep))
+      for key in set(jacsolves) - {dt, dt/2}:
+        del jacsolves[key]
+      full = step(lhs, dt)
+      half = step(lhs, dt/2) if full is not None else None
+      twohalves = step(half, dt/2) if half is not None else None
+      if twohalves is None:
+        dt /= 2
+        continue
+      error = numpy.linalg.norm((twohalves - full)[free]) / (2**order - 1)
+      factor = safety * (tol / error)**(1/(order+1)) if error else maxfactor
+      if error > tol:
+        log.info('rejected timestep {:.2e} with error {:.2e}'.format(dt, error))
+        dt *= max(factor, .1)
+        continue
+      break
+    log.info('accepted timestep {:.2e} with error {:.2e}'.format(dt, error))
+    lhs = twohalves
+    time += dt
+    if factor >= 1.5:
+      dt = min(dt * min(factor, maxfactor), maxstep)
+    elif factor < 1:
+      dt *= factor
+
+
 @log.title
 def optimize(target, functional, droptol=None, lhs0=None, constrain=None, newtontol=None, *, arguments=None):
   '''find the minimizer of a given functional
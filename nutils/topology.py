@@ -24,7 +24,7 @@ out in element loops. For lower level operations topologies can be used as
 """
 
 from . import element, function, util, numpy, parallel, matrix, log, core, numeric, cache, transform, _
-import warnings, functools, collections.abc, itertools, functools, operator
+import warnings, functools, collections.abc, itertools, functools, operator, math
 
 _identity = lambda x: x
 
@@ -178,11 +178,11 @@ class Topology( object ):
     idata = []
     for ifunc, func in enumerate( funcs ):
       func = function.asarray( edit( func * iwscale ) )
-      func = function.zero_argument_derivatives(func)
       retval = zeros( (npoints,)+func.shape, dtype=func.dtype )
-      idata.extend( function.Tuple([ifunc, function.Tuple(ind), f.simplified]) for ind, f in function.blocks(func) )
+      idata.extend( function.Tuple([ifunc, ind, f]) for ind, f in func._evalblocks )
       retvals.append( retval )
     idata = function.Tuple( idata )
+    log.debug( 'allocated', util.memstr(sum(retval.nbytes for retval in retvals)) )
 
     if core.getprop( 'dot', False ):
       idata.graphviz()
@@ -190,7 +190,7 @@ class Topology( object ):
     if arguments is None:
       arguments = {}
 
-    for ielem, elem in parallel.pariter( log.enumerate( 'elem', self ), nprocs=nprocs ):
+    for ielem, elem in parallel.pariter( log.enumerate( 'elem', self, interval=core.getprop( 'progressinterval', .1 ) ), nprocs=nprocs ):
       ipoints, iweights = ischeme[elem] if isinstance(ischeme,collections.abc.Mapping) else fcache[elem.reference.getischeme]( ischeme )
       s = slices[ielem],
       try:
@@ -208,6 +208,9 @@ class Topology( object ):
             numpy.add.at(retvals[ifunc], s+numpy.ix_(*[ ind for (ind,) in index ]), numeric.dot(iweights,data) if geometry else data)
 
     log.debug( 'cache', fcache.stats )
+    peakrss = util.peakrss()
+    if peakrss is not None:
+      log.debug( 'peak memory usage', util.memstr(peakrss) )
     log.info( 'created', ', '.join( '%s(%s)' % ( retval.__class__.__name__, ','.join( str(n) for n in retval.shape ) ) for retval in retvals ) )
 
     if asfunction:
@@ -229,7 +232,47 @@ class Topology( object ):
     retvals = self.elem_eval( (1,)+funcs, geometry=geometry, ischeme=ischeme, arguments=arguments )
     return [ v / retvals[0][(slice(None),)+(_,)*(v.ndim-1)] for v in retvals[1:] ]
 
-  def _integrate( self, funcs, ischeme, fcache=None, arguments=None ):
+  def _integrationsizes( self, funcs, fcache, arguments ):
+    'nblocks x nelems array of the number of values of every block per element'
+
+    blocks = [f for func in funcs for ind, f in function.asarray(func)._evalblocks]
+    sizes = numpy.zeros((len(blocks), len(self)), dtype=int)
+    if blocks:
+      sizefunc = function.stack([f.size for f in blocks]).simplified
+      for ielem, elem in enumerate(self):
+        sizes[:,ielem], = sizefunc.eval(_transforms=(elem.transform, elem.opposite), _cache=fcache, **(arguments or {}))
+    return sizes
+
+  def _chunkbounds( self, funcs, sizes, indexonly=False ):
+    '''element bounds of consecutive chunks that stay within the membudget property
+
+    Every value takes one float (unless indexonly) plus an integer per
+    dimension of its function.'''
+
+    block2func = [ifunc for ifunc, func in enumerate(funcs) for block in function.asarray(func)._evalblocks]
+    valuebytes = numpy.array([(funcs[ifunc].ndim+(not indexonly))*8 for ifunc in block2func], dtype=int)
+    elembytes = numpy.dot(valuebytes, sizes)
+    totalbytes = elembytes.sum()
+    membudget = core.getprop('membudget', 0)
+    log.debug('integration requires {} for {} values'.format(util.memstr(totalbytes), sizes.sum()))
+    if not membudget or totalbytes <= membudget:
+      return [0, len(self)]
+    bounds = [0]
+    nbytes = 0
+    for ielem, n in enumerate(elembytes):
+      if nbytes and nbytes + n > membudget:
+        bounds.append(ielem)
+        nbytes = 0
+      nbytes += n
+    bounds.append(len(self))
+    return bounds
+
+  def _integrate( self, funcs, ischeme, fcache=None, arguments=None, indexonly=False, sizes=None ):
+    '''generate data_index lists of consecutive element chunks
+
+    If ``indexonly`` is true only the indices are evaluated and the data
+    arrays are ``None``. Argument ``sizes`` optionally provides the result
+    of :meth:`_integrationsizes` for ``funcs``.'''
 
     if arguments is None:
       arguments = {}
@@ -238,9 +281,9 @@ class Topology( object ):
     # chaining. Here we make a list of all blocks consisting of triplets of
     # argument id, evaluable index, and evaluable values.
 
-    blocks = [(ifunc, function.Tuple(ind), f.simplified)
+    blocks = [(ifunc, ind, f)
       for ifunc, func in enumerate(funcs)
-        for ind, f in function.blocks(function.zero_argument_derivatives(func))]
+        for ind, f in function.asarray(func)._evalblocks]
 
     block2func, indices, values = zip( *blocks ) if blocks else ([],[],[])
 
@@ -254,58 +297,74 @@ class Topology( object ):
       fcache = cache.WrapperCache()
 
     # To allocate (shared) memory for all block data we evaluate indexfunc to
-    # build an nblocks x nelems+1 offset array, and nblocks index lists of
-    # length nelems.
-
-    offsets = numpy.zeros((len(blocks), len(self)+1), dtype=int)
-    if blocks:
-      sizefunc = function.stack([f.size for ifunc, ind, f in blocks]).simplified
-      for ielem, elem in enumerate(self):
-        n, = sizefunc.eval(_transforms=(elem.transform, elem.opposite), _cache=fcache, **arguments)
-        offsets[:,ielem+1] = offsets[:,ielem] + n
-
-    # Since several blocks may belong to the same function, we post process the
-    # offsets to form consecutive intervals in longer arrays. The length of
-    # these arrays is captured in the nfuncs-array nvals.
-
-    nvals = numpy.zeros( len(funcs), dtype=int )
-    for iblock, ifunc in enumerate( block2func ):
-      offsets[iblock] += nvals[ifunc]
-      nvals[ifunc] = offsets[iblock,-1]
+    # build an nblocks x nelems array of block sizes. If the data exceeds the
+    # membudget property the elements are assembled in consecutive chunks
+    # that each stay within budget.
 
-    # The data_index list contains shared memory index and value arrays for
-    # each function argument.
+    if sizes is None:
+      sizes = self._integrationsizes(funcs, fcache, arguments)
+    bounds = self._chunkbounds(funcs, sizes, indexonly)
+    if len(bounds) > 2:
+      log.info('assembling in {} chunks to stay within memory budget of {}'.format(len(bounds)-1, util.memstr(core.getprop('membudget'))))
 
     nprocs = min( core.getprop( 'nprocs', 1 ), len(self) )
     empty = parallel.shzeros if nprocs > 1 else numpy.empty
-    data_index = [
-      ( empty( n, dtype=float ),
-        empty( (funcs[ifunc].ndim,n), dtype=int ) )
-            for ifunc, n in enumerate(nvals) ]
-
-    # In a second, parallel element loop, valuefunc is evaluated to fill the
-    # data part of data_index using the offsets array for location. Each
-    # element has its own location so no locks are required. The index part of
-    # data_index is filled in the same loop. It does not use valuefunc data but
-    # benefits from parallel speedup.
-
-    valueindexfunc = function.Tuple(function.Tuple([value]+list(index)) for value, index in zip(values, indices))
-    for ielem, elem in parallel.pariter( log.enumerate( 'elem', self ), nprocs=nprocs ):
-      ipoints, iweights = ischeme[elem] if isinstance(ischeme,collections.abc.Mapping) else fcache[elem.reference.getischeme]( ischeme )
-      assert iweights is not None, 'no integration weights found'
-      for iblock, (intdata, *indices) in enumerate(valueindexfunc.eval(_transforms=(elem.transform, elem.opposite), _points=ipoints, _cache=fcache, **arguments)):
-        s = slice(*offsets[iblock,ielem:ielem+2])
-        data, index = data_index[ block2func[iblock] ]
-        w_intdata = numeric.dot( iweights, intdata )
-        data[s] = w_intdata.ravel()
-        si = (slice(None),) + (_,) * (w_intdata.ndim-1)
-        for idim, (ii,) in enumerate(indices):
-          index[idim,s].reshape(w_intdata.shape)[...] = ii[si]
-          si = si[:-1]
+    valueindexfunc = function.Tuple(function.Tuple(([] if indexonly else [value])+list(index)) for value, index in zip(values, indices))
+
+    for ichunk, (start, stop) in enumerate(zip(bounds[:-1], bounds[1:])):
+
+      # Since several blocks may belong to the same function, we post process
+      # the offsets to form consecutive intervals in longer arrays. The length
+      # of these arrays is captured in the nfuncs-array nvals.
+
+      offsets = numpy.zeros((len(blocks), stop-start+1), dtype=int)
+      numpy.cumsum(sizes[:,start:stop], axis=1, out=offsets[:,1:])
+      nvals = numpy.zeros( len(funcs), dtype=int )
+      for iblock, ifunc in enumerate( block2func ):
+        offsets[iblock] += nvals[ifunc]
+        nvals[ifunc] = offsets[iblock,-1]
+
+      # The data_index list contains shared memory index and value arrays for
+      # each function argument.
+
+      data_index = [
+        ( None if indexonly else empty( n, dtype=float ),
+          empty( (funcs[ifunc].ndim,n), dtype=int ) )
+              for ifunc, n in enumerate(nvals) ]
+      log.debug('allocated {} for offsets and {} for data and indices'.format(
+        util.memstr(sizes.nbytes+offsets.nbytes), util.memstr(sum((0 if data is None else data.nbytes)+index.nbytes for data, index in data_index))))
+
+      # In a second, parallel element loop, valuefunc is evaluated to fill the
+      # data part of data_index using the offsets array for location. Each
+      # element has its own location so no locks are required. The index part
+      # of data_index is filled in the same loop. It does not use valuefunc
+      # data but benefits from parallel speedup.
+
+      for ielem, elem in parallel.pariter( log.enumerate( 'elem' if len(bounds) == 2 else 'chunk {} elem'.format(ichunk), self.elements[start:stop], interval=core.getprop( 'progressinterval', .1 ) ), nprocs=nprocs ):
+        ipoints, iweights = ischeme[elem] if isinstance(ischeme,collections.abc.Mapping) else fcache[elem.reference.getischeme]( ischeme )
+        assert iweights is not None, 'no integration weights found'
+        for iblock, valueindex in enumerate(valueindexfunc.eval(_transforms=(elem.transform, elem.opposite), _points=ipoints, _cache=fcache, **arguments)):
+          s = slice(*offsets[iblock,ielem:ielem+2])
+          data, index = data_index[ block2func[iblock] ]
+          if indexonly:
+            indices = valueindex
+            shape = tuple(len(ii) for (ii,) in indices)
+          else:
+            intdata, *indices = valueindex
+            w_intdata = numeric.dot( iweights, intdata )
+            data[s] = w_intdata.ravel()
+            shape = w_intdata.shape
+          si = (slice(None),) + (_,) * (len(shape)-1)
+          for idim, (ii,) in enumerate(indices):
+            index[idim,s].reshape(shape)[...] = ii[si]
+            si = si[:-1]
 
-    log.debug( 'cache', fcache.stats )
+      yield data_index
 
-    return data_index
+    log.debug( 'cache', fcache.stats )
+    peakrss = util.peakrss()
+    if peakrss is not None:
+      log.debug( 'peak memory usage', util.memstr(peakrss) )
 
   @log.title
   @core.single_or_multiple
@@ -316,8 +375,36 @@ class Topology( object ):
       ischeme += str(degree)
     iwscale = function.J( geometry, self.ndims ) if geometry else 1
     integrands = [ function.asarray( edit( func * iwscale ) ) for func in funcs ]
-    data_index = self._integrate( integrands, ischeme, fcache, arguments )
-    return [ matrix.assemble( data, index, integrand.shape, force_dense ) for integrand, (data,index) in zip( integrands, data_index ) ]
+
+    # If the membudget property forces assembly in chunks, sparse matrices are
+    # accumulated into their sparsity pattern, which is established in a
+    # separate index-only pass, to avoid holding the coo data of all chunks in
+    # memory at once.
+
+    sizes = None
+    accumulators = {}
+    if core.getprop( 'membudget', 0 ) and not force_dense and any( integrand.ndim == 2 for integrand in integrands ):
+      if fcache is None:
+        fcache = cache.WrapperCache()
+      sizes = self._integrationsizes( integrands, fcache, arguments )
+      if len( self._chunkbounds( integrands, sizes ) ) > 2:
+        accumulators = { ifunc: matrix.CSRAccumulator( integrand.shape ) for ifunc, integrand in enumerate( integrands ) if integrand.ndim == 2 }
+    if accumulators:
+      for data_index in self._integrate( [ integrands[ifunc] for ifunc in accumulators ], ischeme, fcache, arguments, indexonly=True ):
+        for accumulator, (data, index) in zip( accumulators.values(), data_index ):
+          accumulator.addpattern( index )
+
+    retvals = [ None ] * len(integrands)
+    for data_index in self._integrate( integrands, ischeme, fcache, arguments, sizes=sizes ):
+      for ifunc, (integrand, (data, index)) in enumerate( zip( integrands, data_index ) ):
+        if ifunc in accumulators:
+          accumulators[ifunc].add( data, index )
+        else:
+          chunk = matrix.assemble( data, index, integrand.shape, force_dense )
+          retvals[ifunc] = chunk if retvals[ifunc] is None else retvals[ifunc] + chunk
+    for ifunc, accumulator in accumulators.items():
+      retvals[ifunc] = accumulator.tomatrix()
+    return retvals
 
   @log.title
   def integral(self, func, ischeme='gauss', degree=None, geometry=None, edit=_identity):
@@ -480,28 +567,45 @@ class Topology( object ):
 
     fcache = cache.WrapperCache()
     levelset = function.zero_argument_derivatives(levelset).simplified
+    offsets = numpy.cumsum( [ 0 ] + [ elem.reference.nvertices_by_level(maxrefine) for elem in self ] )
     if leveltopo is None:
       ischeme = 'vertex{}'.format(maxrefine)
-      refs = [elem.reference.trim(levelset.eval(_transforms=(elem.transform, elem.opposite), _points=fcache[elem.reference.getischeme](ischeme)[0], _cache=fcache, **arguments), maxrefine=maxrefine, ndivisions=ndivisions) for elem in log.iter('elem', self)]
+      nprocs = min( core.getprop( 'nprocs', 1 ), len(self) )
+      levels = ( parallel.shzeros if nprocs > 1 else numpy.empty )( offsets[-1], dtype=float )
+      for ielem, elem in parallel.pariter( log.enumerate( 'elem', self, interval=core.getprop( 'progressinterval', .1 ) ), nprocs=nprocs ):
+        levels[offsets[ielem]:offsets[ielem+1]] = levelset.eval(_transforms=(elem.transform, elem.opposite), _points=fcache[elem.reference.getischeme](ischeme)[0], _cache=fcache, **arguments)
     else:
       log.info( 'collecting leveltopo elements' )
       bins = [ [] for ielem in range(len(self)) ]
       for elem in leveltopo:
         ielem, tail = elem.transform.lookup_item( self.edict )
         bins[ielem].append( tail )
-      refs = []
-      for elem, ctransforms in log.zip( 'elem', self, bins ):
-        levels = numpy.empty( elem.reference.nvertices_by_level(maxrefine) )
+      levels = numpy.empty( offsets[-1] )
+      for ielem, (elem, ctransforms) in enumerate( log.zip( 'elem', self, bins ) ):
+        elemlevels = levels[offsets[ielem]:offsets[ielem+1]]
         cover = list(fcache[elem.reference.vertex_cover](tuple(sorted(ctransforms)), maxrefine))
         # confirm cover and greedily optimize order
-        mask = numpy.ones( len(levels), dtype=bool )
+        mask = numpy.ones( len(elemlevels), dtype=bool )
         while mask.any():
           imax = numpy.argmax([ mask[indices].sum() for trans, points, indices in cover ])
           trans, points, indices = cover.pop( imax )
-          levels[indices] = levelset.eval(_transforms=(elem.transform<<trans,), _points=points, _cache=fcache, **arguments)
+          elemlevels[indices] = levelset.eval(_transforms=(elem.transform<<trans,), _points=points, _cache=fcache, **arguments)
           mask[indices] = False
-        refs.append( elem.reference.trim( levels, maxrefine=maxrefine, ndivisions=ndivisions ) )
     log.debug( 'cache', fcache.stats )
+
+    # Elements with levels of a single sign are kept or removed as a whole;
+    # the remaining elements are trimmed through a cache of trimmed references
+    # that is shared between calls.
+    inside = numpy.minimum.reduceat( levels, offsets[:-1] ) >= 0
+    outside = numpy.maximum.reduceat( levels, offsets[:-1] ) <= 0
+    refs = []
+    for ielem, elem in enumerate( self ):
+      ref = elem.reference
+      if ref and not inside[ielem]:
+        ref = ref.empty if outside[ielem] \
+          else _trimcache( ref, _quantizelevels( levels[offsets[ielem]:offsets[ielem+1]], ndivisions ), maxrefine, ndivisions )
+      refs.append( ref )
+    log.debug( 'trimmed', numpy.sum( ~inside & ~outside ), 'of', len(self), 'elements, trim cache hit', _trimcache.hits, '/', _trimcache.count )
     return SubsetTopology( self, refs, newboundary=name )
 
   def subset( self, elements, newboundary=None, strict=False ):
@@ -1524,6 +1628,57 @@ class UnstructuredTopology( Topology ):
     degrees = set(n-1 for c in coeffs for n in c.shape[1:])
     return function.polyfunc(coeffs, nmap, ndofs, (elem.transform for elem in self), issorted=False)
 
+  @cache.property
+  def _c0dofs(self):
+    return {}
+
+  def _dofs_c0_structured(self, degree):
+    'global dof numbers of C^0-continuous shape functions with lagrange structure'
+
+    try:
+      return self._c0dofs[degree]
+    except KeyError:
+      pass
+
+    # Every local dof is identified by the sorted ids of the vertices that
+    # support its position, paired with integer weights reduced to lowest
+    # terms. Dofs of neighboring elements coincide if and only if their keys
+    # are equal, which lets us merge them by a single lexicographic sort.
+    vertexids = {}
+    elemverts = [[vertexids.setdefault(v, len(vertexids)) for v in elem.vertices] for elem in self]
+    references = tuple(elem.reference for elem in self)
+    weights = {}
+    for ref in set(references):
+      w = numpy.asarray(ref.get_dof_vertex_weights(degree))
+      weights[ref] = w // numpy.array([functools.reduce(math.gcd, wi) for wi in w])[:,_]
+    offsets = numpy.cumsum([0]+[len(weights[ref]) for ref in references])
+    maxverts = max(ref.nverts for ref in weights)
+    keys = -numpy.ones((offsets[-1], 2*maxverts), dtype=int)
+    for ref, w in weights.items():
+      ielems = numpy.array([i for i, r in enumerate(references) if r == ref])
+      verts = numpy.array([elemverts[i] for i in ielems])
+      for idof, wdof in enumerate(w):
+        support, = wdof.nonzero()
+        supportverts = verts[:,support]
+        order = supportverts.argsort(axis=1)
+        rows = offsets[ielems] + idof
+        keys[rows,:len(support)] = supportverts[numpy.arange(len(ielems))[:,_],order]
+        keys[rows,maxverts:maxverts+len(support)] = wdof[support][order]
+    # Number the dofs in order of first appearance.
+    order = numpy.lexsort(keys.T[::-1])
+    isfirst = numpy.ones(len(order), dtype=bool)
+    isfirst[1:] = (keys[order[1:]] != keys[order[:-1]]).any(axis=1)
+    labels = numpy.empty(len(order), dtype=int)
+    labels[order] = numpy.cumsum(isfirst)-1
+    ndofs = int(isfirst.sum())
+    renumber = numpy.empty(ndofs, dtype=int)
+    renumber[numpy.argsort(order[isfirst])] = numpy.arange(ndofs)
+    dofmap = renumber[labels]
+
+    dofs = tuple(numeric.const(dofmap[offsets[i]:offsets[i+1]], copy=False) for i in range(len(self)))
+    self._c0dofs[degree] = dofs, ndofs
+    return dofs, ndofs
+
   def _basis_c0_structured(self, name, degree):
     'C^0-continuous shape functions with lagrange stucture'
 
@@ -1532,54 +1687,9 @@ class UnstructuredTopology( Topology ):
     if degree == 0:
       raise ValueError('Cannot build a C^0-continuous basis of degree 0.  Use basis \'discont\' instead.')
 
-    nlocaldofs = 0
-    elem_slices = []
-    coeffs = []
-    for elem in self:
-      elem_coeffs = elem.reference.get_poly_coeffs(name, degree=degree)
-      coeffs.append(elem_coeffs)
-      elem_slices.append(slice(nlocaldofs, nlocaldofs+len(elem_coeffs)))
-      nlocaldofs += len(elem_coeffs)
-    dofmap = -numpy.ones([nlocaldofs], dtype=int)
-
-    for ielem, elem in enumerate(self):
-      # Loop over all neighbors of elem and merge dofs.
-      for iedge, jelem in enumerate(self.connectivity[ielem]):
-        if jelem < 0:
-          continue
-        jedge = self.connectivity[jelem].tolist().index(ielem)
-        #if ielem < jelem or ielem == jelem and iedge < jedge:
-        #  continue
-        idofs = elem.reference.get_edge_dofs(degree, iedge)
-        verts = tuple(elem.edge(iedge).vertices)
-        neighbor = self.elements[jelem]
-        neighbor_verts = tuple(neighbor.edge(jedge).vertices)
-        jdofs = neighbor.reference.get_edge_dofs(degree, jedge)
-        #jdofs = jdofs[neighbor.reference.edges[jedge][1].get_dof_transpose_map(degree, tuple(map(neighbor_verts.index, verts)))]
-        foo = neighbor.reference.edges[jedge][1].get_dof_transpose_map(degree, tuple(map(neighbor_verts.index, verts)))
-        for idof, j in zip(idofs, foo):
-          ridof = idof = elem_slices[ielem].start+idof
-          # Resolve idof.
-          while dofmap[ridof] >= 0:
-            ridof = dofmap[ridof]
-          # Resolve jdof.
-          rjdof = jdof = elem_slices[jelem].start+jdofs[j]
-          while dofmap[rjdof] >= 0:
-            rjdof = dofmap[rjdof]
-          if ridof != rjdof:
-            dofmap[max(ridof,rjdof)] = min(ridof,rjdof)
-          if ridof != idof:
-            dofmap[idof] = min(ridof,rjdof)
-    # Assign dof numbers.
-    ndofs = 0
-    for i in range(len(dofmap)):
-      if dofmap[i] < 0:
-        dofmap[i] = ndofs
-        ndofs += 1
-      else:
-        dofmap[i] = dofmap[dofmap[i]]
-
-    dofs = tuple(numeric.const(dofmap[s]) for s in elem_slices)
+    dofs, ndofs = self._dofs_c0_structured(degree)
+    refcoeffs = {ref: ref.get_poly_coeffs(name, degree=degree) for ref in set(elem.reference for elem in self)}
+    coeffs = [refcoeffs[elem.reference] for elem in self]
     return function.polyfunc(coeffs, dofs, ndofs, (elem.transform for elem in self), issorted=False)
 
   def basis_lagrange(self, degree):
@@ -1878,25 +1988,60 @@ class HierarchicalTopology( Topology ):
     return itemelems
 
   @cache.property
-  @log.title
   def levels( self ):
-    levels = [ self.basetopo ]
+    return tuple( self._levels.topo(ilevel) for ilevel in range( len(self._levelindices) ) )
+
+  @cache.property
+  def _levels( self ):
+    return _HierarchicalLevels( self.basetopo )
+
+  @cache.property
+  @log.title
+  def _levelindices( self ):
+    'per level, the indices of the elements of self in that level'
+
+    indices = []
     for elem in self:
       try:
         ielem, tail = elem.transform.lookup_item( self.basetopo.edict )
       except KeyError:
         raise Exception( 'element is not a refinement of basetopo' )
-      else:
-        nrefine = len(tail)
-        while nrefine >= len(levels):
-          levels.append( levels[-1].refined )
-        assert elem.transform in levels[nrefine].edict, 'element is not a refinement of basetopo'
-    return tuple(levels)
+      while len(tail) >= len(indices):
+        indices.append( [] )
+      ielem = self._levels.topo(len(tail)).edict.get( elem.transform )
+      assert ielem is not None, 'element is not a refinement of basetopo'
+      indices[len(tail)].append( ielem )
+    return tuple( numpy.array( ielems, dtype=int ) for ielems in indices )
+
+  def refined_by( self, refine ):
+    'create refined space by refining dofs in existing one, reusing per-level data'
+
+    refine = set( item.transform if isinstance(item,element.Element) else item for item in refine )
+    removed = [ [] for ilevel in range( len(self.levels)+1 ) ]
+    added = [ [] for ilevel in range( len(self.levels)+1 ) ]
+    elements = []
+    for elem in self:
+      if elem.transform not in refine:
+        elements.append( elem )
+        continue
+      ibase, tail = elem.transform.lookup_item( self.basetopo.edict )
+      removed[len(tail)].append( self.levels[len(tail)].edict[elem.transform] )
+      children = elem.children
+      childedict = self._levels.topo(len(tail)+1).edict
+      added[len(tail)+1].extend( childedict[child.transform] for child in children )
+      elements.extend( children )
+    levelindices = [ numpy.concatenate([ ielems[~numpy.in1d(ielems,iremoved)], numpy.array(iadded,dtype=int) ]) if iremoved or iadded else ielems
+      for ielems, iremoved, iadded in zip( self._levelindices + (numpy.zeros(0,dtype=int),), removed, added ) ]
+    if not len(levelindices[-1]):
+      levelindices.pop()
+    topo = self.basetopo.hierarchical( elements, precise=True )
+    topo._levels = self._levels
+    topo._levelindices = tuple( levelindices )
+    return topo
 
   @cache.property
   def refined( self ):
-    elements = [ child for elem in self for child in elem.children ]
-    return self.basetopo.hierarchical( elements, precise=True )
+    return self.refined_by( self )
 
   @cache.property
   @log.title
@@ -1972,66 +2117,166 @@ class HierarchicalTopology( Topology ):
     # evaluate it through cascade, and at least one element of self can
     # evaluate it directly.
 
-    # Procedure: per refinement level, track which basis functions have at
-    # least one supporting element coinsiding with self ('touched') and no
-    # supporting element finer than self ('supported').
+    # Procedure: per refinement level, mark the elements that coincide with
+    # self ('touched') and the elements that are covered by a coarser element
+    # of self ('coarse'), the latter by mapping the marks of the previous level
+    # through the element-to-parent index map. A dof is retained if it is
+    # supported by at least one touched element and by no coarse element.
+
+    levels = self._levels
+    levelindices = self._levelindices
 
-    dofs_coeffs = []
-    renumber = []
     supports = []
+    renumber = []
+    leveldofs = []
+    levelcoeffs = []
     length = 0
 
-    for topo in log.iter( 'level', self.levels ):
+    for ilevel in log.range( 'level', len(levelindices) ):
 
-      basis = topo.basis( name, *args, **kwargs ) # shape functions for current level
+      ndofs, elemdofs, elemcoeffs, flatdofs, counts = levels.basis( ilevel, name, *args, **kwargs )
 
-      supported = numpy.ones( len(basis), dtype=bool ) # True if dof is fully contained in self or parents
-      touchtopo = numpy.zeros( len(basis), dtype=bool ) # True if dof touches at least one elem in self
-
-      (axes,func), = function.blocks( basis )
-      dofmap, = axes
-      if isinstance(func, function.Polyval):
-        coeffs = func.coeffs
-        assert coeffs.ndim == 1+self.ndims
-      elif func.isconstant:
-        assert func.ndim == 1
-        coeffs = func[(slice(None),*(_,)*self.ndims)]
+      if ilevel:
+        coarse = ( coarse | touched )[ levels.parents(ilevel)[0] ]
       else:
-        raise ValueError
+        coarse = numpy.zeros( len(elemdofs), dtype=bool )
+      touched = numpy.zeros( len(elemdofs), dtype=bool )
+      touched[ levelindices[ilevel] ] = True
 
-      for elem in topo:
-        trans = elem.transform
-        idofs, = dofmap.eval(_transforms=(elem.transform, elem.opposite))
-        if trans in self.edict:
-          touchtopo[idofs] = True
-        elif trans.lookup( self.edict ):
-          supported[idofs] = False
+      touchtopo = numpy.zeros( ndofs, dtype=bool ) # True if dof touches at least one elem in self
+      touchtopo[ flatdofs[ numpy.repeat( touched, counts ) ] ] = True
+      supported = numpy.ones( ndofs, dtype=bool ) # True if dof is fully contained in self or parents
+      supported[ flatdofs[ numpy.repeat( coarse, counts ) ] ] = False
 
       support = supported & touchtopo
       supports.append(support)
       cumsum_support = numpy.cumsum(support)
       renumber.append(cumsum_support+(length-1))
       length += cumsum_support[-1]
-      dofs_coeffs.append(function.Tuple((dofmap, coeffs)))
+      leveldofs.append(elemdofs)
+      levelcoeffs.append(elemcoeffs)
+
+    # Mark per level the elements of self and their ancestors, and collect for
+    # these the retained dofs of all levels up to their own, such that the
+    # coefficients of shared ancestors are transformed only once per level.
+
+    active = [ None ] * len(levelindices)
+    for ilevel in reversed( range( len(levelindices) ) ):
+      active[ilevel] = numpy.zeros( len(leveldofs[ilevel]), dtype=bool )
+      active[ilevel][ levelindices[ilevel] ] = True
+      if ilevel+1 < len(levelindices):
+        active[ilevel][ levels.parents(ilevel+1)[0][ active[ilevel+1] ] ] = True
 
     dofs = []
     coeffs = []
-    transforms = tuple(sorted(elem.transform for elem in self))
-    for trans in transforms:
-      hcoeffs = []
-      hdofs = []
-      ibase, tail = trans.lookup_item(self.basetopo.edict)
-      for ilevel in range(len(tail)+1):
-        (idofs,), (icoeffs,) = dofs_coeffs[ilevel].eval(_transforms=(trans,))
+    transforms = []
+    hbasis = {}
+    for ilevel in range( len(levelindices) ):
+      prevhbasis = hbasis
+      hbasis = {}
+      for ielem in numpy.where( active[ilevel] )[0]:
+        if ilevel:
+          pindices, ptails = levels.parents(ilevel)
+          hdofs, hcoeffs = prevhbasis[ pindices[ielem] ]
+          if hdofs:
+            hcoeffs = transform.transform_poly( ptails[ielem], hcoeffs )
+        else:
+          hdofs, hcoeffs = (), None
+        idofs = leveldofs[ilevel][ielem]
         isupport = supports[ilevel][idofs]
-        if not isupport.any():
-          continue
-        hdofs.extend(map(renumber[ilevel].__getitem__, idofs[isupport]))
-        hcoeffs.extend(transform.transform_poly(tail[ilevel:], icoeffs[isupport]))
-      dofs.append(numeric.const(hdofs))
-      coeffs.append(numeric.poly_stack(hcoeffs))
+        if isupport.any():
+          icoeffs = levelcoeffs[ilevel][ielem][isupport]
+          hdofs += tuple( renumber[ilevel][ idofs[isupport] ] )
+          hcoeffs = icoeffs if hcoeffs is None else numeric.poly_stack( itertools.chain( hcoeffs, icoeffs ) )
+        hbasis[ielem] = hdofs, hcoeffs
+      leveltransforms = levels.transforms(ilevel)
+      for ielem in levelindices[ilevel]:
+        hdofs, hcoeffs = hbasis[ielem]
+        transforms.append( leveltransforms[ielem] )
+        dofs.append( numeric.const( hdofs ) )
+        coeffs.append( numeric.poly_stack( hcoeffs ) )
+
+    return function.polyfunc(coeffs, dofs, length, transforms, issorted=False)
+
+class _HierarchicalLevels:
+  '''per level data shared by hierarchical topologies of the same base
+
+  Level topologies, element transforms, element-to-parent maps and level
+  bases are constructed on first use and retained, such that hierarchical
+  topologies derived from one another through
+  :meth:`HierarchicalTopology.refined_by` need to construct them only once.'''
+
+  def __init__( self, basetopo ):
+    self._topos = [ basetopo ]
+    self._transforms = []
+    self._parents = [ None ]
+    self._bases = {}
+
+  def topo( self, ilevel ):
+    'uniformly refined base topology'
+
+    while ilevel >= len(self._topos):
+      self._topos.append( self._topos[-1].refined )
+    return self._topos[ilevel]
+
+  def transforms( self, ilevel ):
+    'transforms of all elements of a level'
+
+    while ilevel >= len(self._transforms):
+      self._transforms.append( tuple( elem.transform for elem in self.topo( len(self._transforms) ) ) )
+    return self._transforms[ilevel]
+
+  def parents( self, ilevel ):
+    'parent index and relative transform of all elements of a level'
+
+    assert ilevel > 0
+    while ilevel >= len(self._parents):
+      edict = self.topo( len(self._parents)-1 ).edict
+      indices = []
+      tails = []
+      for trans in self.transforms( len(self._parents) ):
+        iparent = edict.get( trans[:-1] )
+        if iparent is not None:
+          tail = transform.TransformChain( trans[-1:] )
+        else:
+          iparent, tail = trans.lookup_item( edict )
+        indices.append( iparent )
+        tails.append( tail )
+      self._parents.append(( numpy.array( indices, dtype=int ), tuple(tails) ))
+    return self._parents[ilevel]
+
+  def basis( self, ilevel, name, *args, **kwargs ):
+    'number of dofs, element dofs, element coefficients, and flattened element dofs and their counts of a level basis'
+
+    key = ilevel, name, args, tuple(sorted(kwargs.items()))
+    try:
+      return self._bases[key]
+    except KeyError:
+      pass
+    except TypeError: # unhashable arguments
+      key = None
+
+    topo = self.topo(ilevel)
+    basis = topo.basis( name, *args, **kwargs ) # shape functions for current level
+    (axes,func), = function.blocks( basis )
+    dofmap, = axes
+    if isinstance(func, function.Polyval):
+      coeffs = func.coeffs
+      assert coeffs.ndim == 1+topo.ndims
+    elif func.isconstant:
+      assert func.ndim == 1
+      coeffs = func[(slice(None),*(_,)*topo.ndims)]
+    else:
+      raise ValueError
 
-    return function.polyfunc(coeffs, dofs, length, transforms, issorted=True)
+    elemdofs = _elemvalues( dofmap, self.transforms(ilevel) )
+    elemcoeffs = _elemvalues( coeffs, self.transforms(ilevel) )
+    flatdofs = numpy.concatenate( elemdofs )
+    counts = numpy.array( [ len(idofs) for idofs in elemdofs ], dtype=int )
+    data = len(basis), elemdofs, elemcoeffs, flatdofs, counts
+    if key is not None:
+      self._bases[key] = data
+    return data
 
 class ProductTopology( Topology ):
   'product topology'
@@ -2389,4 +2634,36 @@ def common_refine(topo1, topo2):
   warnings.warn('common_refine(a, b) will be removed in future; use a & b instead', DeprecationWarning)
   return topo1 & topo2
 
+def _elemvalues(func, transforms):
+  'values of an element-wise constant function for all transforms'
+
+  if func.isconstant:
+    value, = func.eval()
+    return [value] * len(transforms)
+  if isinstance(func, (function.DofMap, function.Elemwise)) and isinstance(func.index, function.FindTransform):
+    values = func.index.asdict(func.dofs if isinstance(func, function.DofMap) else func.data)
+    try:
+      return [values[trans] for trans in transforms]
+    except KeyError:
+      pass
+  return [func.eval(_transforms=(trans,))[0] for trans in transforms]
+
+def _quantizelevels(levels, ndivisions):
+  '''scale invariant integer representation of levels
+
+  The resolution is far below that of the slicing in :meth:`Reference.trim`,
+  and nonzero levels are rounded away from zero to preserve their sign.'''
+
+  q = numpy.round(levels * (2.**(ndivisions+20) / numpy.abs(levels).max())).astype(numpy.int64)
+  mask = (q == 0) & (levels != 0)
+  q[mask] = numpy.sign(levels[mask])
+  return q.tobytes()
+
+def _trimmedreference(reference, levels, maxrefine, ndivisions):
+  'trim reference along quantized levels'
+
+  return reference.trim(numpy.frombuffer(levels, dtype=numpy.int64).astype(float), maxrefine=maxrefine, ndivisions=ndivisions)
+
+_trimcache = cache.Wrapper(_trimmedreference, maxsize=10000)
+
 # vim:shiftwidth=2:softtabstop=2:expandtab:foldmethod=indent:foldnestmax=2
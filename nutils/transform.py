@@ -481,6 +481,41 @@ def offset( chain ):
     offset = trans.apply( offset )
   return offset
 
+def isaffine( chain ):
+  return all( isinstance( trans, (Shift,Scale,Matrix) ) for trans in chain )
+
+def flatten( chain ):
+  '''Flattened affine map ``(linear, offset)`` of ``chain``, with the linear
+  part always a ``todims`` by ``fromdims`` matrix. The result is meant to be
+  computed once per chain, typically via the evaluation cache, after which
+  mapping points costs a single matrix product regardless of chain length.'''
+
+  assert chain and isaffine( chain )
+  lin = numpy.eye( chain[-1].fromdims )
+  off = numpy.zeros( chain[-1].fromdims )
+  for trans in reversed(chain):
+    A = numpy.asarray( trans.linear )
+    b = numpy.asarray( trans.offset )
+    if A.ndim == 0:
+      lin = lin * A
+      off = off * A + b
+    else:
+      lin = numpy.dot( A, lin )
+      off = numpy.dot( A, off ) + b
+  return numeric.const( lin, copy=False ), numeric.const( off, copy=False )
+
+def apply_batch( chains, points ):
+  '''Apply a stack of affine chains to a stack of point sets in a single
+  batched product. The ``points`` array has shape ``(len(chains), npoints,
+  fromdims)``, or ``(npoints, fromdims)`` if all chains share a point set.'''
+
+  linear, offset = zip( *map( flatten, chains ) )
+  linear = numpy.array( linear )
+  offset = numpy.array( offset )
+  points = numpy.asarray( points )
+  subscripts = 'pj' if points.ndim == 2 else 'epj'
+  return numpy.einsum( 'eij,{}->epi'.format(subscripts), linear, points ) + offset[:,_,:]
+
 def slicetrans( i1, i2, n ):
   return CanonicalTransformChain( [ Slice(i1,i2,n) ] )
 
@@ -256,6 +256,27 @@ class Statm( object ):
     return '\n'.join( [ 'STATM:     G  M  k  b' ]
       + [ attr + ' ' + (' %s'%getattr(self,attr)).rjust(20-len(attr),'-') for attr in self.__slots__ ] )
 
+def peakrss():
+  'peak resident set size of the current process in bytes, None if unsupported'
+
+  try:
+    import resource
+  except ImportError:
+    return None
+  maxrss = resource.getrusage( resource.RUSAGE_SELF ).ru_maxrss
+  return maxrss if sys.platform == 'darwin' else maxrss * 1024 # linux reports kilobytes
+
+def memstr( nbytes ):
+  'human readable memory size'
+
+  for unit in 'B', 'KB', 'MB', 'GB':
+    if abs(nbytes) < 1024:
+      break
+    nbytes /= 1024
+  else:
+    unit = 'TB'
+  return '{:.1f}{}'.format( nbytes, unit ) if unit != 'B' else '{}B'.format( nbytes )
+
 def regularize( bbox, spacing, xy=numpy.empty((0,2)) ):
   xy = numpy.asarray( xy )
   index0 = numeric.floor( bbox[:,0] / (2*spacing) ) * 2 - 1
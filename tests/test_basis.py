@@ -27,6 +27,40 @@ for ndims in range(1, 4):
       basis(btype=btype, degree=degree, ndims=ndims)
 
 
+@parametrize
+class hierarchical(TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.domain, self.geom = mesh.rectilinear([numpy.linspace(0,1,5)]*self.ndims)
+    for threshold in .5, .25:
+      self.domain = self.domain.refined_by(elem for elem, value in zip(self.domain, self.domain.elem_mean([(self.geom**2).sum(0)**.5], ischeme='gauss1', geometry=self.geom)[0]) if value <= threshold)
+    self.basis = self.domain.basis(self.btype, degree=self.degree)
+    self.gauss = 'gauss{}'.format(2*self.degree)
+
+  def test_levels(self):
+    self.assertEqual(len(self.domain.levels), 3)
+
+  def test_poly(self):
+    target = (self.geom**self.degree).sum(-1)
+    projection = self.domain.projection(target, onto=self.basis, geometry=self.geom, ischeme=self.gauss, droptol=0)
+    error = numpy.sqrt(self.domain.integrate((target-projection)**2, geometry=self.geom, ischeme=self.gauss))
+    numpy.testing.assert_almost_equal(error, 0, decimal=12)
+
+  def test_incremental(self):
+    rebuilt = self.domain.basetopo.hierarchical(list(self.domain), precise=True)
+    self.assertEqual(len(rebuilt.levels), len(self.domain.levels))
+    basis = rebuilt.basis(self.btype, degree=self.degree)
+    self.assertEqual(len(basis), len(self.basis))
+    values, rebuiltvalues = self.domain.elem_eval([self.basis, basis], ischeme=self.gauss, separate=False)
+    numpy.testing.assert_array_almost_equal(values, rebuiltvalues, decimal=15)
+
+for ndims in 1, 2:
+  for btype in 'std', 'spline':
+    for degree in 1, 2:
+      hierarchical(btype=btype, degree=degree, ndims=ndims)
+
+
 @parametrize
 class structured_line(TestCase):
 
@@ -1,17 +1,122 @@
 from nutils import *
 from . import *
-import sys
+import gc
 
-class refcount(TestCase):
+class wrapper(TestCase):
 
   def setUp(self):
-    self.x = object()
-    self.d = {'referenced': self.x, 'dangling': object()}
+    super().setUp()
+    self.calls = []
 
-  def test_noremove(self):
-    keep = set(k for k, v in self.d.items() if sys.getrefcount(v) > 3)
-    assert keep == {'referenced', 'dangling'}
+  def func(self, n):
+    self.calls.append(n)
+    return numpy.arange(n, dtype=float)
 
-  def test_remove(self):
-    keep = set(k for k, v in self.d.items() if sys.getrefcount(v) > 4)
-    assert keep == {'referenced'}
+  def test_unbounded(self):
+    f = cache.Wrapper(self.func)
+    for n in [1, 2, 1, 3, 2]:
+      f(n)
+    self.assertEqual(self.calls, [1, 2, 3])
+    self.assertEqual((f.hits, f.misses, f.evictions), (2, 3, 0))
+
+  def test_maxsize(self):
+    f = cache.Wrapper(self.func, maxsize=2)
+    for n in [1, 2, 1, 3, 1, 2]:
+      f(n)
+    self.assertEqual(self.calls, [1, 2, 3, 2])
+    self.assertEqual((f.hits, f.misses, f.evictions), (2, 4, 2))
+    self.assertEqual(list(f.cache), [(1,), (2,)])
+
+  def test_maxbytes(self):
+    f = cache.Wrapper(self.func, maxbytes=5*8)
+    for n in [2, 3, 2, 4]:
+      f(n)
+    self.assertEqual(self.calls, [2, 3, 4])
+    self.assertEqual(list(f.cache), [(4,)])
+    self.assertEqual(f.nbytes, 4*8)
+
+  def test_oversized(self):
+    f = cache.Wrapper(self.func, maxbytes=8)
+    f(3)
+    f(3)
+    self.assertEqual(self.calls, [3])
+
+  def test_wrappercache(self):
+    fcache = cache.WrapperCache(maxsize=1)
+    fcache.setlimits(self.func, maxsize=2)
+    self.assertEqual(fcache.stats, 'not used')
+    for n in [1, 2, 1]:
+      fcache[self.func](n)
+    self.assertEqual(fcache.stats, 'effectivity 33% (hit 1/3 calls over 1 functions)')
+    fcache[self.func](3)
+    self.assertEqual(fcache.stats, 'effectivity 25% (hit 1/4 calls over 1 functions, 1 evictions)')
+
+class lrudict(TestCase):
+
+  def test_evict(self):
+    d = cache.LRUDict(maxsize=2)
+    d['a'] = 1
+    d['b'] = 2
+    self.assertEqual(d.get('a'), 1)
+    d['c'] = 3
+    self.assertEqual(list(d), ['a', 'c'])
+    self.assertIsNone(d.get('b'))
+    self.assertEqual(d.get('b', 0), 0)
+
+class immutable(TestCase):
+
+  def setUp(self):
+    super().setUp()
+    class T(cache.Immutable):
+      _nurserysize = 2
+      def __init__(self, x, y=None):
+        pass
+    self.T = T
+
+  def test_interning(self):
+    a = self.T(1, (2, 3))
+    self.assertIs(self.T(1, y=(2, 3)), a)
+    self.assertIsNot(self.T(2, (2, 3)), a)
+    self.assertEqual(hash(a), hash((1, (2, 3))))
+    self.assertEqual(self.T.internstats, 'effectivity 33% (hit 1/3 constructions, 2 alive)')
+
+  def test_nursery(self):
+    idx = id(self.T('x'))
+    self.assertEqual(id(self.T('x')), idx)
+    self.T('y')
+    self.T('z')
+    self.assertEqual(len(self.T._cache), 2)
+    self.assertEqual(self.T.internstats, 'effectivity 25% (hit 1/4 constructions, 2 alive)')
+
+  def test_referenced(self):
+    a = self.T(1)
+    for i in range(3):
+      self.T(i+2)
+    self.assertIs(self.T(1), a)
+
+  def test_collected(self):
+    self.T(1)
+    for i in range(2):
+      self.T(i+2)
+    self.assertEqual(len(self.T._cache), 2)
+
+  def test_hash_collision(self):
+    class Collide:
+      def __init__(self, i):
+        self.i = i
+      def __hash__(self):
+        return 0
+      def __eq__(self, other):
+        if self.i is None or other.i is None:
+          raise Exception('arguments compared after collection')
+        return self.i == other.i
+    args = [Collide(i) for i in range(4)]
+    items = [self.T(arg) for arg in args]
+    self.assertEqual(len(set(map(id, items))), 4)
+    self.assertIs(self.T(args[1]), items[1])
+    self.T._nursery.clear()
+    del items
+    for arg in args:
+      arg.i = None # render the arguments uncomparable, like at interpreter shutdown
+    gc.collect()
+    self.assertEqual(len(self.T._cache), 0)
@@ -0,0 +1,62 @@
+from nutils import *
+from . import *
+
+def lookup(name):
+  return core.getprop(name, 'default')
+
+class getprop(TestCase):
+
+  def test_local(self):
+    __myprop__ = 'local'
+    self.assertEqual(lookup('myprop'), 'local')
+
+  def test_nested(self):
+    __myprop__ = 'outer'
+    def inner():
+      a, b, c = range(3)
+      return lookup('myprop')
+    self.assertEqual(inner(), 'outer')
+
+  def test_shadow(self):
+    __myprop__ = 'outer'
+    def inner():
+      __myprop__ = 'inner'
+      return lookup('myprop')
+    self.assertEqual(inner(), 'inner')
+    self.assertEqual(lookup('myprop'), 'outer')
+
+  def test_unassigned(self):
+    def inner(assign):
+      if assign:
+        __myprop__ = 'inner'
+      return lookup('myprop')
+    self.assertEqual(inner(False), 'default')
+    self.assertEqual(inner(True), 'inner')
+    self.assertEqual(inner(False), 'default')
+
+  def test_closure(self):
+    __myprop__ = 'closure'
+    def inner():
+      return __myprop__, lookup('myprop')
+    self.assertEqual(inner(), ('closure', 'closure'))
+
+  def test_exec(self):
+    ns = dict(lookup=lookup)
+    exec('__myprop__ = "exec"\nvalue = lookup("myprop")', ns)
+    self.assertEqual(ns['value'], 'exec')
+
+  def test_global(self):
+    self.assertEqual(lookup('nprocs'), core.globalproperties['nprocs'])
+
+  def test_default(self):
+    self.assertEqual(lookup('nonexistent'), 'default')
+    with self.assertRaises(NameError):
+      core.getprop('nonexistent')
+
+  def test_collected(self):
+    code = compile('lookup("myprop")', '<test>', 'eval')
+    eval(code, dict(lookup=lookup))
+    self.assertIn(id(code), core._hasprops)
+    codeid = id(code)
+    del code
+    self.assertNotIn(codeid, core._hasprops)
@@ -1,5 +1,6 @@
 from nutils import *
 from . import *
+import itertools, functools, operator, math
 
 @parametrize
 class elem(TestCase):
@@ -34,6 +35,32 @@ class elem(TestCase):
   def test_ribbons(self):
     self.ref.ribbons
 
+  def test_ischeme(self):
+    rule = self.ref.getischeme('gauss3')
+    self.assertIs(self.ref.getischeme('gauss3'), rule)
+    points, weights = rule
+    self.assertEqual(points.shape, (len(weights), self.ref.ndims))
+    numpy.testing.assert_almost_equal(weights.sum(), self.ref.volume)
+
+  @parametrize.enable_if(lambda ndims, **kwargs: len(ndims) >= 2)
+  def test_ischeme_factors(self):
+    rule = self.ref.getischeme('gauss3')
+    self.assertEqual(rule.degree, 3)
+    rule1, rule2 = rule.factors
+    numpy.testing.assert_almost_equal(rule.weights, (rule1.weights[:,_] * rule2.weights[_,:]).ravel())
+    numpy.testing.assert_almost_equal(rule.points[:,:rule1.points.shape[1]], numpy.repeat(rule1.points, len(rule2.weights), axis=0))
+    numpy.testing.assert_almost_equal(rule.points[:,rule1.points.shape[1]:], numpy.tile(rule2.points, (len(rule1.weights),1)))
+
+  @parametrize.enable_if(lambda ndims, **kwargs: sum(ndims) >= 1)
+  def test_dof_vertex_weights(self):
+    for degree in 1, 2, 3:
+      with self.subTest(degree=degree):
+        weights = numpy.asarray(self.ref.get_dof_vertex_weights(degree))
+        self.assertEqual(weights.shape, (self.ref.get_ndofs(degree), self.ref.nverts))
+        points = numpy.dot(weights, self.ref.vertices) / weights.sum(1)[:,_]
+        values = numeric.poly_eval(self.ref.get_poly_coeffs('lagrange', degree=degree)[_], points)
+        numpy.testing.assert_almost_equal(values, numpy.eye(len(weights)))
+
 elem('point', ndims=[0], exactcentroid=numpy.zeros((0,)))
 elem('line', ndims=[1], exactcentroid=[.5])
 elem('triangle', ndims=[2], exactcentroid=[1/3]*2)
@@ -42,3 +69,46 @@ elem('square', ndims=[1,1], exactcentroid=[.5]*2)
 elem('hexagon', ndims=[1,1,1], exactcentroid=[.5]*3)
 elem('prism1', ndims=[2,1], exactcentroid=[1/3,1/3,1/2])
 elem('prism2', ndims=[1,2], exactcentroid=[1/2,1/3,1/3])
+
+@parametrize
+class simplexgauss(TestCase):
+
+  def test_exact(self):
+    ref = element.getsimplex(self.ndims)
+    for degree in range(self.maxdegree+1):
+      with self.subTest(degree=degree):
+        points, weights = map(numpy.asarray, ref.getischeme('gauss{}'.format(degree)))
+        self.assertTrue((weights > 0).all() or degree in self.negative)
+        exponents = numpy.array([e for e in itertools.product(range(degree+1), repeat=self.ndims) if sum(e) <= degree])
+        exact = [functools.reduce(operator.mul, map(math.factorial, e)) / math.factorial(sum(e)+self.ndims) for e in exponents]
+        numpy.testing.assert_almost_equal(numpy.prod(points[_,:,:]**exponents[:,_,:], axis=2).dot(weights), exact, decimal=15)
+
+  def test_symmetric(self):
+    ref = element.getsimplex(self.ndims)
+    for degree in element._simplexorbits[self.ndims]:
+      with self.subTest(degree=degree):
+        points, weights = map(numpy.asarray, ref.getischeme('gauss{}'.format(degree)))
+        self.assertTrue((points > 0).all() and (points.sum(1) < 1).all())
+        bary = numpy.concatenate([1-points.sum(1)[:,_], points], axis=1)
+        for perm in itertools.permutations(range(self.ndims+1)):
+          index = numpy.linalg.norm(bary[:,_,perm] - bary[_,:,:], axis=2).argmin(axis=1)
+          numpy.testing.assert_almost_equal(bary[index], bary[:,perm], decimal=14)
+          numpy.testing.assert_almost_equal(weights[index], weights, decimal=15)
+
+simplexgauss('triangle', ndims=2, maxdegree=22, negative=[3,7])
+simplexgauss('tetrahedron', ndims=3, maxdegree=14, negative=[3,4,7,8])
+
+class parseischeme(TestCase):
+
+  def test_int(self):
+    self.assertEqual(element.parseischeme('gauss4'), ('gauss', 4))
+
+  def test_tuple(self):
+    self.assertEqual(element.parseischeme('gauss2,3'), ('gauss', (2,3)))
+
+  def test_noargs(self):
+    self.assertEqual(element.parseischeme('vtk'), ('vtk', None))
+
+  def test_noeval(self):
+    with self.assertRaises(ValueError):
+      element.parseischeme('gauss__import__("os")')
@@ -47,6 +47,48 @@ class Variables:
 v = Variables(x=Array('x', [2]), altgeom=Array('altgeom', [3]))
 functions = dict(func1=1, func2=2, func3=3)
 
+class parse_cache(TestCase):
+
+  def test_same_shapes(self):
+    variables = dict(a=Array('a', [2]), b=Array('b', [2]))
+    ast1, arg_shapes = nutils.expression.parse('a_i b_j + ?arg_ij', variables, functions, 'ij')
+    self.assertEqual(arg_shapes, dict(arg=(2,2)))
+    variables = dict(a=Array('c', [2]), b=Array('d', [2]))
+    ast2, arg_shapes = nutils.expression.parse('a_i b_j + ?arg_ij', variables, functions, 'ij')
+    self.assertEqual(arg_shapes, dict(arg=(2,2)))
+    self.assertEqual(ast2, _replace(ast1, {'a': 'c', 'b': 'd'}))
+
+  def test_different_shapes(self):
+    ast1, arg_shapes = nutils.expression.parse('a_i b_j + ?arg_ij', dict(a=Array('a', [2]), b=Array('b', [2])), functions, 'ij')
+    ast2, arg_shapes = nutils.expression.parse('a_i b_j + ?arg_ij', dict(a=Array('a', [2]), b=Array('b', [3])), functions, 'ij')
+    self.assertEqual(arg_shapes, dict(arg=(2,3)))
+    self.assertNotEqual(ast1, ast2)
+
+  def test_different_arg_shapes(self):
+    variables = dict(a=Array('a', [2]))
+    nutils.expression.parse('a_i ?arg_i', variables, functions, '')
+    with self.assertRaises(nutils.expression.ExpressionSyntaxError):
+      nutils.expression.parse('a_i ?arg_i', variables, functions, '', dict(arg=(3,)))
+
+  def test_unknown_variable(self):
+    nutils.expression.parse('a_i b_i', dict(a=Array('a', [2]), b=Array('b', [2])), functions, '')
+    with self.assertRaises(nutils.expression.ExpressionSyntaxError):
+      nutils.expression.parse('a_i b_i', dict(a=Array('a', [2])), functions, '')
+
+  def test_same_object(self):
+    a = Array('a', [2])
+    nutils.expression.parse('a_i b_i', dict(a=a, b=a), functions, '')
+    ast, arg_shapes = nutils.expression.parse('a_i b_i', dict(a=a, b=Array('b', [2])), functions, '')
+    self.assertEqual(ast, ('sum', ('mul', _(a), _(Array('b', [2]))), _(0)))
+
+def _replace(ast, names):
+  if ast[0] is not None:
+    return (ast[0],) + tuple(_replace(arg, names) for arg in ast[1:])
+  elif isinstance(ast[1], Array) and ast[1].text in names:
+    return _(Array(names[ast[1].text], ast[1].shape))
+  else:
+    return ast
+
 class parse(TestCase):
 
   def assert_ast(self, expression, indices, ast, **parse_kwargs):
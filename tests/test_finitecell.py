@@ -226,6 +226,57 @@ class multitrim(TestCase):
     numpy.testing.assert_almost_equal( L, 5.6, decimal=4 )
 
 
+class trimcache(TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.domain, self.geom = mesh.rectilinear([numpy.linspace(-1,1,5)]*2)
+    self.levelset = .7 - function.norm2(self.geom)
+    self.trimmed = self.domain.trim(self.levelset, maxrefine=2)
+
+  def test_repeat(self):
+    hits = topology._trimcache.hits
+    trimmed = self.domain.trim(self.levelset, maxrefine=2)
+    self.assertEqual(trimmed.elements, self.trimmed.elements)
+    ncut = sum(bool(ref) and ref != elem.reference for ref, elem in zip(trimmed.refs, self.domain))
+    self.assertEqual(topology._trimcache.hits - hits, ncut)
+
+  def test_scaled(self):
+    trimmed = self.domain.trim(2*self.levelset, maxrefine=2)
+    self.assertEqual(trimmed.elements, self.trimmed.elements)
+
+  def test_parallel(self):
+    for __nprocs__ in 1, 2:
+      with self.subTest(nprocs=__nprocs__):
+        trimmed = self.domain.trim(self.levelset, maxrefine=2)
+        self.assertEqual(trimmed.elements, self.trimmed.elements)
+
+
+class trimmedischeme(TestCase):
+
+  def setUp(self):
+    super().setUp()
+    domain, self.geom = mesh.rectilinear([numpy.linspace(-1,1,5)]*2)
+    self.trimmed = domain.trim(.7-function.norm2(self.geom), maxrefine=2)
+    self.refs = [elem.reference for elem in self.trimmed if isinstance(elem.reference, (element.WithChildrenReference, element.MosaicReference))]
+    self.assertTrue(self.refs)
+
+  def test_tabulated(self):
+    for ref in self.refs:
+      self.assertIs(ref.getischeme('gauss2'), ref.getischeme('gauss2'))
+
+  def test_fit(self):
+    func = 1 + self.geom[0]**2 * self.geom[1] - self.geom[1]**3
+    numpy.testing.assert_almost_equal(self.trimmed.integrate(func, geometry=self.geom, ischeme='fit3'), self.trimmed.integrate(func, geometry=self.geom, ischeme='gauss3'), decimal=12)
+    for ref in self.refs:
+      self.assertLessEqual(len(ref.getischeme('fit3')[0]), len(ref.getischeme('gauss3')[0]))
+
+  def test_fit_nodegree(self):
+    for ref in self.refs[0], self.refs[0].baseref:
+      with self.subTest(type(ref).__name__), self.assertRaisesRegex(ValueError, "'fit'"):
+        ref.getischeme('fit')
+
+
 class leveltopo(TestCase):
 
   def setUp(self):
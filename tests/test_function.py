@@ -1,4 +1,4 @@
-import itertools
+import itertools, tempfile, os, json
 from nutils import *
 from . import *
 
@@ -366,13 +366,13 @@ _check('inflate', lambda f: function.Inflate(f,dofmap=[0,2],length=3,axis=1), la
 
 _polyval_mask = lambda shape, ndim: 1 if ndim == 0 else numpy.array([sum(i[-ndim:]) < shape[-1] for i in numpy.ndindex(shape)], dtype=int).reshape(shape)
 _polyval_desired = lambda c, x: sum(c[(...,*i)]*(x[(slice(None),*[None]*(c.ndim-1-x.shape[1]))]**i).prod(-1) for i in itertools.product(*[range(c.shape[-1])]*x.shape[1]) if sum(i) < c.shape[-1])
-_check('polyval_1d_p0', lambda c, x: function.Polyval(c*_polyval_mask(c.shape,2), function.asarray(x), 1), _polyval_desired, [(1,)], pass_geom=True, ndim=1)
-_check('polyval_1d_p1', lambda c, x: function.Polyval(c*_polyval_mask(c.shape,2), function.asarray(x), 1), _polyval_desired, [(2,)], pass_geom=True, ndim=1)
-_check('polyval_1d_p2', lambda c, x: function.Polyval(c*_polyval_mask(c.shape,2), function.asarray(x), 1), _polyval_desired, [(3,)], pass_geom=True, ndim=1)
-_check('polyval_2d_p0', lambda c, x: function.Polyval(c*_polyval_mask(c.shape,2), function.asarray(x), 2), _polyval_desired, [(1,1)], pass_geom=True, ndim=2)
-_check('polyval_2d_p1', lambda c, x: function.Polyval(c*_polyval_mask(c.shape,2), function.asarray(x), 2), _polyval_desired, [(2,2)], pass_geom=True, ndim=2)
-_check('polyval_2d_p2', lambda c, x: function.Polyval(c*_polyval_mask(c.shape,2), function.asarray(x), 2), _polyval_desired, [(3,3)], pass_geom=True, ndim=2)
-_check('polyval_2d_p1_23', lambda c, x: function.Polyval(c*_polyval_mask(c.shape,2), function.asarray(x), 2), _polyval_desired, [(2,3,2,2)], pass_geom=True, ndim=2)
+_check('polyval_1d_p0', lambda c, x: function.Polyval(c*_polyval_mask(c.shape,2), function.asarray(x)/4, 1), lambda c, x: _polyval_desired(c, x/4), [(1,)], pass_geom=True, ndim=1)
+_check('polyval_1d_p1', lambda c, x: function.Polyval(c*_polyval_mask(c.shape,2), function.asarray(x)/4, 1), lambda c, x: _polyval_desired(c, x/4), [(2,)], pass_geom=True, ndim=1)
+_check('polyval_1d_p2', lambda c, x: function.Polyval(c*_polyval_mask(c.shape,2), function.asarray(x)/4, 1), lambda c, x: _polyval_desired(c, x/4), [(3,)], pass_geom=True, ndim=1)
+_check('polyval_2d_p0', lambda c, x: function.Polyval(c*_polyval_mask(c.shape,2), function.asarray(x)/4, 2), lambda c, x: _polyval_desired(c, x/4), [(1,1)], pass_geom=True, ndim=2)
+_check('polyval_2d_p1', lambda c, x: function.Polyval(c*_polyval_mask(c.shape,2), function.asarray(x)/4, 2), lambda c, x: _polyval_desired(c, x/4), [(2,2)], pass_geom=True, ndim=2)
+_check('polyval_2d_p2', lambda c, x: function.Polyval(c*_polyval_mask(c.shape,2), function.asarray(x)/4, 2), lambda c, x: _polyval_desired(c, x/4), [(3,3)], pass_geom=True, ndim=2)
+_check('polyval_2d_p1_23', lambda c, x: function.Polyval(c*_polyval_mask(c.shape,2), function.asarray(x)/4, 2), lambda c, x: _polyval_desired(c, x/4), [(2,3,2,2)], pass_geom=True, ndim=2)
 
 
 class commutativity(TestCase):
@@ -448,7 +448,7 @@ class elemwise(TestCase):
       numpy.arange(4, dtype=float).reshape(2,2),
       numpy.arange(6, dtype=float).reshape(3,2),
     )))
-    self.func = function.Elemwise(self.data, self.index, float)
+    self.func = function.Elemwise(self.data, numeric.const(numpy.arange(5)), self.index, float)
 
   def test_evalf(self):
     for i, trans in enumerate(self.transforms):
@@ -467,6 +467,80 @@ class elemwise(TestCase):
     self.assertEqual(function.localgradient(self.func, self.domain.ndims).shape, self.func.shape+(self.domain.ndims,))
 
 
+class polyfunc(TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.domain, geom = mesh.rectilinear([4])
+    self.transforms = tuple(sorted(elem.transform for elem in self.domain))
+    coeffs = numeric.const([[1.,-1.],[0.,1.]])
+    self.coeffs = coeffs, numeric.const(numpy.array(coeffs)), coeffs, numeric.const([[1.,-2.],[0.,2.]])
+    self.dofs = tuple(map(numeric.const, [[0,1],[1,2],[2,3],[3,4]]))
+    self.func = function.polyfunc(self.coeffs, self.dofs, 5, self.transforms)
+
+  def test_eval(self):
+    points = numpy.array([[0.],[.25],[1.]])
+    for trans, coeffs, dofs in zip(self.transforms, self.coeffs, self.dofs):
+      desired = numpy.zeros((len(points), 5))
+      desired[:,dofs] = numeric.poly_eval(numpy.asarray(coeffs)[_], points)
+      numpy.testing.assert_array_almost_equal(self.func.eval(_transforms=(trans,), _points=points), desired)
+
+  def test_unique(self):
+    elemwise = self.func.func.coeffs
+    self.assertEqual(len(elemwise._unique), 2)
+    self.assertEqual(elemwise._dataindex.tolist(), [0,0,0,1])
+
+  def test_cache(self):
+    points = numpy.array([[0.],[.5]])
+    fcache = cache.WrapperCache()
+    for trans in self.transforms:
+      self.func.eval(_transforms=(trans,), _points=points, _cache=fcache)
+    self.assertEqual(fcache[numeric.poly_dot].misses, 2)
+
+
+class profiling(TestCase):
+
+  def setUp(self):
+    super().setUp()
+    tmpdir = tempfile.TemporaryDirectory()
+    self.outdir = tmpdir.name
+    self.addCleanup(tmpdir.cleanup)
+    self.domain, self.geom = mesh.rectilinear([4,4])
+
+  def test_disabled(self):
+    self.assertIsNone(function._profile)
+    with function.profiling(path=None):
+      self.assertIsNotNone(function._profile)
+    self.assertIsNone(function._profile)
+
+  def test_integrate(self):
+    for __nprocs__ in 1, 2:
+      with self.subTest(nprocs=__nprocs__), function.profiling(path=None) as profile:
+        area = self.domain.integrate(function.J(self.geom), ischeme='gauss1')
+      self.assertAlmostEqual(area, 16)
+      byclass = profile.byclass
+      self.assertIn('RootTransform', byclass)
+      ncalls, seconds, nbytes = byclass['RootTransform']
+      self.assertEqual(ncalls, len(self.domain))
+      self.assertEqual(nbytes, len(self.domain) * 4 * 8)
+
+  def test_nprocs_in_context(self):
+    with function.profiling(path=None) as profile:
+      __nprocs__ = 2
+      self.domain.integrate(function.J(self.geom), ischeme='gauss1')
+    ncalls, seconds, nbytes = profile.byclass['RootTransform']
+    self.assertEqual(ncalls, len(self.domain))
+
+  def test_json(self):
+    __outdir__ = self.outdir
+    with function.profiling():
+      self.domain.integrate(function.J(self.geom), ischeme='gauss1')
+    with open(os.path.join(self.outdir, 'profile.json')) as f:
+      data = json.load(f)
+    self.assertEqual(data['classes']['RootTransform']['calls'], len(self.domain))
+    self.assertTrue(all(node['calls'] > 0 for node in data['nodes']))
+
+
 class namespace(TestCase):
 
   def test_set_scalar(self):
@@ -595,6 +669,18 @@ class namespace(TestCase):
     with self.assertRaises(TypeError):
       ns | 2
 
+  def test_eval_cached(self):
+    ns = function.Namespace()
+    ns.foo = function.Argument('arg', [2,3])
+    self.assertIs(ns.eval_ij('sin(foo_ij) + 2 foo_ij'), ns.eval_ij('sin(foo_ij) + 2 foo_ij'))
+    ns.foo = function.Argument('arg', [3,2])
+    self.assertEqual(ns.eval_ij('sin(foo_ij) + 2 foo_ij').shape, (3,2))
+
+  def test_eval_cached_dtype(self):
+    ns = function.Namespace()
+    self.assertIsInstance('2' @ ns, int)
+    self.assertIsInstance('2.0' @ ns, float)
+
 
 class eval_ast(TestCase):
 
@@ -242,3 +242,37 @@ class move_outdir(ContextTestCase):
     with nutils.log.HtmlLog(stream, title='test') as __log__:
       generate_log()
     self.assertEqual(stream.getvalue(), log_html)
+
+class ratelimited(ContextTestCase):
+
+  def setUpContext(self, stack):
+    super().setUpContext(stack)
+    self.stream = io.StringIO()
+    self.log = stack.enter_context(nutils.log.StdoutLog(self.stream))
+
+  def generate(self, interval):
+    __log__ = self.log
+    for i in nutils.log.iter('iter', 'abc', interval=interval):
+      nutils.log.warning(i)
+
+  def test_always(self):
+    __verbose__ = len(nutils.log.LEVELS)
+    self.generate(interval=-1)
+    self.assertEqual(self.stream.getvalue(), 'iter 0 (0%) > a\niter 1 (33%) > b\niter 2 (67%) > c\n')
+
+  def test_never(self):
+    __verbose__ = len(nutils.log.LEVELS)
+    self.generate(interval=float('inf'))
+    self.assertEqual(self.stream.getvalue(), 'iter 0 (0%) > a\niter 0 (0%) > b\niter 0 (0%) > c\n')
+
+  def test_verbose(self):
+    __verbose__ = nutils.log.LEVELS.index('info')
+    self.generate(interval=-1)
+    self.assertEqual(self.stream.getvalue(), 'a\nb\nc\n')
+
+  def test_context(self):
+    __verbose__ = len(nutils.log.LEVELS)
+    __log__ = self.log
+    for index, item in nutils.log.enumerate('iter', 'ab', interval=-1):
+      self.assertEqual(self.log._context, ['iter {} ({}%)'.format(index, index*50)])
+    self.assertEqual(self.log._context, [])
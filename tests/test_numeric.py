@@ -38,3 +38,63 @@ class searchsorted(unittest.TestCase):
 
   def test_strings(self):
     self.assertEqual(numeric.searchsorted( ['bar','foo','fool'], 'food' ), 2)
+
+
+@parametrize
+class poly_vandermonde(unittest.TestCase):
+
+  def setUp(self):
+    numpy.random.seed(0)
+    self.points = numeric.const(numpy.random.uniform(size=(5,self.ndim)))
+    mask = numpy.array([sum(i) <= self.degree for i in numpy.ndindex(*(self.degree+1,)*self.ndim)]).reshape((self.degree+1,)*self.ndim)
+    self.coeffs = numeric.const(numpy.random.uniform(size=(1,2)+mask.shape) * mask)
+
+  def horner(self, coeffs):
+    # reference evaluation by Horner's scheme per dimension
+    for dim in reversed(range(self.ndim)):
+      result = numpy.empty((len(self.points),)+coeffs.shape[1:-1])
+      result[:] = coeffs[...,-1]
+      for j in reversed(range(coeffs.shape[-1]-1)):
+        result *= self.points[(slice(None),dim)+(numpy.newaxis,)*(result.ndim-1)]
+        result += coeffs[...,j]
+      coeffs = result
+    return coeffs
+
+  def test_eval(self):
+    numpy.testing.assert_almost_equal(numeric.poly_eval(self.coeffs, self.points), self.horner(self.coeffs), decimal=15)
+
+  def test_grad(self):
+    coeffs = self.coeffs
+    for ngrad in range(1, self.degree+1):
+      coeffs = numeric.poly_grad(coeffs, self.ndim)
+      table = numeric.poly_vandermonde(self.points, self.coeffs.shape[-self.ndim:], ngrad)
+      self.assertEqual(table.shape, (len(self.points),)+(self.ndim,)*ngrad+self.coeffs.shape[-self.ndim:])
+      numpy.testing.assert_almost_equal(numeric.poly_dot(self.coeffs, table, self.ndim), self.horner(coeffs), decimal=14)
+
+  def test_pointwise(self):
+    coeffs = numeric.const(numpy.random.uniform(size=(len(self.points),)+self.coeffs.shape[1:]) * (self.coeffs[0] != 0))
+    table = numeric.poly_vandermonde(self.points, coeffs.shape[-self.ndim:])
+    numpy.testing.assert_almost_equal(numeric.poly_dot(coeffs, table, self.ndim), self.horner(coeffs), decimal=15)
+
+poly_vandermonde('1d', ndim=1, degree=3)
+poly_vandermonde('2d', ndim=2, degree=2)
+poly_vandermonde('3d', ndim=3, degree=2)
+
+
+class const(unittest.TestCase):
+
+  def test_hash(self):
+    a = numeric.const(numpy.arange(6.).reshape(2,3))
+    b = numeric.const(numpy.arange(6.).reshape(2,3))
+    self.assertEqual(hash(a), hash(b))
+    self.assertEqual(a, b)
+    self.assertNotEqual(a, numeric.const(numpy.arange(6.)))
+
+  def test_insertaxis(self):
+    a = numpy.arange(12.).reshape(3,4)
+    for base in a, a[:,1:]:
+      with self.subTest(contiguous=base.flags.c_contiguous):
+        c = numeric.const(base, copy=False).insertaxis(1, 2)
+        self.assertEqual(c.shape, (3,2)+base.shape[1:])
+        numpy.testing.assert_array_equal(c, numpy.repeat(base[:,numpy.newaxis], 2, axis=1))
+        self.assertFalse(numpy.asarray(c).flags.writeable)
@@ -0,0 +1,56 @@
+from nutils import *
+from . import *
+import tempfile, os, xml.etree.ElementTree
+
+class xdmf(TestCase):
+
+  def setUp(self):
+    super().setUp()
+    tmpdir = tempfile.TemporaryDirectory()
+    self.outdir = tmpdir.name
+    self.addCleanup(tmpdir.cleanup)
+    self.domain, self.geom = mesh.rectilinear([2,3])
+    self.cellpoints = self.domain.simplex.elem_eval(self.geom, ischeme='vtk', separate=True)
+
+  def readarray(self, dataitem):
+    dtype = {('Float','8'): numpy.float64, ('Int','4'): numpy.int32}[dataitem.get('NumberType'), dataitem.get('Precision')]
+    shape = tuple(map(int, dataitem.get('Dimensions').split()))
+    with open(os.path.join(self.outdir, dataitem.text), 'rb') as f:
+      f.seek(int(dataitem.get('Seek')))
+      return numpy.fromfile(f, dtype=dtype, count=numpy.prod(shape)).reshape(shape)
+
+  def test_timeseries(self):
+    __outdir__ = self.outdir
+    with plot.XDMFFile('series') as xdmf:
+      xdmf.unstructuredgrid(self.cellpoints)
+      for t in range(3):
+        xdmf.timestep(t*.5)
+        xdmf.pointdataarray('x', [p*t for p in self.cellpoints])
+        xdmf.celldataarray('t', numpy.full(len(self.cellpoints), t, dtype=float))
+    self.assertEqual(sorted(os.listdir(self.outdir)), ['series.bin', 'series.xmf'])
+    grids = xml.etree.ElementTree.parse(os.path.join(self.outdir, 'series.xmf')).findall('Domain/Grid/Grid')
+    self.assertEqual(len(grids), 3)
+    points = numpy.concatenate(self.cellpoints, axis=0)
+    for t, grid in enumerate(grids):
+      self.assertEqual(float(grid.find('Time').get('Value')), t*.5)
+      self.assertEqual(grid.find('Topology').get('NumberOfElements'), str(len(self.cellpoints)))
+      self.assertEqual(grid.find('Geometry/DataItem').get('Seek'), grids[0].find('Geometry/DataItem').get('Seek'))
+      numpy.testing.assert_array_equal(self.readarray(grid.find('Geometry/DataItem'))[:,:2], points)
+      x, c = grid.findall('Attribute')
+      self.assertEqual((x.get('AttributeType'), x.get('Center')), ('Vector', 'Node'))
+      self.assertEqual((c.get('AttributeType'), c.get('Center')), ('Scalar', 'Cell'))
+      numpy.testing.assert_array_equal(self.readarray(x.find('DataItem'))[:,:2], points*t)
+      numpy.testing.assert_array_equal(self.readarray(c.find('DataItem')), t)
+    cells = self.readarray(grids[0].find('Topology/DataItem')).reshape(-1, 5)
+    numpy.testing.assert_array_equal(cells[:,0], 5) # quadrilaterals
+    numpy.testing.assert_array_equal(cells[:,1:].ravel(), numpy.arange(len(points)))
+
+  def test_ndigits(self):
+    __outdir__ = self.outdir
+    for i in range(2):
+      with plot.XDMFFile('series', ndigits=2) as xdmf:
+        xdmf.unstructuredgrid(self.cellpoints)
+        xdmf.save()
+    self.assertEqual(sorted(os.listdir(self.outdir)), ['series00.bin', 'series00.xmf', 'series01.bin', 'series01.xmf'])
+    grid = xml.etree.ElementTree.parse(os.path.join(self.outdir, 'series01.xmf')).find('Domain/Grid/Grid')
+    self.assertEqual(grid.find('Geometry/DataItem').text, 'series01.bin')
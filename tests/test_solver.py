@@ -1,6 +1,6 @@
 from nutils import solver, mesh, function
 from . import *
-import numpy
+import numpy, functools, types
 
 
 class laplace(TestCase):
@@ -16,17 +16,54 @@ class laplace(TestCase):
                   + domain.boundary['top'].integral(basis, geometry=geom, degree=2)
 
   def test_res(self):
-    for name in 'direct', 'newton':
+    for name in 'direct', 'newton', 'newtonkrylov':
       with self.subTest(name):
         if name == 'direct':
           lhs = solver.solve_linear('dofs', residual=self.residual, constrain=self.cons)
-        else:
+        elif name == 'newton':
           lhs = solver.newton('dofs', residual=self.residual, constrain=self.cons).solve(tol=1e-10, maxiter=0)
+        else:
+          lhs = solver.newtonkrylov('dofs', residual=self.residual, constrain=self.cons, directional='exact', krylovtol=1e-14, restart=100).solve(tol=1e-10, maxiter=1)
         res = self.residual.eval(arguments=dict(dofs=lhs))
         resnorm = numpy.linalg.norm(res[~self.cons.where])
         self.assertLess(resnorm, 1e-13)
 
 
+class integral(TestCase):
+
+  def setUp(self):
+    super().setUp()
+    domain, geom = mesh.rectilinear([4])
+    basis = domain.basis('std', degree=1)
+    u = basis.dot(function.Argument('dofs', [len(basis)]))
+    self.res1 = domain.integral(basis * u**2, geometry=geom, degree=3)
+    self.res2 = domain.boundary.integral(basis * function.sin(u), geometry=geom, degree=0)
+    self.lhs = numpy.linspace(0, 1, len(basis))
+
+  def test_derivative_cached(self):
+    self.assertIs(self.res1.derivative('dofs'), self.res1.derivative('dofs'))
+
+  def test_derivative_shared(self):
+    jac1 = self.res1.derivative('dofs').eval(arguments=dict(dofs=self.lhs)).toarray()
+    jac2 = self.res2.derivative('dofs').eval(arguments=dict(dofs=self.lhs)).toarray()
+    res = self.res1 - 2 * self.res2
+    jac = res.derivative('dofs').eval(arguments=dict(dofs=self.lhs)).toarray()
+    numpy.testing.assert_array_almost_equal(jac, jac1 - 2 * jac2, decimal=14)
+
+  def test_derivative_operands_untouched(self):
+    self.res1.derivative('dofs')
+    self.res2.derivative('dofs')
+    key, = self.res1._seen
+    memo1, memo2 = [dict(res._seen[key]) for res in (self.res1, self.res2)]
+    (self.res1 + self.res2).derivative('dofs')
+    self.assertEqual(self.res1._seen[key].keys(), memo1.keys())
+    self.assertEqual(self.res2._seen[key].keys(), memo2.keys())
+
+  def test_contains(self):
+    self.assertTrue(self.res1.contains('dofs'))
+    self.assertFalse(self.res1.contains('other'))
+    self.assertFalse(self.res1.derivative('dofs').derivative('dofs').contains('dofs'))
+
 class navierstokes(TestCase):
 
   def setUp(self):
@@ -46,6 +83,7 @@ class navierstokes(TestCase):
     self.cons = domain.boundary['top,bottom'].project([0,0], onto=ubasis, geometry=geom, ischeme='gauss2') \
               | domain.boundary['left'].project([geom[1]*(1-geom[1]),0], onto=ubasis, geometry=geom, ischeme='gauss2')
     self.lhs0 = solver.solve_linear('dofs', residual=stokesres, constrain=self.cons)
+    self.stokesjac = stokesres.derivative('dofs')
     self.tol = 1e-10
 
   def assert_resnorm(self, lhs):
@@ -60,10 +98,49 @@ class navierstokes(TestCase):
   def test_newton(self):
     self.assert_resnorm(solver.newton('dofs', residual=self.residual, lhs0=self.lhs0, constrain=self.cons).solve(tol=self.tol, maxiter=2))
 
+  def test_newton_residual_linesearch(self):
+    self.assert_resnorm(solver.newton('dofs', residual=self.residual, lhs0=self.lhs0, constrain=self.cons, linesearch='residual').solve(tol=self.tol, maxiter=2))
+
+  def test_newton_reuse(self):
+    self.assert_resnorm(solver.newton('dofs', residual=self.residual, constrain=self.cons, linesearch='residual', maxreuse=3, reuserate=.5).solve(tol=self.tol, maxiter=8))
+
+  def test_newton_reuse_jacobian_linesearch(self):
+    self.assert_resnorm(solver.newton('dofs', residual=self.residual, constrain=self.cons, maxreuse=3, reuserate=.5).solve(tol=self.tol, maxiter=8))
+
+  def test_reuse_respects_solver(self):
+    jac = self.stokesjac.eval()
+    zcons = numpy.where(self.cons.where, 0, numpy.nan)
+    self.assertIsInstance(solver._jacobiansolver(jac, zcons, True, {}), types.FunctionType)
+    self.assertIsInstance(solver._jacobiansolver(jac, zcons, True, dict(solver='gmres')), functools.partial)
+
+  def test_chord(self):
+    self.assert_resnorm(solver.newton('dofs', residual=self.residual, constrain=self.cons, linesearch='residual', maxreuse=numpy.inf, reuserate=1).solve(tol=self.tol, maxiter=20))
+
+  def test_newtonkrylov(self):
+    for directional in 'finite', 'exact':
+      with self.subTest(directional=directional):
+        self.assert_resnorm(solver.newtonkrylov('dofs', residual=self.residual, lhs0=self.lhs0, constrain=self.cons, preconditioner=self.stokesjac, directional=directional, krylovtol=1e-6).solve(tol=self.tol, maxiter=4))
+
   def test_pseudotime(self):
     self.assert_resnorm(solver.pseudotime('dofs', residual=self.residual, lhs0=self.lhs0, constrain=self.cons, inertia=self.inertia, timestep=1).solve(tol=self.tol, maxiter=3))
 
 
+class reusedjacobian(TestCase):
+
+  def setUp(self):
+    super().setUp()
+    domain, geom = mesh.rectilinear([1])
+    u = function.Argument('u', [1])
+    self.residual = domain.integral(function.exp(u) - 10, geometry=geom, degree=0)
+
+  def test_backtrack(self):
+    lhs = solver.newton('u', self.residual, lhs0=numpy.array([1.]), maxreuse=numpy.inf, reuserate=1).solve(tol=1e-10, maxiter=50)
+    self.assertAlmostEqual(lhs[0], numpy.log(10), places=10)
+
+  def test_reassemble(self):
+    lhs = solver.newton('u', self.residual, lhs0=numpy.array([1.]), maxreuse=numpy.inf, reuserate=1, minrelax=.9, maxrelax=.95).solve(tol=1e-10, maxiter=50)
+    self.assertAlmostEqual(lhs[0], numpy.log(10), places=10)
+
 class optimize(TestCase):
 
   def setUp(self):
@@ -100,3 +177,33 @@ class optimize(TestCase):
     isnan = numpy.isnan(cons)
     self.assertTrue(numpy.equal(isnan, [0,1,1,0,1,1,0,1,1]).all())
     numpy.testing.assert_almost_equal(cons[~isnan], .5, decimal=15)
+
+
+@parametrize
+class adaptivethetamethod(TestCase):
+
+  def setUp(self):
+    super().setUp()
+    domain, geom = mesh.rectilinear([1])
+    basis = domain.basis('discont', degree=0)
+    u = basis.dot(function.Argument('dofs', [1]))
+    self.inertia = domain.integral(basis * u, geometry=geom, degree=0)
+    self.residual = domain.integral(basis * u**2, geometry=geom, degree=0) # du/dt = -u^2
+
+  def test_decay(self):
+    times = []
+    for t, lhs in solver.adaptivethetamethod('dofs', self.residual, self.inertia, timestep=.01, lhs0=numpy.ones(1), theta=self.theta, tol=self.tol):
+      times.append(t)
+      if t >= 2:
+        break
+    self.assertLess(len(times), self.maxsteps)
+    self.assertAlmostEqual(lhs[0], 1/(1+t), delta=self.maxerror)
+    self.assertGreater(numpy.diff(times).max(), .05) # grown from initial timestep .01
+
+  def test_nonconverging(self):
+    with self.assertRaises(solver.ModelError):
+      for t, lhs in solver.adaptivethetamethod('dofs', self.residual, self.inertia, timestep=.01, lhs0=numpy.ones(1), theta=self.theta, tol=self.tol, maxiter=1):
+        pass
+
+adaptivethetamethod('impliciteuler', theta=1, tol=1e-4, maxsteps=100, maxerror=1e-2)
+adaptivethetamethod('cranknicolson', theta=.5, tol=1e-6, maxsteps=100, maxerror=1e-4)
@@ -515,3 +515,36 @@ class elem_eval(TestCase):
         self.assertTrue(numpy.isnan(array).all())
       else:
         self.assertFalse(numpy.isnan(array).any())
+
+
+class integrate_membudget(TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.domain, geom = mesh.rectilinear([numpy.linspace(0,1,5)]*2)
+    basis = self.domain.basis('std', degree=2)
+    self.funcs = [function.outer(basis.grad(geom)).sum(-1), basis * geom[0], function.outer(geom), function.norm2(geom)]
+    self.desired = self.domain.integrate(self.funcs, geometry=geom, ischeme='gauss3')
+    self.geom = geom
+
+  def test_chunks(self):
+    for __nprocs__ in 1, 2:
+      for __membudget__ in 1, 16384, 2**30:
+        with self.subTest(nprocs=__nprocs__, membudget=__membudget__):
+          actual = self.domain.integrate(self.funcs, geometry=self.geom, ischeme='gauss3')
+          for a, d in zip(actual, self.desired):
+            self.assertEqual(type(a), type(d))
+            numpy.testing.assert_array_almost_equal(a.toarray() if isinstance(a, matrix.Matrix) else a, d.toarray() if isinstance(d, matrix.Matrix) else d, decimal=14)
+
+  def test_passes(self):
+    _integrate = self.domain._integrate
+    indexonly = []
+    def counting_integrate(*args, **kwargs):
+      indexonly.append(kwargs.get('indexonly', False))
+      return _integrate(*args, **kwargs)
+    self.domain._integrate = counting_integrate
+    for __membudget__, desired in (1, [True, False]), (2**30, [False]):
+      with self.subTest(membudget=__membudget__):
+        indexonly.clear()
+        self.domain.integrate(self.funcs, geometry=self.geom, ischeme='gauss3')
+        self.assertEqual(indexonly, desired)
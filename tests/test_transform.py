@@ -0,0 +1,26 @@
+from nutils import *
+from . import *
+
+class flatten(TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.chains = [
+      transform.affine([[2,1],[0,3]], [1,2]) << transform.affine(.5, [.5,0]),
+      transform.affine(.5, [0,.5]) << transform.affine([[1,0],[0,-1]], [0,1]) << transform.affine(.5, [0,0]),
+      transform.affine([[1],[2]], [0,1], isflipped=False) << transform.affine(.5, [.5]),
+    ]
+    self.points = numpy.array([[0.,0.],[1.,0.],[.25,.75]])
+
+  def test_apply(self):
+    for chain in self.chains:
+      with self.subTest(chain=chain):
+        linear, offset = transform.flatten(chain)
+        points = self.points[:,:chain.fromdims]
+        numpy.testing.assert_almost_equal(numpy.dot(points, numpy.asarray(linear).T) + offset, transform.apply(chain, points))
+
+  def test_apply_batch(self):
+    chains = self.chains[:2]
+    numpy.testing.assert_almost_equal(transform.apply_batch(chains, self.points), [transform.apply(chain, self.points) for chain in chains])
+    points = numpy.array([self.points, self.points[::-1]])
+    numpy.testing.assert_almost_equal(transform.apply_batch(chains, points), [transform.apply(chain, p) for chain, p in zip(chains, points)])